@@ -9,8 +9,8 @@ system_compositions_fraction.csv 기반으로 가능한 조성들을 제공합
 import asyncio
 import json
 import logging
-import pandas as pd
-import ast
+import os
+import sys
 from typing import Any, Dict, List, Optional
 
 from mcp.server import Server
@@ -24,6 +24,16 @@ from mcp.types import (
     Tool,
 )
 
+# 프로젝트 루트의 dft 패키지를 import 하기 위해 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dft.composition import Composition
+from dft.composition_index import get_index_reloader
+from dft.composition_table import CompositionTable
+from dft.search_space_summary import SearchSpaceSummary
+from dft.tool_executor import ToolExecutor
+from dft.tool_response import DEFAULT_MAX_BYTES, DEFAULT_PRECISION, dumps_compact, encode_matches, response_format_properties
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("quest-data-server")
@@ -33,38 +43,56 @@ server = Server("quest-data-server")
 
 # Global data storage
 compositions_db = None
+# (index, compositions_db, summary) - hot-reload 시 한 번의 대입으로 교체되므로 tool 호출은 항상 일관된 묶음을 사용
+_database = None
+
+COMPOSITIONS_CSV_PATH = r"C:\Users\spark\Desktop\LLM_Catalyst_Agent\data\hydrogen\system_compositions_fraction.csv"
+ADSORP_CSV_PATH = os.path.join(os.path.dirname(COMPOSITIONS_CSV_PATH), "system_info_with_adsorp.csv")
+
+def configure_dataset(comp_csv_path: str, info_csv_path: str):
+    """
+    사용할 데이터 파일 경로를 지정합니다. (통합 서버가 에너지 도구와 같은 인덱스를 공유하도록 호출)
+    이미 로드된 데이터베이스는 다음 load_compositions_database() 호출에서 새 경로로 다시 로드됩니다.
+    """
+    global COMPOSITIONS_CSV_PATH, ADSORP_CSV_PATH, compositions_db, _database
+    COMPOSITIONS_CSV_PATH = comp_csv_path
+    ADSORP_CSV_PATH = info_csv_path
+    compositions_db = None
+    _database = None
+
+def get_index_reloader_for_quest():
+    """quest 데이터와 surrogate model이 공유하는 조성 인덱스 reloader를 반환"""
+    return get_index_reloader(COMPOSITIONS_CSV_PATH, ADSORP_CSV_PATH)
+
+def _publish_database(index):
+    """새 인덱스로부터 compositions_db와 요약 통계를 만든 뒤 (index, compositions_db, summary)를 교체"""
+    global compositions_db, _database
+    # 행마다 dict 를 만들지 않고 열 배열(원소 테이블 + CSR + system_id 배열)로 저장, db[row] 는 지연 행 뷰
+    db = CompositionTable.from_index(index)
+    # 검색·구간·샘플링·유사도·통계·혼합 축 보조 인덱스를 교체 전에 미리 생성 (CompositionIndex.WARM_UP)
+    for name in index.WARM_UP:
+        getattr(index, name)()
+    # 시스템이 뒤에 추가된 경우 이전 요약에 추가된 행만 반영
+    previous_index, _, previous_summary = _database if _database is not None else (None, None, None)
+    summary = SearchSpaceSummary.from_index(index, previous_summary, previous_index)
+    summary.summary_json()  # 응답 JSON 을 미리 직렬화
+    _database = (index, db, summary)
+    compositions_db = db
+    logger.info(f"조성 데이터베이스 로드 완료: {len(db)}개 조성")
 
 def load_compositions_database():
-    """system_compositions_fraction.csv를 로드하여 전역 변수에 저장"""
-    global compositions_db
+    """system_compositions_fraction.csv를 로드하여 전역 변수에 저장 (파일 변경 시 자동 갱신)"""
     try:
-        df = pd.read_csv(r"C:\Users\spark\Desktop\LLM_Catalyst_Agent\data\hydrogen\system_compositions_fraction.csv")
-        compositions_db = []
-        
-        for _, row in df.iterrows():
-            try:
-                comp_str = row["composition_fraction"]
-                if isinstance(comp_str, str) and comp_str != "Error or Not Available":
-                    comp_dict = ast.literal_eval(comp_str)
-                    if isinstance(comp_dict, dict):
-                        compositions_db.append({
-                            "system_id": row["system_id"],
-                            "composition": comp_dict,
-                            "elements": list(comp_dict.keys()),
-                            "n_elements": len(comp_dict.keys())
-                        })
-            except:
-                continue
-        
-        logger.info(f"조성 데이터베이스 로드 완료: {len(compositions_db)}개 조성")
+        reloader = get_index_reloader_for_quest()
+        reloader.add_listener(_publish_database)
+        _publish_database(reloader.index)
         return True
     except Exception as e:
         logger.error(f"조성 데이터베이스 로드 실패: {e}")
         return False
 
-@server.list_tools()
-async def handle_list_tools() -> list[Tool]:
-    """연구 공간 탐색을 위한 도구들을 나열합니다."""
+def list_tools() -> list[Tool]:
+    """연구 공간 탐색 도구 목록 (통합 서버에서도 사용)"""
     return [
         Tool(
             name="get_available_elements",
@@ -77,7 +105,7 @@ async def handle_list_tools() -> list[Tool]:
         ),
         Tool(
             name="search_compositions_by_elements",
-            description="지정된 원소들을 포함하는 조성들을 검색합니다.",
+            description="지정된 원소들을 포함하는 조성들을 검색합니다. total_found는 전체 일치 수이며, next_cursor로 다음 페이지를 조회할 수 있습니다.",
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -95,14 +123,150 @@ async def handle_list_tools() -> list[Tool]:
                         "type": "integer",
                         "description": "반환할 최대 결과 수 (기본값: 10)",
                         "default": 10
-                    }
+                    },
+                    "sort_by": {
+                        "type": "string",
+                        "enum": ["none", "adsorp_energy", "-adsorp_energy", "system_id"],
+                        "description": "정렬 기준 (none: 데이터 순서, adsorp_energy: 흡착 에너지 오름차순, -adsorp_energy: 내림차순, system_id; 기본값: none)",
+                        "default": "none"
+                    },
+                    "cursor": {
+                        "type": "string",
+                        "description": "다음 페이지를 가져오기 위한 cursor (이전 응답의 next_cursor, 같은 sort_by로 사용)"
+                    },
+                    **response_format_properties(),
                 },
                 "required": ["elements"]
             }
         ),
+        Tool(
+            name="search_compositions_by_range",
+            description="원소 분율 구간과 흡착 에너지 구간으로 조성을 검색합니다. (예: Pt 0.2~0.5 이면서 -0.1 <= adsorp_energy <= 0.1 eV) 조건은 모두 AND로 결합되며 total_found는 전체 일치 수, next_cursor로 다음 페이지를 조회할 수 있습니다.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "fraction_ranges": {
+                        "type": "object",
+                        "description": "원소별 분율 구간 (예: {\"Pt\": {\"min\": 0.2, \"max\": 0.5}}). 경계 포함, min/max 중 하나는 생략 가능, min이 max보다 크면 오류. 구간이 0을 포함하면(min ≤ 0 ≤ max) 해당 원소가 없는 조성도 포함",
+                        "additionalProperties": {
+                            "type": "object",
+                            "properties": {
+                                "min": {"type": "number"},
+                                "max": {"type": "number"}
+                            }
+                        }
+                    },
+                    "elements": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "반드시 포함할 원소들 (선택)"
+                    },
+                    "n_elements": {
+                        "type": "integer",
+                        "description": "원소 개수 필터 (선택)",
+                        "minimum": 1
+                    },
+                    "energy_min": {
+                        "type": "number",
+                        "description": "흡착 에너지 하한 (eV, 경계 포함, 선택)"
+                    },
+                    "energy_max": {
+                        "type": "number",
+                        "description": "흡착 에너지 상한 (eV, 경계 포함, 선택, energy_min 이상이어야 함)"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "반환할 최대 결과 수 (기본값: 10)",
+                        "default": 10
+                    },
+                    "sort_by": {
+                        "type": "string",
+                        "enum": ["none", "adsorp_energy", "-adsorp_energy", "system_id"],
+                        "description": "정렬 기준 (기본값: none)",
+                        "default": "none"
+                    },
+                    "cursor": {
+                        "type": "string",
+                        "description": "다음 페이지를 가져오기 위한 cursor (이전 응답의 next_cursor, 같은 sort_by로 사용)"
+                    },
+                    **response_format_properties(),
+                },
+                "required": []
+            }
+        ),
+        Tool(
+            name="find_compositions_near_energy",
+            description="흡착 에너지가 목표값(target_energy)에 가장 가까운 k개 조성을 |E - target| 오름차순으로 반환합니다. 분율 구간·원소 조건으로 후보를 제한할 수 있습니다.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "target_energy": {
+                        "type": "number",
+                        "description": "목표 흡착 에너지 (eV, 예: 0.0)"
+                    },
+                    "k": {
+                        "type": "integer",
+                        "description": "반환할 조성 수 (기본값: 10)",
+                        "default": 10
+                    },
+                    "fraction_ranges": {
+                        "type": "object",
+                        "description": "원소별 분율 구간 (예: {\"Pt\": {\"min\": 0.2, \"max\": 0.5}}). 경계 포함, min/max 중 하나는 생략 가능, min이 max보다 크면 오류. 구간이 0을 포함하면(min ≤ 0 ≤ max) 해당 원소가 없는 조성도 포함",
+                        "additionalProperties": {
+                            "type": "object",
+                            "properties": {
+                                "min": {"type": "number"},
+                                "max": {"type": "number"}
+                            }
+                        }
+                    },
+                    "elements": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "반드시 포함할 원소들 (선택)"
+                    },
+                    "n_elements": {
+                        "type": "integer",
+                        "description": "원소 개수 필터 (선택)",
+                        "minimum": 1
+                    },
+                    **response_format_properties(),
+                },
+                "required": ["target_energy"]
+            }
+        ),
+        Tool(
+            name="find_similar_compositions",
+            description="주어진 조성과 가장 가까운 k개 시스템을 거리 순으로 반환합니다. (DFT 흡착 에너지 포함) 같은 조성의 시스템은 제외됩니다.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "composition": {
+                        "type": "object",
+                        "description": "기준 조성 dictionary (예: {\"Pt\": 0.75, \"Sc\": 0.25})",
+                        "additionalProperties": {
+                            "type": "number"
+                        }
+                    },
+                    "k": {
+                        "type": "integer",
+                        "description": "반환할 시스템 수 (기본값: 5)",
+                        "default": 5
+                    },
+                    "metric": {
+                        "type": "string",
+                        "enum": ["l1", "cosine", "property"],
+                        "description": "거리 기준 (l1: 분율 L1 거리, cosine: 분율 벡터 cosine 거리, property: 전기음성도·원자 반지름·족·주기의 분율 가중 평균 기준 거리; 기본값: l1)",
+                        "default": "l1"
+                    },
+                    **response_format_properties(),
+                },
+                "required": ["composition"]
+            }
+        ),
         Tool(
             name="get_random_compositions",
-            description="무작위로 조성들을 샘플링합니다.",
+            description="연구 공간에서 조성들을 샘플링합니다. 기본(diverse)은 서로 최대한 다른 조성들을 골라 적은 후보로 연구 공간을 넓게 덮습니다.",
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -115,23 +279,99 @@ async def handle_list_tools() -> list[Tool]:
                         "type": "integer",
                         "description": "원소 개수 필터 (1=단원계, 2=이원계, 3=삼원계 등)",
                         "minimum": 1
-                    }
+                    },
+                    "strategy": {
+                        "type": "string",
+                        "enum": ["uniform", "stratified", "diverse"],
+                        "description": "샘플링 방식 (uniform: 균등 무작위, stratified: 원소 계열 조합별로 고르게, diverse: 분율 거리 기준 farthest-point; 기본값: diverse)",
+                        "default": "diverse"
+                    },
+                    "seed": {
+                        "type": "integer",
+                        "description": "난수 seed (같은 seed면 같은 결과, 생략 시 매번 다름)"
+                    },
+                    **response_format_properties(),
                 },
                 "required": []
             }
         ),
         Tool(
             name="get_search_space_summary",
-            description="전체 연구 공간의 요약 통계를 반환합니다.",
+            description="전체 연구 공간의 요약 통계(원소 빈도, n원계 분포, 원소별·n원계별 흡착 에너지 히스토그램)를 반환합니다.",
             inputSchema={
                 "type": "object",
                 "properties": {},
                 "required": []
             }
         ),
+        Tool(
+            name="get_element_energy_stats",
+            description="원소, 원소 쌍, n원계별 흡착 에너지 통계(count/min/mean/std/median/max와 최솟값·최댓값 system_id)를 미리 계산된 집계에서 반환합니다. 원소를 생략하면 전체·원소별·n원계별 통계를 한 번에 반환합니다.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "elements": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "통계를 볼 원소 0~2개 (2개면 두 원소를 모두 포함하는 조성, 예: [\"Pt\", \"Sc\"])",
+                        "maxItems": 2
+                    },
+                    "n_elements": {
+                        "type": "integer",
+                        "description": "원소 개수 필터 (1=단원계, 2=이원계, 3=삼원계 등, 생략 시 전체)",
+                        "minimum": 1
+                    },
+                    "include_pairs": {
+                        "type": "boolean",
+                        "description": "원소를 1개 지정한 경우 함께 나타나는 원소별 쌍 통계도 반환 (기본값: false)",
+                        "default": False
+                    },
+                    "precision": {
+                        "type": "integer",
+                        "description": f"에너지 소수점 자릿수 (기본값: {DEFAULT_PRECISION})",
+                        "default": DEFAULT_PRECISION,
+                        "minimum": 0
+                    }
+                },
+                "required": []
+            }
+        ),
+        Tool(
+            name="get_binary_phase_line",
+            description="원소 쌍 [A, B]의 모든 이원계 조성을 A의 분율 x_A(= A / (A + B)) 순으로 정렬하여 흡착 에너지와 함께 반환합니다. (순수 원소는 x_A = 0, 1 끝점) 이원계 volcano 단면을 한 번에 볼 수 있습니다.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "elements": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "원소 쌍 [A, B] - 축은 첫 번째 원소의 분율 x_A (예: [\"Pt\", \"Sc\"])",
+                        "minItems": 2,
+                        "maxItems": 2
+                    },
+                    "include_pure": {
+                        "type": "boolean",
+                        "description": "순수 원소 A(x_A = 1), B(x_A = 0) 시스템도 포함 (기본값: true)",
+                        "default": True
+                    },
+                    "reduction": {
+                        "type": "string",
+                        "enum": ["first", "min", "mean", "max"],
+                        "description": "같은 조성의 시스템이 여러 개일 때 하나로 합치는 방법 (생략 시 모든 시스템 반환)"
+                    },
+                    "precision": {
+                        "type": "integer",
+                        "description": f"x_A·에너지 소수점 자릿수 (기본값: {DEFAULT_PRECISION})",
+                        "default": DEFAULT_PRECISION,
+                        "minimum": 0
+                    }
+                },
+                "required": ["elements"]
+            }
+        ),
         Tool(
             name="validate_composition",
-            description="주어진 조성이 연구 공간에 존재하는지 확인합니다.",
+            description="주어진 조성이 연구 공간에 존재하는지 확인합니다. 존재하면 해당 시스템의 DFT 흡착 에너지(adsorp_energy)와, 같은 조성의 시스템이 여러 개이면 에너지 집계(energy_stats: count/min/mean/std/max)도 함께 반환합니다.",
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -148,28 +388,49 @@ async def handle_list_tools() -> list[Tool]:
         )
     ]
 
+@server.list_tools()
+async def handle_list_tools() -> list[Tool]:
+    """연구 공간 탐색을 위한 도구들을 나열합니다."""
+    return list_tools()
+
+# 동기 tool 작업은 제한된 스레드 풀에서 실행 (같은 요청은 한 번만 실행하여 결과 공유)
+tool_executor = ToolExecutor(
+    tool_limits={"search_compositions_by_elements": 4, "search_compositions_by_range": 4,
+                 "find_compositions_near_energy": 4, "find_similar_compositions": 4, "get_random_compositions": 4},
+    uncoalesced_tools=("get_random_compositions",),
+)
+
 @server.call_tool()
 async def handle_call_tool(name: str, arguments: dict) -> list[TextContent]:
     """연구 공간 탐색 도구 호출을 처리합니다."""
+    return await tool_executor.run(name, arguments, run_tool)
+
+def _encode_matches(records: List[Dict[str, Any]], arguments: dict):
+    """tool 인자의 fields/layout/precision/max_bytes 에 따라 결과 목록을 변환 -> (목록 또는 표, 포함된 수)"""
+    return encode_matches(
+        records,
+        fields=arguments.get("fields"),
+        layout=arguments.get("layout", "records"),
+        precision=arguments.get("precision", DEFAULT_PRECISION),
+        max_bytes=arguments.get("max_bytes", DEFAULT_MAX_BYTES),
+    )
+
+def run_tool(name: str, arguments: dict) -> list[TextContent]:
+    """tool 호출을 동기적으로 처리합니다. (tool_executor 의 worker 스레드에서 실행)"""
     
-    if compositions_db is None:
+    if _database is None:
         if not load_compositions_database():
             return [TextContent(type="text", text=json.dumps({
                 "error": "조성 데이터베이스를 로드할 수 없습니다."
             }, ensure_ascii=False))]
     
+    # 호출 전체에서 같은 스냅샷을 사용 (도중에 인덱스가 교체되어도 영향 없음)
+    index, db, summary = _database
+    
     if name == "get_available_elements":
         try:
-            all_elements = set()
-            for comp_data in compositions_db:
-                all_elements.update(comp_data["elements"])
-            
-            result = {
-                "available_elements": sorted(list(all_elements)),
-                "total_elements": len(all_elements),
-                "status": "success"
-            }
-            return [TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            # 로드 시 계산해 둔 집계의 캐시된 응답 사용
+            return [TextContent(type="text", text=summary.elements_json())]
             
         except Exception as e:
             return [TextContent(type="text", text=json.dumps({
@@ -181,30 +442,141 @@ async def handle_call_tool(name: str, arguments: dict) -> list[TextContent]:
             elements = arguments.get("elements", [])
             exact_match = arguments.get("exact_match", False)
             limit = arguments.get("limit", 10)
+            sort_by = arguments.get("sort_by", "none")
+            cursor = arguments.get("cursor")
             
-            matches = []
-            for comp_data in compositions_db:
-                comp_elements = set(comp_data["elements"])
-                search_elements = set(elements)
-                
-                if exact_match:
-                    if comp_elements == search_elements:
-                        matches.append(comp_data)
-                else:
-                    if search_elements.issubset(comp_elements):
-                        matches.append(comp_data)
-                
-                if len(matches) >= limit:
-                    break
+            # 원소 역색인 교집합으로 전체 일치 행을 구한 뒤 정렬 기준에 따라 한 페이지만 잘라 반환
+            postings = index.element_postings()
+            page = postings.search(elements, exact=exact_match, sort_by=sort_by, limit=limit, cursor=cursor)
+            
+            if sort_by in ("adsorp_energy", "-adsorp_energy") or "adsorp_energy" in (arguments.get("fields") or []):
+                records = [dict(db[row], adsorp_energy=index.energies.get(db[row]["system_id"])) for row in page.rows]
+            else:
+                records = [db[row] for row in page.rows]
+            # 요청된 필드만, 요청된 형식으로 - max_bytes 를 넘으면 잘라내고 cursor 를 잘린 위치로 조정
+            matches, returned = _encode_matches(records, arguments)
+            next_cursor = page.next_cursor
+            if returned < len(records):
+                next_cursor = postings.cursor_after(page.rows[returned - 1], sort_by)
             
             result = {
                 "matches": matches,
-                "total_found": len(matches),
+                "returned_count": returned,
+                "total_found": page.total_found,
+                "next_cursor": next_cursor,
+                "truncated": returned < len(records),
                 "search_elements": elements,
                 "exact_match": exact_match,
+                "sort_by": sort_by,
                 "status": "success"
             }
-            return [TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            return [TextContent(type="text", text=dumps_compact(result))]
+            
+        except Exception as e:
+            return [TextContent(type="text", text=json.dumps({
+                "error": str(e), "status": "error"
+            }, ensure_ascii=False))]
+    
+    elif name == "search_compositions_by_range":
+        try:
+            fraction_ranges = arguments.get("fraction_ranges") or {}
+            energy_min = arguments.get("energy_min")
+            energy_max = arguments.get("energy_max")
+            elements = arguments.get("elements") or []
+            n_elements = arguments.get("n_elements")
+            limit = arguments.get("limit", 10)
+            sort_by = arguments.get("sort_by", "none")
+            cursor = arguments.get("cursor")
+            
+            energy_range = None
+            if energy_min is not None or energy_max is not None:
+                energy_range = {"min": energy_min, "max": energy_max}
+            
+            # 정렬 배열 이진 탐색으로 조건별 행 비트맵을 만든 뒤 AND 하여 한 페이지만 잘라 반환
+            ranges = index.range_index()
+            page = ranges.search(fraction_ranges, energy_range, elements, n_elements=n_elements,
+                                 sort_by=sort_by, limit=limit, cursor=cursor)
+            records = [dict(db[row], adsorp_energy=index.energies.get(db[row]["system_id"])) for row in page.rows]
+            matches, returned = _encode_matches(records, arguments)
+            next_cursor = page.next_cursor
+            if returned < len(records):
+                next_cursor = ranges.postings.cursor_after(page.rows[returned - 1], sort_by)
+            
+            result = {
+                "matches": matches,
+                "returned_count": returned,
+                "total_found": page.total_found,
+                "next_cursor": next_cursor,
+                "truncated": returned < len(records),
+                "fraction_ranges": fraction_ranges,
+                "energy_min": energy_min,
+                "energy_max": energy_max,
+                "sort_by": sort_by,
+                "status": "success"
+            }
+            return [TextContent(type="text", text=dumps_compact(result))]
+            
+        except Exception as e:
+            return [TextContent(type="text", text=json.dumps({
+                "error": str(e), "status": "error"
+            }, ensure_ascii=False))]
+    
+    elif name == "find_compositions_near_energy":
+        try:
+            target_energy = arguments.get("target_energy")
+            if target_energy is None:
+                return [TextContent(type="text", text=json.dumps({
+                    "error": "target_energy 파라미터가 필요합니다."
+                }, ensure_ascii=False))]
+            k = arguments.get("k", 10)
+            
+            ranges = index.range_index()
+            bitmap = ranges.match_bitmap(arguments.get("fraction_ranges"), None,
+                                         arguments.get("elements") or [], n_elements=arguments.get("n_elements"))
+            neighbors = ranges.closest_to_energy(target_energy, k, bitmap)
+            records = [dict(db[n.row], adsorp_energy=n.energy, energy_delta=n.delta) for n in neighbors]
+            matches, returned = _encode_matches(records, arguments)
+            
+            result = {
+                "matches": matches,
+                "returned_count": returned,
+                "truncated": returned < len(records),
+                "target_energy": target_energy,
+                "status": "success" if returned else "not_found"
+            }
+            return [TextContent(type="text", text=dumps_compact(result))]
+            
+        except Exception as e:
+            return [TextContent(type="text", text=json.dumps({
+                "error": str(e), "status": "error"
+            }, ensure_ascii=False))]
+    
+    elif name == "find_similar_compositions":
+        try:
+            composition = arguments.get("composition")
+            if not composition:
+                return [TextContent(type="text", text=json.dumps({
+                    "error": "composition 파라미터가 필요합니다."
+                }, ensure_ascii=False))]
+            composition = Composition.coerce(composition)
+            k = arguments.get("k", 5)
+            metric = arguments.get("metric", "l1")
+            
+            # 희소 분율 행렬의 원소 열(l1/cosine) 또는 물성 descriptor 트리(property)로 k-최근접 질의
+            neighbors = index.similarity_index().query(composition, k, metric)
+            records = [dict(db[row], adsorp_energy=index.energies.get(db[row]["system_id"]), distance=distance)
+                       for row, distance in neighbors]
+            matches, returned = _encode_matches(records, arguments)
+            
+            result = {
+                "matches": matches,
+                "returned_count": returned,
+                "truncated": returned < len(records),
+                "composition": composition,
+                "metric": metric,
+                "status": "success" if returned else "not_found"
+            }
+            return [TextContent(type="text", text=dumps_compact(result))]
             
         except Exception as e:
             return [TextContent(type="text", text=json.dumps({
@@ -215,32 +587,36 @@ async def handle_call_tool(name: str, arguments: dict) -> list[TextContent]:
         try:
             count = arguments.get("count", 5)
             n_elements = arguments.get("n_elements")
+            strategy = arguments.get("strategy", "diverse")
+            seed = arguments.get("seed")
             
-            filtered_db = compositions_db
-            if n_elements:
-                filtered_db = [c for c in compositions_db if c["n_elements"] == n_elements]
+            # 로드 시 계산해 둔 n 원계 partition 에서 NumPy 로 샘플링 (목록을 다시 만들지 않음)
+            sampler = index.composition_sampler()
+            total_available = len(sampler.pool(n_elements))
             
-            if not filtered_db:
+            if not total_available:
                 result = {
                     "compositions": [],
                     "message": f"원소 개수 {n_elements}인 조성을 찾을 수 없습니다." if n_elements else "조성 데이터가 없습니다.",
                     "status": "not_found"
                 }
             else:
-                import random
-                sample_count = min(count, len(filtered_db))
-                sampled = random.sample(filtered_db, sample_count)
+                rows = sampler.sample(count, n_elements=n_elements, strategy=strategy, seed=seed)
+                sampled, returned = _encode_matches([db[row] for row in rows.tolist()], arguments)
                 
                 result = {
                     "compositions": sampled,
                     "requested_count": count,
-                    "returned_count": sample_count,
-                    "total_available": len(filtered_db),
+                    "returned_count": returned,
+                    "truncated": returned < len(rows),
+                    "total_available": total_available,
                     "filter_n_elements": n_elements,
+                    "strategy": strategy,
+                    "seed": seed,
                     "status": "success"
                 }
             
-            return [TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            return [TextContent(type="text", text=dumps_compact(result))]
             
         except Exception as e:
             return [TextContent(type="text", text=json.dumps({
@@ -249,28 +625,78 @@ async def handle_call_tool(name: str, arguments: dict) -> list[TextContent]:
     
     elif name == "get_search_space_summary":
         try:
-            # 원소별 통계
-            element_counts = {}
-            n_element_counts = {}
+            # 로드 시 계산(추가 시 증분 갱신)해 둔 집계의 캐시된 응답 사용
+            return [TextContent(type="text", text=summary.summary_json())]
             
-            for comp_data in compositions_db:
-                # 원소별 카운트
-                for element in comp_data["elements"]:
-                    element_counts[element] = element_counts.get(element, 0) + 1
-                
-                # n원계별 카운트
-                n_elem = comp_data["n_elements"]
-                n_element_counts[n_elem] = n_element_counts.get(n_elem, 0) + 1
+        except Exception as e:
+            return [TextContent(type="text", text=json.dumps({
+                "error": str(e), "status": "error"
+            }, ensure_ascii=False))]
+    
+    elif name == "get_element_energy_stats":
+        try:
+            elements = arguments.get("elements") or []
+            n_elements = arguments.get("n_elements")
+            include_pairs = arguments.get("include_pairs", False)
+            precision = arguments.get("precision", DEFAULT_PRECISION)
             
+            # 로드 시 계산해 둔 (원소 tuple, n 원계) 집계에서 조회 - 목록은 원소 수에만 비례
+            stats = index.element_energy_stats()
+            found = stats.get(elements, n_elements)
             result = {
-                "total_compositions": len(compositions_db),
-                "unique_elements": len(element_counts),
-                "element_frequency": dict(sorted(element_counts.items(), key=lambda x: x[1], reverse=True)[:20]),
-                "n_element_distribution": n_element_counts,
-                "available_elements": sorted(list(element_counts.keys())),
-                "status": "success"
+                "elements": elements,
+                "n_elements": n_elements,
+                "stats": found.to_dict(precision) if found is not None else None,
             }
-            return [TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            if not elements:
+                by_element = {element: stats.get([element], n_elements) for element in stats.elements}
+                result["by_element"] = {element: s.to_dict(precision, include_system_ids=False)
+                                        for element, s in by_element.items() if s is not None}
+                if n_elements is None:
+                    result["by_n_elements"] = {str(n): stats.get((), n).to_dict(precision, include_system_ids=False)
+                                               for n in stats.n_classes}
+            elif include_pairs and len(elements) == 1:
+                pairs = {partner: stats.get([elements[0], partner], n_elements)
+                         for partner in stats.partners.get(elements[0], [])}
+                result["pairs"] = {partner: s.to_dict(precision, include_system_ids=False)
+                                   for partner, s in pairs.items() if s is not None}
+            result["status"] = "success" if found is not None else "not_found"
+            return [TextContent(type="text", text=dumps_compact(result))]
+            
+        except Exception as e:
+            return [TextContent(type="text", text=json.dumps({
+                "error": str(e), "status": "error"
+            }, ensure_ascii=False))]
+    
+    elif name == "get_binary_phase_line":
+        try:
+            elements = arguments.get("elements") or []
+            if len(elements) != 2:
+                return [TextContent(type="text", text=json.dumps({
+                    "error": "elements 에 원소 2개가 필요합니다."
+                }, ensure_ascii=False))]
+            precision = arguments.get("precision", DEFAULT_PRECISION)
+            
+            # 로드 시 (원소 쌍, x, 에너지) 순으로 정렬해 둔 배열에서 해당 원소 쌍 구간만 잘라 사용
+            line = index.binary_phase_lines().line(
+                elements[0], elements[1],
+                include_pure=arguments.get("include_pure", True),
+                reduction=arguments.get("reduction"),
+            )
+            rows = [
+                [round(x, precision), round(energy, precision), index.system_ids[row]]
+                for x, energy, row in zip(line.x.tolist(), line.energies.tolist(), line.rows.tolist())
+            ]
+            
+            result = {
+                "elements": elements,
+                "columns": [f"x_{elements[0]}", "adsorp_energy", "system_id"],
+                "rows": rows,
+                "point_count": len(rows),
+                "reduction": arguments.get("reduction"),
+                "status": "success" if rows else "not_found"
+            }
+            return [TextContent(type="text", text=dumps_compact(result))]
             
         except Exception as e:
             return [TextContent(type="text", text=json.dumps({
@@ -284,22 +710,24 @@ async def handle_call_tool(name: str, arguments: dict) -> list[TextContent]:
                 return [TextContent(type="text", text=json.dumps({
                     "error": "composition 파라미터가 필요합니다."
                 }, ensure_ascii=False))]
+            composition = Composition.coerce(composition)  # 정규화 키를 한 번만 계산
             
-            tolerance = 1e-6
-            for comp_data in compositions_db:
-                stored_comp = comp_data["composition"]
-                
-                # 키가 같은지 확인
-                if set(stored_comp.keys()) == set(composition.keys()):
-                    # 값이 tolerance 내에서 같은지 확인
-                    if all(abs(stored_comp[k] - composition[k]) < tolerance for k in stored_comp):
-                        result = {
-                            "valid": True,
-                            "system_id": comp_data["system_id"],
-                            "exact_match": comp_data,
-                            "status": "success"
-                        }
-                        return [TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            match = index.find_row(composition)
+            if match is not None:
+                system_id = db[match]["system_id"]
+                result = {
+                    "valid": True,
+                    "system_id": system_id,
+                    "exact_match": db[match].to_dict(),
+                    # 같은 인덱스에 있는 DFT 흡착 에너지를 함께 반환 (없으면 null)
+                    "adsorp_energy": index.energies.get(system_id),
+                    "status": "success"
+                }
+                group = index.groups.group_of(match)
+                if group.count > 1:
+                    # 같은 조성의 다른 시스템(표면/흡착 자리)들의 에너지 집계
+                    result["energy_stats"] = group.to_dict(include_system_ids=False)
+                return [TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
             
             result = {
                 "valid": False,
@@ -328,6 +756,9 @@ async def main():
         logger.error("조성 데이터베이스 로드 실패 - 서버를 종료합니다.")
         return
     
+    # 데이터 파일이 바뀌면 백그라운드에서 다시 로드하여 교체 (서버 재시작 불필요)
+    get_index_reloader_for_quest().start()
+    
     async with stdio_server() as (read_stream, write_stream):
         await server.run(
             read_stream,
@@ -344,64 +775,3 @@ async def main():
 
 if __name__ == "__main__":
     asyncio.run(main())
-```
-
-이제 LLM Agent에 Quest Data MCP 도구들을 추가해야 합니다:
-
-```python
-# agent/llm_agent.py에 추가할 도구들
-quest_data_tools = [
-    {
-        "type": "function",
-        "function": {
-            "name": "get_available_elements",
-            "description": "연구 가능한 모든 원소들의 목록을 확인합니다.",
-            "parameters": {"type": "object", "properties": {}, "required": []}
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "search_compositions_by_elements", 
-            "description": "특정 원소들을 포함하는 실제 존재하는 조성들을 검색합니다.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "elements": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "검색할 원소들"
-                    },
-                    "exact_match": {"type": "boolean", "default": False},
-                    "limit": {"type": "integer", "default": 10}
-                },
-                "required": ["elements"]
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "validate_composition",
-            "description": "제안하려는 조성이 실제 연구 공간에 존재하는지 검증합니다.",
-            "parameters": {
-                "type": "object", 
-                "properties": {
-                    "composition": {"type": "object", "description": "검증할 조성"}
-                },
-                "required": ["composition"]
-            }
-        }
-    }
-]
-```
-
-### 주요 기능:
-
-1. **get_available_elements**: 연구 가능한 모든 원소 목록 제공
-2. **search_compositions_by_elements**: 특정 원소 조합으로 실제 존재하는 조성 검색
-3. **get_random_compositions**: 무작위 샘플링으로 다양한 조성 제안
-4. **validate_composition**: 제안 조성이 실제 존재하는지 검증
-5. **get_search_space_summary**: 전체 연구 공간 통계
-
-이렇게 하면 GPT-4o가 존재하지 않는 조성을 제안하는 문제를 해결하고, 실제 연구 가능한 범위 내에서만 조성을 제안하도록 할 수 있습니다!
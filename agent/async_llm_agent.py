@@ -0,0 +1,331 @@
+"""
+Async LLM agent
+
+LLMAgent 의 async 버전입니다. openai.AsyncOpenAI 로 여러 prompt 를 동시에 처리합니다.
+(예: search group 을 shard 로 나눠 shard 마다 prompt 하나)
+
+- RateLimiter: 분당 요청 수(RPM)와 분당 token 수(TPM) token bucket. 요청 전 예상 token 수만큼 차감하고,
+               응답의 usage.total_tokens 로 실제 사용량을 정산합니다.
+- 429 backoff: RateLimitError 는 retry-after 헤더(없으면 지수 backoff + jitter)만큼 기다린 뒤 재시도합니다.
+- ask_many:    동시 실행 수를 제한하여 prompt 들을 처리하고, 결과는 입력 순서대로 반환합니다.
+               prompt 별 라운드 지연 시간은 self.prompt_round_logs 에 같은 순서로 기록됩니다.
+- tool 실행:   dft.tool_executor.ToolExecutor 로 스레드 풀에서 실행하며, 동시에 처리 중인 prompt 들의
+               같은 (tool, arguments) 호출은 한 번만 실행하여 결과를 공유합니다.
+
+tool 라운드 규칙(max_tool_rounds, max_tool_calls, deadline_s), 응답 캐시, tool 정의는 LLMAgent 와 같습니다.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+
+import openai
+
+from agent.llm_agent import BUDGET_EXCEEDED_RESULT, DEADLINE_EXCEEDED_RESULT, MIN_REQUEST_TIMEOUT_S, LLMAgent
+from dft.tool_executor import ToolExecutor
+
+logger = logging.getLogger("llm_agent_mcp")
+
+# OpenAI 계정 tier 에 맞게 조정 (None 이면 제한 없음)
+DEFAULT_REQUESTS_PER_MINUTE = 500
+DEFAULT_TOKENS_PER_MINUTE = 30000
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_MAX_RETRIES = 6
+# 응답 token 수를 알 수 없을 때 요청당 예상 completion token 수
+DEFAULT_COMPLETION_TOKENS = 512
+_BACKOFF_BASE_S = 1.0
+_BACKOFF_MAX_S = 60.0
+
+
+class TokenBucket:
+    """분당 per_minute 만큼 일정하게 채워지는 token bucket (하나의 event loop 안에서 사용)"""
+
+    def __init__(self, per_minute: float, burst_s: float = 60.0):
+        """burst_s: 한꺼번에 쓸 수 있는 양 (몇 초 분량까지 모아 둘지)"""
+        self.rate = float(per_minute) / 60.0
+        self.capacity = max(self.rate * burst_s, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0):
+        """amount 만큼 차감할 수 있을 때까지 기다린 뒤 차감 (capacity 보다 크면 capacity 로 제한)"""
+        amount = min(float(amount), self.capacity)
+        while True:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return
+            await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def adjust(self, amount: float):
+        """이미 차감한 양을 보정 (양수면 추가 차감, 음수면 반환) - 잔량이 음수가 되면 다음 acquire 가 기다림"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class RateLimiter:
+    """요청 수(RPM)와 token 수(TPM) 제한"""
+
+    def __init__(self, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE, tokens_per_minute=DEFAULT_TOKENS_PER_MINUTE):
+        # provider 는 RPM 을 초 단위로 나눠 적용하므로 요청 수는 1초 분량 이상 몰아 보내지 않음
+        self.requests = TokenBucket(requests_per_minute, burst_s=1.0) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+    async def acquire(self, estimated_tokens: int):
+        if self.requests is not None:
+            await self.requests.acquire(1)
+        if self.tokens is not None:
+            await self.tokens.acquire(estimated_tokens)
+
+    def settle(self, estimated_tokens: int, used_tokens):
+        """응답의 실제 token 사용량으로 예상치를 정산"""
+        if self.tokens is not None and used_tokens is not None:
+            self.tokens.adjust(used_tokens - estimated_tokens)
+
+
+def estimate_tokens(request) -> int:
+    """요청의 대략적인 token 수 (JSON 4 byte ≈ 1 token) + 예상 completion token 수"""
+    prompt = json.dumps([request.get("messages"), request.get("tools")], ensure_ascii=False, default=str)
+    return len(prompt.encode("utf-8")) // 4 + int(request.get("max_tokens") or DEFAULT_COMPLETION_TOKENS)
+
+
+def shard_prompts(prompt_manager, context, compositions, shard_size):
+    """search group 조성 목록을 shard_size 개씩 나눠 shard 마다 prompt 하나를 생성합니다."""
+    prompts = []
+    for start in range(0, len(compositions), shard_size):
+        shard = compositions[start:start + shard_size]
+        search_group = {
+            "count": len(shard),
+            "compositions": shard,
+            "description": f"총 {len(compositions)}개 중 {start + 1}~{start + len(shard)}번째 후보 조성"
+        }
+        prompts.append(prompt_manager.build_prompt(context, search_group))
+    return prompts
+
+
+class AsyncLLMAgent(LLMAgent):
+    """여러 prompt 를 동시에 처리하는 async LLMAgent (ask 는 coroutine)"""
+
+    def __init__(self, use_mcp_tools=False, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE,
+                 tokens_per_minute=DEFAULT_TOKENS_PER_MINUTE, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 max_retries=DEFAULT_MAX_RETRIES, **kwargs):
+        """
+        Args:
+            use_mcp_tools: DFT 조회 tool 을 LLM 에 제공할지 여부
+            requests_per_minute, tokens_per_minute: 분당 요청 수 / token 수 상한 (None 이면 제한 없음)
+            max_concurrency: ask_many 에서 동시에 처리할 prompt 수
+            max_retries: 429 (RateLimitError) 재시도 횟수
+            **kwargs: LLMAgent 인자 (model, max_tool_rounds, max_tool_calls, deadline_s, max_tool_workers, cache_mode, cache_dir)
+        """
+        super().__init__(use_mcp_tools=use_mcp_tools, **kwargs)
+        api_key = os.getenv("OPENAI_API_KEY")
+        # 재시도는 여기서 rate limiter 와 함께 처리하므로 client 자체 재시도는 끔
+        self.async_client = openai.AsyncOpenAI(api_key=api_key, max_retries=0) if api_key else None
+        self.limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self._tool_executor = None
+        self._tool_executor_loop = None
+
+        # 관측용 카운터 (prompt_round_logs: 마지막 ask_many 의 prompt 별 round_log, 입력 순서)
+        self.requests_sent = 0
+        self.rate_limited = 0
+        self.prompt_round_logs = []
+
+    async def ask(self, prompt):
+        """prompt 하나에 대한 LLM 응답 (use_mcp_tools 이면 tool 루프, 라운드별 지연 시간은 self.round_log)"""
+        content, round_log = await self._ask(prompt)
+        if self.use_mcp_tools:
+            self.round_log = round_log
+        return content
+
+    async def _ask(self, prompt):
+        """(응답, 이 prompt 의 round_log) - 동시에 처리되는 prompt 들이 self.round_log 를 덮어쓰지 않도록 분리"""
+        messages = [{"role": "user", "content": prompt}]
+        if self.use_mcp_tools:
+            return await self._run_tool_loop_async(messages)
+        response = await self._create_completion_async(model=self.model, messages=messages)
+        return response.choices[0].message.content, []
+
+    async def ask_many(self, prompts, max_concurrency=None, return_exceptions=True):
+        """
+        여러 prompt 를 최대 max_concurrency 개씩 동시에 처리하여 입력 순서대로 응답을 반환합니다.
+        return_exceptions=True 이면 실패한 prompt 자리에 예외 객체를 넣고 나머지는 계속 처리합니다.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+        started = time.monotonic()
+        round_logs = [[] for _ in prompts]
+        self.prompt_round_logs = round_logs
+
+        async def run(i, prompt):
+            async with semaphore:
+                content, round_logs[i] = await self._ask(prompt)
+                return content
+
+        results = await asyncio.gather(*(run(i, prompt) for i, prompt in enumerate(prompts)),
+                                       return_exceptions=return_exceptions)
+        failed = sum(1 for result in results if isinstance(result, BaseException))
+        logger.info(f"ask_many 완료: {len(prompts)}개 prompt ({failed}개 실패), {time.monotonic() - started:.1f}s, "
+                    f"요청 {self.requests_sent}회, 429 {self.rate_limited}회")
+        return results
+
+    def run_batch(self, prompts, max_concurrency=None, return_exceptions=True):
+        """동기 코드에서 ask_many 를 실행"""
+        return asyncio.run(self.ask_many(prompts, max_concurrency, return_exceptions))
+
+    async def _create_completion_async(self, timeout=None, **request):
+        """
+        rate limit 과 429 backoff 를 적용한 chat.completions.create (응답 캐시를 거침)
+        timeout(초) 은 요청 시간 제한이며 캐시 키에는 포함되지 않습니다. (None 이면 client 기본값)
+        """
+        options = {} if timeout is None else {"timeout": timeout}
+        return await self.response_cache.fetch_async(
+            request,
+            lambda: self._send_with_backoff(request, options),
+            to_dict=lambda response: response.model_dump(mode="json"),
+            from_dict=lambda data: openai.types.chat.ChatCompletion.model_validate(data),
+        )
+
+    async def _send_with_backoff(self, request, options=None):
+        estimated = estimate_tokens(request)
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire(estimated)
+            self.requests_sent += 1
+            try:
+                response = await self.async_client.chat.completions.create(**request, **(options or {}))
+            except openai.RateLimitError as e:
+                self.rate_limited += 1
+                # 거절된 요청은 token 을 쓰지 않았으므로 예상치를 반환
+                self.limiter.settle(estimated, 0)
+                if attempt == self.max_retries:
+                    raise
+                delay = self._retry_after(e)
+                if delay is None:
+                    delay = min(_BACKOFF_BASE_S * 2 ** attempt, _BACKOFF_MAX_S) * (0.5 + random.random() / 2)
+                logger.warning(f"429 rate limit - {delay:.1f}s 후 재시도 ({attempt + 1}/{self.max_retries})")
+                await asyncio.sleep(delay)
+                continue
+            usage = getattr(response, "usage", None)
+            self.limiter.settle(estimated, getattr(usage, "total_tokens", None))
+            return response
+
+    @staticmethod
+    def _retry_after(error):
+        """429 응답의 retry-after 헤더(초) - 없으면 None"""
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None) or {}
+        try:
+            return float(headers.get("retry-after"))
+        except (TypeError, ValueError):
+            return None
+
+    async def _run_tool_loop_async(self, messages):
+        """LLMAgent._run_tool_loop 의 async 버전 -> (최종 답변, 라운드별 지연 시간 목록)"""
+        started = time.monotonic()
+        deadline = started + self.deadline_s
+        calls_left = self.max_tool_calls
+        round_log = []
+
+        for round_index in range(1, self.max_tool_rounds + 1):
+            round_started = time.monotonic()
+            try:
+                response = await self._create_completion_async(
+                    model=self.model,
+                    messages=messages,
+                    tools=self.mcp_tools,
+                    tool_choice="auto",
+                    timeout=max(deadline - time.monotonic(), MIN_REQUEST_TIMEOUT_S)
+                )
+            except openai.APITimeoutError:
+                logger.info(f"라운드 {round_index}: deadline 안에 LLM 응답 없음 - 최종 답변 요청")
+                break
+            llm_ms = (time.monotonic() - round_started) * 1e3
+            message = response.choices[0].message
+
+            if not message.tool_calls:
+                round_log.append({"round": round_index, "tool_calls": 0, "llm_ms": round(llm_ms, 1),
+                                  "tools_ms": 0.0, "wall_ms": round(llm_ms, 1)})
+                return message.content, round_log
+
+            tool_count = len(message.tool_calls)
+            messages.append(message)
+            tools_started = time.monotonic()
+            await self._handle_tool_calls_async(message.tool_calls, messages, round_index, calls_left, deadline)
+            calls_left -= min(tool_count, calls_left)
+            tools_ms = (time.monotonic() - tools_started) * 1e3
+            round_log.append({"round": round_index, "tool_calls": tool_count, "llm_ms": round(llm_ms, 1),
+                              "tools_ms": round(tools_ms, 1),
+                              "wall_ms": round((time.monotonic() - round_started) * 1e3, 1)})
+
+            if calls_left <= 0 or time.monotonic() >= deadline:
+                break
+
+        final_started = time.monotonic()
+        final_response = await self._create_completion_async(
+            model=self.model,
+            messages=messages,
+            tools=self.mcp_tools,
+            tool_choice="none",
+            timeout=max(deadline - time.monotonic(), MIN_REQUEST_TIMEOUT_S)
+        )
+        final_ms = (time.monotonic() - final_started) * 1e3
+        round_log.append({"round": len(round_log) + 1, "tool_calls": 0, "llm_ms": round(final_ms, 1),
+                          "tools_ms": 0.0, "wall_ms": round(final_ms, 1)})
+        return final_response.choices[0].message.content, round_log
+
+    async def _handle_tool_calls_async(self, tool_calls, messages, round_index, calls_left, deadline):
+        """한 라운드의 tool call 들을 ToolExecutor 로 동시에 실행하고 호출 순서대로 tool 메시지를 추가"""
+        executor = self._get_tool_executor()
+        tasks = [
+            asyncio.ensure_future(executor.run(tool_call.function.name, tool_call.function.arguments,
+                                               self._execute_tool_call))
+            if i < calls_left else None
+            for i, tool_call in enumerate(tool_calls)
+        ]
+        outcomes = []
+        for task in tasks:
+            if task is None:
+                outcomes.append((None, dict(BUDGET_EXCEEDED_RESULT), False, 0.0))
+                continue
+            try:
+                # deadline 이 지나면 이 호출자의 대기만 취소 - 다른 prompt 가 공유 중인 tool 실행은 ToolExecutor 가 유지
+                outcomes.append(await asyncio.wait_for(task, max(deadline - time.monotonic(), 0.0)))
+            except asyncio.TimeoutError:
+                outcomes.append((None, dict(DEADLINE_EXCEEDED_RESULT), False, None))
+        self._record_tool_results(tool_calls, outcomes, messages, round_index)
+
+    def _get_tool_executor(self):
+        """현재 event loop 용 ToolExecutor (asyncio.Semaphore 는 loop 에 묶이므로 loop 가 바뀌면 새로 생성)"""
+        loop = asyncio.get_running_loop()
+        if self._tool_executor is None or self._tool_executor_loop is not loop:
+            if self._tool_executor is not None:
+                self._tool_executor.shutdown(wait=False)
+            self._tool_executor = ToolExecutor(max_workers=self.max_tool_workers, thread_name_prefix="llm-agent-tool")
+            self._tool_executor_loop = loop
+        return self._tool_executor
+
+    def close(self):
+        """LLMAgent.close + ToolExecutor 종료"""
+        super().close()
+        if self._tool_executor is not None:
+            self._tool_executor.shutdown(wait=False)
+            self._tool_executor = None
+            self._tool_executor_loop = None
+
+    def get_tool_usage_summary(self):
+        """MCP tool 사용 통계 + prompt 별 라운드 기록 / 요청 수 / 429 횟수 / tool 호출 병합 수"""
+        summary = super().get_tool_usage_summary()
+        summary["prompt_rounds"] = self.prompt_round_logs
+        summary["requests_sent"] = self.requests_sent
+        summary["rate_limited"] = self.rate_limited
+        if self._tool_executor is not None:
+            summary["coalesced_tool_calls"] = self._tool_executor.coalesced
+        return summary
@@ -15,6 +15,8 @@ from agent.output_parsers import (
     create_multiple_composition_parser,
     create_analysis_parser
 )
+from dft.binary_store import read_composition_strings
+from dft.composition import Composition
 
 
 class AgentState(TypedDict):
@@ -23,7 +25,9 @@ class AgentState(TypedDict):
     search_group: Dict[str, Any]
     prompt: str
     llm_output: str
-    extracted_compositions: List[Dict[str, Any]]  # 여러 조성을 위해 복수형으로 변경
+    extracted_compositions: List[Composition]  # 여러 조성 (정규화 키로 비교·해시되는 dict)
+    streamed_compositions: List[Composition]  # 스트리밍 중 닫는 중괄호가 도착하는 즉시 추출된 조성 (최종 답변 라운드)
+    candidate_energies: List[Dict[str, Any]]  # streamed_compositions 의 에너지 조회 결과 (스트리밍 중 시작)
     extracted_analysis: Dict[str, Any]
     tool_summary: Dict[str, Any]
     result: Dict[str, Any]
@@ -54,8 +58,8 @@ def prepare_search_group_node(state: AgentState) -> AgentState:
     try:
         print("[노드 2] Search group 준비 시작...")
         
-        df = pd.read_csv("data/hydrogen/system_compositions_fraction.csv")
-        search_group_data = df['composition_fraction'][:50].tolist()  # 50개만 사용
+        # 컴파일된 바이너리 저장소가 있으면 CSV 파싱 없이 mmap 으로 읽음
+        search_group_data = read_composition_strings("data/hydrogen", limit=50)  # 50개만 사용
         
         search_group = {
             "count": len(search_group_data),
@@ -97,19 +101,40 @@ def llm_inference_node(state: AgentState) -> AgentState:
         print("[노드 4] LLM 추론 시작... (다중 조성 추천)")
         
         llm_agent = LLMAgent(use_mcp_tools=True)
-        llm_output = llm_agent.ask(state["prompt"])
-        
-        # Tool 사용 통계 수집
-        tool_summary = llm_agent.get_tool_usage_summary()
-        
+        lookups = {}  # 조성 JSON → 에너지 조회 Future (tool 라운드의 초안 조성 포함)
+        
+        def on_composition(composition):
+            # 모델이 나머지 답변을 쓰는 동안 후보 조성의 에너지 조회를 시작
+            key = json.dumps(composition, sort_keys=True)
+            if key not in lookups:
+                lookups[key] = llm_agent.prefetch_energy(composition)
+            print(f"\n[노드 4] 후보 조성 수신: {composition}")
+        
+        print("LLM 응답:")
+        llm_output = llm_agent.ask_stream(
+            state["prompt"],
+            on_text=lambda delta: print(delta, end="", flush=True),
+            on_composition=on_composition
+        )
+        print()
+        
+        # 최종 답변 라운드의 조성만 후보로 사용 (tool 라운드 초안의 조회 결과는 memo 에만 남음)
+        streamed = llm_agent.streamed_compositions
+        energies = {key: lookup.result() for key, lookup in lookups.items()}
         state["llm_output"] = llm_output
-        state["tool_summary"] = tool_summary
+        state["streamed_compositions"] = streamed
+        state["candidate_energies"] = [energies[json.dumps(composition, sort_keys=True)] for composition in streamed]
+        
+        # Tool 사용 통계 수집 (후보 조성 조회까지 끝난 뒤)
+        state["tool_summary"] = llm_agent.get_tool_usage_summary()
         
         # Tool usage log 저장
         llm_agent.save_tool_usage_log()
+        llm_agent.close()
         
-        print("[노드 4] LLM 추론 완료 (MCP tools 사용)")
-        print("LLM 응답:", llm_output)
+        stream_log = llm_agent.stream_log
+        print(f"[노드 4] LLM 추론 완료 (MCP tools 사용, 첫 후보 조성 {stream_log.get('first_composition_ms')}ms, "
+              f"전체 {stream_log.get('total_ms')}ms)")
         
     except Exception as e:
         state["error"] = f"LLM 추론 실패: {str(e)}"
@@ -123,9 +148,11 @@ def extract_compositions_node(state: AgentState) -> AgentState:
     try:
         print("[노드 5] 다중 조성 추출 시작...")
         
-        # MultipleCompositionOutputParser를 사용
-        composition_parser = create_multiple_composition_parser(validation=True)
-        compositions_list = composition_parser.parse(state["llm_output"])
+        # 스트리밍 중 최종 답변에서 이미 추출된 조성이 있으면 재사용, 없으면 MultipleCompositionOutputParser를 사용
+        compositions_list = state.get("streamed_compositions") or []
+        if not compositions_list:
+            composition_parser = create_multiple_composition_parser(validation=True)
+            compositions_list = composition_parser.parse(state["llm_output"])
         
         state["extracted_compositions"] = compositions_list
         
@@ -193,6 +220,7 @@ def save_results_node(state: AgentState) -> AgentState:
             "llm_output": state["llm_output"],
             "extracted_compositions": state["extracted_compositions"],  # 복수형
             "extracted_analysis": state.get("extracted_analysis", {}),
+            "candidate_energies": state.get("candidate_energies", []),
             "mcp_tool_usage": state["tool_summary"],
             "timestamp": state["timestamp"],
             "composition_count": len(state.get("extracted_compositions", []))  # 추가 정보
@@ -229,6 +257,11 @@ def analyze_effectiveness_node(state: AgentState) -> AgentState:
             print(f"  - 성공한 호출: {tool_summary['successful_calls']}")
             print(f"  - 실패한 호출: {tool_summary['failed_calls']}")
             
+            rounds = tool_summary.get('rounds', [])
+            if rounds:
+                print(f"  - tool 라운드: {sum(1 for r in rounds if r['tool_calls'])}회 "
+                      f"(라운드별 ms: {[r['wall_ms'] for r in rounds]})")
+            
             if tool_summary['functions_used']:
                 print(f"  - 사용된 함수들:")
                 for func, count in tool_summary['functions_used'].items():
@@ -4,29 +4,88 @@ import re
 import ast
 import json
 import logging
+import time
+import concurrent.futures
+import functools
 from dotenv import load_dotenv
 import pandas as pd
-from agent.output_parsers import create_composition_parser
+from agent.output_parsers import create_composition_parser, create_incremental_composition_parser
+from agent.response_cache import DEFAULT_CACHE_DIR, ResponseCache
+from agent.tool_memo import DEFAULT_MEMO_PATH, ToolResultMemo
 
 # Set up logging for MCP tool tracking
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("llm_agent_mcp")
 
+# Tool 루프 기본값 (라운드 수, ask 당 tool 호출 수, ask 당 시간(초), 동시 실행 worker 수)
+DEFAULT_MAX_TOOL_ROUNDS = 4
+DEFAULT_MAX_TOOL_CALLS = 16
+DEFAULT_DEADLINE_S = 120.0
+DEFAULT_MAX_TOOL_WORKERS = 4
+# deadline 이 거의 지났을 때도 LLM 요청(tool 라운드, 최종 답변)에 주는 최소 시간 제한(초)
+MIN_REQUEST_TIMEOUT_S = 1.0
+
+# 예산 초과 / deadline 초과로 실행하지 못한 tool call 에 돌려주는 결과
+BUDGET_EXCEEDED_RESULT = {"error": "tool 호출 예산을 모두 사용했습니다. 지금까지의 결과로 답변하세요.", "status": "error"}
+DEADLINE_EXCEEDED_RESULT = {"error": "deadline 안에 tool 실행이 끝나지 않았습니다.", "status": "error"}
+
 class LLMAgent:
-    def __init__(self, use_mcp_tools=False):
+    def __init__(self, use_mcp_tools=False, model="gpt-4o", max_tool_rounds=DEFAULT_MAX_TOOL_ROUNDS,
+                 max_tool_calls=DEFAULT_MAX_TOOL_CALLS, deadline_s=DEFAULT_DEADLINE_S,
+                 max_tool_workers=DEFAULT_MAX_TOOL_WORKERS, cache_mode=None, cache_dir=None,
+                 tool_memo_mode=None, tool_memo_path=None):
+        """
+        Args:
+            use_mcp_tools: DFT 조회 tool 을 LLM 에 제공할지 여부
+            model: 사용할 OpenAI 모델 (tool 라운드와 최종 답변 모두 같은 모델)
+            max_tool_rounds: LLM 호출 → tool 실행 라운드 최대 횟수
+            max_tool_calls: 한 번의 ask 에서 실행할 tool 호출 수 상한
+            deadline_s: 한 번의 ask 의 시간 상한(초) - 넘으면 tool 라운드를 멈추고 남은 시간(최소 MIN_REQUEST_TIMEOUT_S)
+                        안에 최종 답변을 요청 (그 안에 응답이 없으면 openai.APITimeoutError)
+            max_tool_workers: 한 라운드의 tool 호출을 동시에 실행할 worker 스레드 수
+            cache_mode: LLM 응답 캐시 모드 "off" | "readwrite" | "replay" (None 이면 LLM_CACHE_MODE 환경 변수, 기본 off)
+            cache_dir: 캐시 디렉토리 (None 이면 LLM_CACHE_DIR 환경 변수, 기본 cache/llm)
+            tool_memo_mode: 조성별 tool 조회 결과 memo 모드 "off" | "memory" | "persistent" (None 이면 TOOL_MEMO_MODE 환경 변수, 기본 memory)
+            tool_memo_path: 실행 간에 공유하는 memo SQLite 파일 (None 이면 TOOL_MEMO_PATH 환경 변수, 기본 cache/tools/tool_results.sqlite)
+        """
         # key/.env 파일에서 API 키 로드
         load_dotenv("key/.env")
         api_key = os.getenv("OPENAI_API_KEY")
         
-        if not api_key:
+        # 같은 요청(model, messages, tools, sampling 인자)의 응답 디스크 캐시 - LLM_CACHE_MODE=readwrite/replay 로 켬
+        # (기본 off: 같은 prompt 를 반복 실행해 여러 후보를 얻는 탐색 루프가 같은 응답을 받지 않도록)
+        self.response_cache = ResponseCache(
+            cache_dir or os.getenv("LLM_CACHE_DIR", DEFAULT_CACHE_DIR),
+            mode=cache_mode or os.getenv("LLM_CACHE_MODE", "off"),
+        )
+        
+        # 같은 조성의 DFT 조회 / surrogate 예측 결과는 프로세스 내 LRU memo 에서 재사용
+        # (TOOL_MEMO_MODE=persistent 이면 SQLite 파일로 실행 간에도 공유)
+        self.tool_memo = ToolResultMemo(
+            tool_memo_path or os.getenv("TOOL_MEMO_PATH", DEFAULT_MEMO_PATH),
+            mode=tool_memo_mode or os.getenv("TOOL_MEMO_MODE", "memory"),
+        )
+        
+        if not api_key and self.response_cache.mode != "replay":
             raise ValueError("OPENAI_API_KEY가 key/.env 파일에 설정되지 않았습니다.")
         
-        # OpenAI 클라이언트 초기화 (1.0.0+ 버전)
-        self.client = openai.OpenAI(api_key=api_key)
+        # OpenAI 클라이언트 초기화 (1.0.0+ 버전) - replay 모드는 캐시에서만 응답하므로 API 키 없이 동작
+        # 요청마다 남은 deadline 을 timeout 으로 주므로, timeout 된 요청을 client 가 다시 보내지 않도록 재시도는 끔
+        self.client = openai.OpenAI(api_key=api_key, max_retries=0) if api_key else None
         self.use_mcp_tools = use_mcp_tools
+        self.model = model
+        self.max_tool_rounds = max_tool_rounds
+        self.max_tool_calls = max_tool_calls
+        self.deadline_s = deadline_s
+        self.max_tool_workers = max_tool_workers
+        self._tool_pool = None
+        self._stray_tool_calls = set()  # deadline 을 넘겨 결과를 버렸지만 아직 worker 를 점유 중인 tool 호출
         
-        # MCP tool usage tracking
+        # MCP tool usage tracking (round_log: 마지막 ask 의 라운드별 지연 시간, stream_log: 마지막 ask_stream 의 지연 시간)
         self.tool_usage_log = []
+        self.round_log = []
+        self.stream_log = {}
+        self.streamed_compositions = []  # 마지막 ask_stream 의 최종 답변에서 추출된 조성
         
         # OutputParser 초기화
         self.composition_parser = create_composition_parser(validation=True)
@@ -39,7 +98,7 @@ class LLMAgent:
                 "type": "function",
                 "function": {
                     "name": "get_adsorp_energy",
-                    "description": "주어진 조성(composition)에 대한 흡착 에너지를 예측합니다.",
+                    "description": "주어진 조성(composition)에 대한 흡착 에너지를 반환합니다. DFT 데이터가 없으면 not_found 와 가장 가까운 시스템(neighbors)을 반환합니다. (predict=true 이면 surrogate 모델 예측값과 불확실도(uncertainty))",
                     "parameters": {
                         "type": "object",
                         "properties": {
@@ -51,12 +110,71 @@ class LLMAgent:
                                     "minimum": 0,
                                     "maximum": 1
                                 }
+                            },
+                            "predict": {
+                                "type": "boolean",
+                                "description": "DFT 데이터가 없을 때 surrogate 모델 예측값과 불확실도를 반환할지 여부 (기본값: false). 예측 오차(hold-out MAE 약 0.44 eV)가 커서 참고용입니다.",
+                                "default": False
+                            },
+                            "k_neighbors": {
+                                "type": "integer",
+                                "description": "데이터에 없는 조성일 때 함께 반환할 가장 가까운 시스템 수 (기본값: 3)",
+                                "minimum": 0,
+                                "default": 3
+                            },
+                            "reduction": {
+                                "type": "string",
+                                "enum": ["first", "min", "mean", "max"],
+                                "description": "같은 조성의 시스템(표면/흡착 자리)이 여러 개일 때 adsorp_energy로 반환할 값 (first: 데이터 순서상 첫 시스템, min/mean/max: 그룹 집계; 기본값: first). 여러 개이면 energy_stats에 count/min/mean/std/max가 함께 반환됩니다.",
+                                "default": "first"
                             }
                         },
                         "required": ["composition"]
                     }
                 }
             },
+            {
+                "type": "function",
+                "function": {
+                    "name": "get_adsorp_energy_batch",
+                    "description": "여러 조성의 흡착 에너지를 한 번에 조회합니다. 여러 후보를 확인할 때는 get_adsorp_energy를 반복 호출하지 말고 이 도구를 사용하세요.",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "compositions": {
+                                "type": "array",
+                                "description": "촉매 조성 dictionary들의 배열 (예: [{'Pt': 0.5, 'Ru': 0.5}, {'Sc': 0.25, 'Pt': 0.75}])",
+                                "items": {
+                                    "type": "object",
+                                    "additionalProperties": {
+                                        "type": "number",
+                                        "minimum": 0,
+                                        "maximum": 1
+                                    }
+                                }
+                            },
+                            "predict": {
+                                "type": "boolean",
+                                "description": "DFT 데이터가 없을 때 surrogate 모델 예측값과 불확실도를 반환할지 여부 (기본값: false). 예측 오차(hold-out MAE 약 0.44 eV)가 커서 참고용입니다.",
+                                "default": False
+                            },
+                            "k_neighbors": {
+                                "type": "integer",
+                                "description": "데이터에 없는 조성일 때 함께 반환할 가장 가까운 시스템 수 (기본값: 3)",
+                                "minimum": 0,
+                                "default": 3
+                            },
+                            "reduction": {
+                                "type": "string",
+                                "enum": ["first", "min", "mean", "max"],
+                                "description": "같은 조성의 시스템(표면/흡착 자리)이 여러 개일 때 adsorp_energy로 반환할 값 (first: 데이터 순서상 첫 시스템, min/mean/max: 그룹 집계; 기본값: first). 여러 개이면 energy_stats에 count/min/mean/std/max가 함께 반환됩니다.",
+                                "default": "first"
+                            }
+                        },
+                        "required": ["compositions"]
+                    }
+                }
+            },
             {
                 "type": "function", 
                 "function": {
@@ -85,95 +203,268 @@ class LLMAgent:
         # LLM 호출 및 응답 반환 (새로운 API 사용)
         messages = [{"role": "user", "content": prompt}]
         
-        # 목적에 맞게 사용
-        model_type = "gpt-4o"
-        
         if self.use_mcp_tools:
             logger.info("MCP tools를 사용하여 LLM 호출 시작")
-            # MCP tools를 사용하는 경우
-            response = self.client.chat.completions.create(
-                model=model_type, #"gpt-3.5-turbo"
-                messages=messages,
-                tools=self.mcp_tools,
-                tool_choice="auto"
-            )
-            
-            # Tool call이 있는지 확인
-            if response.choices[0].message.tool_calls:
-                tool_count = len(response.choices[0].message.tool_calls)
-                logger.info(f"Tool calls {tool_count}개 감지됨")
-                return self._handle_tool_calls(response, messages)
-            else:
-                logger.info("Tool calls 없음 - 일반 응답 반환")
-                return response.choices[0].message.content
+            return self._run_tool_loop(messages)
         else:
             logger.info("기본 모드로 LLM 호출")
             # 기본 모드
-            response = self.client.chat.completions.create(
-                model=model_type, #"gpt-3.5-turbo"
+            response = self._create_completion(
+                model=self.model, #"gpt-3.5-turbo"
                 messages=messages
             )
             return response.choices[0].message.content
     
-    def _handle_tool_calls(self, response, messages):
-        """Handle tool calls from OpenAI response."""
-        from dft.dft_surrogate_model import get_adsorp_energy_by_composition
+    def ask_stream(self, prompt, on_text=None, on_composition=None):
+        """
+        ask 와 같은 응답을 스트리밍으로 받습니다. (반환값은 최종 답변 전체 텍스트)
+        
+        Args:
+            on_text: 텍스트 조각이 도착할 때마다 호출 on_text(delta)
+            on_composition: composition_N = {...} 의 닫는 중괄호가 도착하는 즉시 호출 on_composition(composition)
+                            (검증·중복 제거된 조성, MultipleCompositionOutputParser 와 같은 결과)
+        
+        tool 라운드에서 모델이 tool 호출 전에 쓴 텍스트도 전달됩니다. 조성 파서는 LLM 호출(라운드)마다 새로 시작하므로
+        on_composition 은 tool 라운드의 초안 조성에도 호출되며, 최종 답변 라운드의 조성만 self.streamed_compositions 에 남습니다.
+        첫 텍스트 / 첫 후보 조성까지의 시간(ms)은 self.stream_log 에 기록됩니다.
+        """
+        started = time.monotonic()
+        parsers = []
+        stream_log = {"first_text_ms": None, "first_composition_ms": None, "compositions": 0, "total_ms": None}
+        self.stream_log = stream_log
+        
+        def start_round():
+            parsers.append(create_incremental_composition_parser(validation=True))
+        
+        def handle_text(delta):
+            if stream_log["first_text_ms"] is None:
+                stream_log["first_text_ms"] = round((time.monotonic() - started) * 1e3, 1)
+            if on_text is not None:
+                on_text(delta)
+            for composition in parsers[-1].feed(delta):
+                stream_log["compositions"] += 1
+                if stream_log["first_composition_ms"] is None:
+                    stream_log["first_composition_ms"] = round((time.monotonic() - started) * 1e3, 1)
+                logger.info(f"스트리밍 후보 조성 {stream_log['compositions']}: {composition}")
+                if on_composition is not None:
+                    on_composition(composition)
+        
+        messages = [{"role": "user", "content": prompt}]
+        if self.use_mcp_tools:
+            logger.info("MCP tools를 사용하여 LLM 스트리밍 호출 시작")
+            content = self._run_tool_loop(messages, on_text=handle_text, on_round=start_round)
+        else:
+            logger.info("기본 모드로 LLM 스트리밍 호출")
+            start_round()
+            response = self._create_completion_stream(handle_text, model=self.model, messages=messages)
+            content = response.choices[0].message.content
+        self.streamed_compositions = list(parsers[-1].compositions)
+        stream_log["total_ms"] = round((time.monotonic() - started) * 1e3, 1)
+        return content
+    
+    def _create_completion(self, timeout=None, **request):
+        """
+        chat.completions.create 호출 (응답 캐시를 거침, replay 모드에서 캐시에 없으면 CacheMissError)
+        timeout(초) 은 요청 시간 제한이며 캐시 키에는 포함되지 않습니다. (None 이면 client 기본값)
+        """
+        options = {} if timeout is None else {"timeout": timeout}
+        return self.response_cache.fetch(
+            request,
+            lambda: self.client.chat.completions.create(**request, **options),
+            to_dict=lambda response: response.model_dump(mode="json"),
+            from_dict=lambda data: openai.types.chat.ChatCompletion.model_validate(data),
+        )
+    
+    def _create_completion_stream(self, on_text, timeout=None, **request):
+        """
+        stream=True 로 chat.completions.create 를 호출하여 텍스트 조각마다 on_text(delta) 를 호출하고,
+        조각들을 합친 ChatCompletion 을 반환합니다. (tool_calls 포함)
+        응답 캐시는 스트리밍이 아닌 요청과 같은 키를 사용하며, 캐시에 있으면 전체 텍스트를 한 번에 전달합니다.
+        timeout(초) 은 스트림 전체의 시간 제한입니다. (넘으면 스트림을 닫고 openai.APITimeoutError)
+        """
+        streamed = []
+        
+        def call():
+            streamed.append(True)
+            return self._stream_completion(request, on_text, timeout)
+        
+        response = self.response_cache.fetch(
+            request,
+            call,
+            to_dict=lambda response: response.model_dump(mode="json"),
+            from_dict=lambda data: openai.types.chat.ChatCompletion.model_validate(data),
+        )
+        content = response.choices[0].message.content
+        if not streamed and content:
+            on_text(content)
+        return response
+    
+    def _stream_completion(self, request, on_text, timeout=None):
+        """스트리밍 chunk 들을 ChatCompletion 하나로 합침 (tool_calls 는 index 별로 arguments 조각을 이어 붙임)"""
+        # client timeout 은 chunk 사이의 읽기 시간에만 걸리므로, 계속 token 을 보내는 응답은 여기서 전체 시간으로 끊음
+        options = {} if timeout is None else {"timeout": timeout}
+        expires = None if timeout is None else time.monotonic() + timeout
+        stream = self.client.chat.completions.create(stream=True, stream_options={"include_usage": True},
+                                                     **request, **options)
+        content = []
+        tool_calls = {}
+        completion = {"object": "chat.completion", "finish_reason": None}
+        for chunk in stream:
+            if expires is not None and time.monotonic() > expires:
+                stream.close()
+                raise openai.APITimeoutError(request=stream.response.request)
+            completion.update(id=chunk.id, created=chunk.created, model=chunk.model)
+            if chunk.usage is not None:
+                completion["usage"] = chunk.usage.model_dump(mode="json")
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            delta = choice.delta
+            if delta.content:
+                content.append(delta.content)
+                on_text(delta.content)
+            for tool_call in delta.tool_calls or []:
+                entry = tool_calls.setdefault(tool_call.index, {"id": None, "type": "function",
+                                                                "function": {"name": "", "arguments": ""}})
+                if tool_call.id:
+                    entry["id"] = tool_call.id
+                if tool_call.function is not None:
+                    entry["function"]["name"] += tool_call.function.name or ""
+                    entry["function"]["arguments"] += tool_call.function.arguments or ""
+            if choice.finish_reason:
+                completion["finish_reason"] = choice.finish_reason
+        
+        message = {"role": "assistant", "content": "".join(content) or None}
+        if tool_calls:
+            message["tool_calls"] = [tool_calls[index] for index in sorted(tool_calls)]
+        finish_reason = completion.pop("finish_reason") or ("tool_calls" if tool_calls else "stop")
+        completion["choices"] = [{"index": 0, "message": message, "finish_reason": finish_reason}]
+        return openai.types.chat.ChatCompletion.model_validate(completion)
+    
+    def _run_tool_loop(self, messages, on_text=None, on_round=None):
+        """
+        Tool 호출이 없을 때까지 (최대 max_tool_rounds 라운드) LLM 호출 → tool 병렬 실행을 반복합니다.
+        deadline(초) 이 지나거나 tool 호출 예산(max_tool_calls)을 다 쓰면 tool 없이 최종 답변을 요청합니다.
+        라운드별 LLM / tool 지연 시간은 self.round_log 에 기록됩니다.
+        on_text 가 주어지면 각 LLM 호출을 스트리밍으로 받아 텍스트 조각마다 on_text(delta) 를 호출합니다.
+        on_round 가 주어지면 각 LLM 호출 직전에 on_round() 를 호출합니다. (라운드별 스트리밍 파서 초기화)
+        tool 라운드의 LLM 요청에는 남은 deadline 을 timeout 으로 주고, 그 안에 응답이 없으면 최종 답변을 요청합니다.
+        최종 답변 요청에도 남은 시간(최소 MIN_REQUEST_TIMEOUT_S)을 timeout 으로 주며, 넘으면 openai.APITimeoutError 가 전달됩니다.
+        """
+        complete = self._create_completion if on_text is None else functools.partial(self._create_completion_stream,
+                                                                                       on_text)
+        started = time.monotonic()
+        deadline = started + self.deadline_s
+        calls_left = self.max_tool_calls
+        self.round_log = []
         
-        # Add assistant message with tool calls
-        messages.append(response.choices[0].message)
+        for round_index in range(1, self.max_tool_rounds + 1):
+            round_started = time.monotonic()
+            if on_round is not None:
+                on_round()
+            try:
+                response = complete(
+                    model=self.model,
+                    messages=messages,
+                    tools=self.mcp_tools,
+                    tool_choice="auto",
+                    timeout=max(deadline - time.monotonic(), MIN_REQUEST_TIMEOUT_S)
+                )
+            except openai.APITimeoutError:
+                logger.info(f"라운드 {round_index}: deadline 안에 LLM 응답 없음 - 최종 답변 요청")
+                break
+            llm_ms = (time.monotonic() - round_started) * 1e3
+            message = response.choices[0].message
+            
+            # Tool call이 있는지 확인
+            if not message.tool_calls:
+                logger.info(f"라운드 {round_index}: Tool calls 없음 - 응답 반환")
+                self.round_log.append({"round": round_index, "tool_calls": 0, "llm_ms": round(llm_ms, 1),
+                                       "tools_ms": 0.0, "wall_ms": round(llm_ms, 1)})
+                return message.content
+            
+            tool_count = len(message.tool_calls)
+            logger.info(f"라운드 {round_index}: Tool calls {tool_count}개 감지됨")
+            messages.append(message)
+            tools_started = time.monotonic()
+            self._handle_tool_calls(message.tool_calls, messages, round_index, calls_left, deadline)
+            calls_left -= min(tool_count, calls_left)
+            tools_ms = (time.monotonic() - tools_started) * 1e3
+            self.round_log.append({"round": round_index, "tool_calls": tool_count, "llm_ms": round(llm_ms, 1),
+                                   "tools_ms": round(tools_ms, 1),
+                                   "wall_ms": round((time.monotonic() - round_started) * 1e3, 1)})
+            
+            if calls_left <= 0 or time.monotonic() >= deadline:
+                logger.info(f"Tool 루프 종료: {'tool 호출 예산 소진' if calls_left <= 0 else 'deadline 초과'}")
+                break
         
+        # 라운드 상한/예산/deadline 도달 - 같은 모델에 tool 없이 최종 답변 요청
+        final_started = time.monotonic()
+        if on_round is not None:
+            on_round()
+        final_response = complete(
+            model=self.model,
+            messages=messages,
+            tools=self.mcp_tools,
+            tool_choice="none",
+            timeout=max(deadline - time.monotonic(), MIN_REQUEST_TIMEOUT_S)
+        )
+        final_ms = (time.monotonic() - final_started) * 1e3
+        self.round_log.append({"round": len(self.round_log) + 1, "tool_calls": 0, "llm_ms": round(final_ms, 1),
+                               "tools_ms": 0.0, "wall_ms": round(final_ms, 1)})
+        logger.info(f"Tool 루프 완료: {len(self.round_log)} 라운드, {(time.monotonic() - started):.1f}s")
+        return final_response.choices[0].message.content
+    
+    def _handle_tool_calls(self, tool_calls, messages, round_index=1, calls_left=None, deadline=None):
+        """
+        한 라운드의 tool call 들을 worker 스레드 풀에서 동시에 실행하고, 호출 순서대로 tool 메시지를 추가합니다.
+        예산(calls_left)을 넘는 호출과 deadline 까지 끝나지 않은 호출에는 오류 결과를 돌려줍니다.
+        """
+        calls_left = len(tool_calls) if calls_left is None else calls_left
+        pool = self._get_tool_pool()
+        futures = []
+        for i, tool_call in enumerate(tool_calls):
+            if i >= calls_left:
+                futures.append(None)
+                continue
+            futures.append(pool.submit(self._execute_tool_call, tool_call.function.name,
+                                       tool_call.function.arguments))
+        
+        outcomes = []
+        for future in futures:
+            if future is None:
+                outcomes.append((None, dict(BUDGET_EXCEEDED_RESULT), False, 0.0))
+                continue
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+            try:
+                outcomes.append(future.result(timeout=timeout))
+            except concurrent.futures.TimeoutError:
+                # 아직 시작하지 않은 호출은 취소, 실행 중인 호출은 결과를 버리고 끝날 때까지 점유 중인 worker 로 기록
+                if not future.cancel():
+                    self._stray_tool_calls.add(future)
+                    future.add_done_callback(self._stray_tool_calls.discard)
+                outcomes.append((None, dict(DEADLINE_EXCEEDED_RESULT), False, None))
+        self._record_tool_results(tool_calls, outcomes, messages, round_index)
+    
+    def _record_tool_results(self, tool_calls, outcomes, messages, round_index):
+        """tool 실행 결과 (arguments, result, 성공 여부, 지연 시간 ms) 를 호출 순서대로 로그와 tool 메시지에 추가"""
         successful_calls = 0
         failed_calls = 0
-        
-        # Execute each tool call
-        for i, tool_call in enumerate(response.choices[0].message.tool_calls):
+        for tool_call, (arguments, result, ok, latency_ms) in zip(tool_calls, outcomes):
             function_name = tool_call.function.name
-            arguments = json.loads(tool_call.function.arguments)
-            
-            tool_usage_entry = {
+            self.tool_usage_log.append({
                 "function_name": function_name,
                 "arguments": arguments,
-                "timestamp": json.dumps(pd.Timestamp.now(), default=str)
-            }
-            
-            if function_name == "get_adsorp_energy":
-                composition = arguments.get("composition")
-                energy = get_adsorp_energy_by_composition(composition)
-                
-                result = {
-                    "composition": composition,
-                    "adsorp_energy": energy,
-                    "status": "success" if energy is not None else "not_found"
-                }
-                
-                tool_usage_entry["result"] = result
-                if energy is not None:
-                    successful_calls += 1
-                else:
-                    failed_calls += 1
-                
-            elif function_name == "check_composition_exists":
-                composition = arguments.get("composition")
-                energy = get_adsorp_energy_by_composition(composition)
-                
-                result = {
-                    "composition": composition,
-                    "exists": energy is not None,
-                    "status": "success"
-                }
-                if energy is not None:
-                    result["adsorp_energy"] = energy
-                
-                tool_usage_entry["result"] = result
+                "timestamp": json.dumps(pd.Timestamp.now(), default=str),
+                "round": round_index,
+                "latency_ms": None if latency_ms is None else round(latency_ms, 2),
+                "result": result
+            })
+            if ok:
                 successful_calls += 1
-            
             else:
-                result = {"error": f"Unknown function: {function_name}"}
-                tool_usage_entry["result"] = result
                 failed_calls += 1
             
-            self.tool_usage_log.append(tool_usage_entry)
-            
             # Add tool result to messages
             messages.append({
                 "tool_call_id": tool_call.id,
@@ -185,25 +476,123 @@ class LLMAgent:
         # 간략한 요약 로그만 출력
         total_calls = successful_calls + failed_calls
         logger.info(f"Tool calls 처리 완료: {total_calls}개 (성공: {successful_calls}, 실패: {failed_calls})")
+    
+    def _get_tool_pool(self):
+        """
+        tool 실행용 스레드 풀 (처음 사용할 때 생성하여 재사용)
+        deadline 을 넘긴 호출이 아직 worker 를 점유 중이면, 그 풀은 남은 작업만 끝내고 종료하도록 두고
+        max_tool_workers 개의 worker 가 모두 비어 있는 새 풀을 만듭니다.
+        """
+        if self._tool_pool is not None and self._stray_tool_calls:
+            logger.info(f"deadline 을 넘긴 tool 호출 {len(self._stray_tool_calls)}개가 실행 중 - 새 tool 스레드 풀 사용")
+            self._tool_pool.shutdown(wait=False)
+            self._tool_pool = None
+            self._stray_tool_calls = set()
+        if self._tool_pool is None:
+            self._tool_pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_tool_workers, thread_name_prefix="llm-agent-tool")
+        return self._tool_pool
+    
+    def _execute_tool_call(self, function_name, raw_arguments):
+        """tool 하나를 실행 (worker 스레드) -> (arguments, result, 성공 여부, 지연 시간 ms)"""
+        started = time.perf_counter()
+        try:
+            arguments = json.loads(raw_arguments or "{}")
+        except json.JSONDecodeError as e:
+            return raw_arguments, {"error": f"arguments JSON 파싱 실패: {e}", "status": "error"}, False, 0.0
+        try:
+            result, ok = self._execute_tool(function_name, arguments)
+        except Exception as e:
+            logger.error(f"Tool {function_name} 실행 실패: {e}")
+            result, ok = {"error": str(e), "status": "error"}, False
+        return arguments, result, ok, (time.perf_counter() - started) * 1e3
+    
+    def _execute_tool(self, function_name, arguments):
+        """tool 이름과 인자로 DFT 조회를 실행 -> (result, 성공 여부) - 조성별 결과는 self.tool_memo 를 거침"""
+        if function_name == "get_adsorp_energy":
+            composition = arguments.get("composition")
+            result = self._lookup_energies(
+                [composition],
+                k_neighbors=arguments.get("k_neighbors", 3),
+                predict=arguments.get("predict", False),
+                reduction=arguments.get("reduction", "first")
+            )[0]
+            return result, result["adsorp_energy"] is not None
+            
+        elif function_name == "get_adsorp_energy_batch":
+            compositions = arguments.get("compositions") or []
+            results = self._lookup_energies(
+                compositions,
+                k_neighbors=arguments.get("k_neighbors", 3),
+                predict=arguments.get("predict", False),
+                reduction=arguments.get("reduction", "first")
+            )
+            found = sum(1 for r in results if r["status"] == "success")
+            predicted = sum(1 for r in results if r["status"] == "predicted")
+            
+            result = {
+                "results": results,
+                "total": len(results),
+                "found": found,
+                "predicted": predicted,
+                "not_found": len(results) - found - predicted,
+                "status": "success" if results else "not_found"
+            }
+            return result, bool(found or predicted)
+            
+        elif function_name == "check_composition_exists":
+            composition = arguments.get("composition")
+            match = self._lookup_energies([composition])[0]
+            energy = match["adsorp_energy"] if match["status"] == "success" else None
+            
+            result = {
+                "composition": composition,
+                "exists": energy is not None,
+                "status": "success"
+            }
+            if energy is not None:
+                result["adsorp_energy"] = energy
+            return result, True
         
-        # Get final response from model
-        final_response = self.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=messages
-        )
+        return {"error": f"Unknown function: {function_name}"}, False
+    
+    def prefetch_energy(self, composition, k_neighbors=3, predict=False):
+        """
+        후보 조성의 에너지 조회(get_adsorp_energy 와 같은 결과)를 tool 스레드 풀에서 시작하고 Future 를 반환합니다.
+        ask_stream 의 on_composition 에서 호출하면 모델이 답변을 쓰는 동안 조회가 진행되며, 결과는 tool memo 에 남습니다.
+        """
+        return self._get_tool_pool().submit(
+            lambda: self._lookup_energies([composition], k_neighbors=k_neighbors, predict=predict)[0])
+    
+    def _lookup_energies(self, compositions, k_neighbors=0, predict=False, reduction="first"):
+        """get_adsorp_energies 와 같은 결과 목록 - memo 에 없는 조성만 데이터/surrogate 로 조회"""
+        from dft.dft_surrogate_model import get_adsorp_energies
         
-        return final_response.choices[0].message.content
+        return self.tool_memo.lookup(
+            compositions, reduction, k_neighbors, predict,
+            lambda missing: get_adsorp_energies(missing, k_neighbors=k_neighbors, predict=predict,
+                                                reduction=reduction)
+        )
     
     def get_tool_usage_summary(self):
         """MCP tool 사용 통계 반환"""
         if not self.tool_usage_log:
-            return {"total_calls": 0, "functions_used": {}}
+            return {"total_calls": 0, "functions_used": {}, "rounds": self.round_log,
+                    "llm_cache": self.response_cache.stats(), "tool_memo": self.tool_memo.stats(),
+                    "stream": self.stream_log}
         
         summary = {
             "total_calls": len(self.tool_usage_log),
             "functions_used": {},
             "successful_calls": 0,
-            "failed_calls": 0
+            "failed_calls": 0,
+            # 마지막 ask 의 라운드별 tool 호출 수와 LLM / tool / 전체 지연 시간(ms)
+            "rounds": self.round_log,
+            "llm_cache": self.response_cache.stats(),
+            # 조성별 조회 결과 memo 의 LRU / SQLite 적중 수와 미스 수
+            "tool_memo": self.tool_memo.stats(),
+            # 마지막 ask_stream 의 첫 텍스트 / 첫 후보 조성까지의 시간(ms)
+            "stream": self.stream_log
         }
         
         for entry in self.tool_usage_log:
@@ -212,13 +601,21 @@ class LLMAgent:
                 summary["functions_used"][func_name] = 0
             summary["functions_used"][func_name] += 1
             
-            if entry["result"].get("status") in ["success", "not_found"]:
+            if entry["result"].get("status") in ["success", "predicted", "not_found"]:
                 summary["successful_calls"] += 1
             else:
                 summary["failed_calls"] += 1
         
         return summary
     
+    def close(self):
+        """tool 스레드 풀과 tool memo 를 닫음 (실행 중인 tool 호출은 기다리지 않음)"""
+        if self._tool_pool is not None:
+            self._tool_pool.shutdown(wait=False)
+            self._tool_pool = None
+            self._stray_tool_calls = set()
+        self.tool_memo.close()
+    
     def save_tool_usage_log(self, filepath="logs/mcp_tool_usage.json"):
         """MCP tool 사용 로그를 파일로 저장"""
         import os
@@ -4,12 +4,14 @@ LLM 출력을 구조화된 데이터로 파싱하는 파서들을 정의합니
 """
 
 import re
-import ast
 import json
 from abc import ABC, abstractmethod
 from typing import Any, Dict, Optional, Union, List
 import logging
 
+from dft.composition import Composition
+from dft.composition_codec import parse_composition
+
 logger = logging.getLogger(__name__)
 
 
@@ -76,7 +78,7 @@ class CompositionOutputParser(BaseOutputParser):
     
     def _parse_direct_dict(self, text: str) -> Optional[Dict[str, float]]:
         """직접 dictionary 형태인지 확인"""
-        composition = ast.literal_eval(text.strip())
+        composition = parse_composition(text.strip())
         return composition if isinstance(composition, dict) else None
     
     def _parse_composition_section(self, text: str) -> Optional[Dict[str, float]]:
@@ -84,7 +86,7 @@ class CompositionOutputParser(BaseOutputParser):
         pattern = r'\*\*COMPOSITION:\*\*\s*\n\s*composition\s*=\s*(\{[^}]*\})'
         matches = re.findall(pattern, text, re.DOTALL | re.IGNORECASE)
         for match in matches:
-            composition = ast.literal_eval(match)
+            composition = parse_composition(match)
             if isinstance(composition, dict):
                 return composition
         return None
@@ -94,7 +96,7 @@ class CompositionOutputParser(BaseOutputParser):
         pattern = r'composition\s*=\s*(\{[^}]*\})'
         matches = re.findall(pattern, text, re.IGNORECASE)
         for match in matches:
-            composition = ast.literal_eval(match)
+            composition = parse_composition(match)
             if isinstance(composition, dict):
                 return composition
         return None
@@ -104,7 +106,7 @@ class CompositionOutputParser(BaseOutputParser):
         pattern = r'```(?:python)?\s*(\{.*?\})\s*```'
         matches = re.findall(pattern, text, re.DOTALL)
         for match in matches:
-            composition = ast.literal_eval(match)
+            composition = parse_composition(match)
             if isinstance(composition, dict):
                 return composition
         return None
@@ -114,7 +116,7 @@ class CompositionOutputParser(BaseOutputParser):
         pattern = r'```(?:python)?\s*composition\s*=\s*(\{[^}]*\})\s*```'
         matches = re.findall(pattern, text, re.DOTALL | re.IGNORECASE)
         for match in matches:
-            composition = ast.literal_eval(match)
+            composition = parse_composition(match)
             if isinstance(composition, dict):
                 return composition
         return None
@@ -124,7 +126,7 @@ class CompositionOutputParser(BaseOutputParser):
         pattern = r'조성\s*[:：]\s*(\{.*?\})'
         matches = re.findall(pattern, text, re.DOTALL)
         for match in matches:
-            composition = ast.literal_eval(match)
+            composition = parse_composition(match)
             if isinstance(composition, dict):
                 return composition
         return None
@@ -134,12 +136,12 @@ class CompositionOutputParser(BaseOutputParser):
         pattern = r'\{[^{}]*"[A-Za-z]+"[^{}]*:[^{}]*\d+\.?\d*[^{}]*\}'
         matches = re.findall(pattern, text)
         for match in matches:
-            composition = ast.literal_eval(match)
+            composition = parse_composition(match)
             if isinstance(composition, dict):
                 return composition
         return None
     
-    def _validate_composition(self, composition: Dict[str, float]) -> Optional[Dict[str, float]]:
+    def _validate_composition(self, composition: Dict[str, float]) -> Optional[Composition]:
         """조성의 유효성을 검증"""
         if not isinstance(composition, dict):
             return None
@@ -159,7 +161,12 @@ class CompositionOutputParser(BaseOutputParser):
             logger.warning(f"Composition fractions sum to {total}, not 1.0")
             return None
         
-        return composition
+        # 정규화 키를 가진 변경 불가능한 조성으로 반환 (비교·중복 제거가 O(1))
+        try:
+            return Composition.coerce(composition)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Invalid composition: {e}")
+            return None
     
     def get_format_instructions(self) -> str:
         """파서가 예상하는 출력 형식 지침"""
@@ -200,7 +207,7 @@ class MultipleCompositionOutputParser(BaseOutputParser):
             text: LLM의 출력 텍스트
             
         Returns:
-            촉매 조성 딕셔너리들의 리스트
+            촉매 조성 딕셔너리(Composition)들의 리스트
         """
         compositions = []
         
@@ -214,10 +221,21 @@ class MultipleCompositionOutputParser(BaseOutputParser):
         if individual_compositions:
             compositions.extend(individual_compositions)
         
-        # 중복 제거 (같은 조성이 여러 번 파싱된 경우)
+        # 중복 제거 (같은 조성이 여러 번 파싱된 경우) - Composition 의 정규화 키 해시로 O(1) 비교
         unique_compositions = []
+        seen = set()
         for comp in compositions:
-            if comp and comp not in unique_compositions:
+            if not comp:
+                continue
+            try:
+                comp = Composition.coerce(comp)
+            except (TypeError, ValueError):
+                # validation=False 에서 숫자가 아닌 분율 - 일반 dict 로 비교
+                if comp not in unique_compositions:
+                    unique_compositions.append(comp)
+                continue
+            if comp not in seen:
+                seen.add(comp)
                 unique_compositions.append(comp)
         
         logger.info(f"Parsed {len(unique_compositions)} unique compositions")
@@ -239,7 +257,7 @@ class MultipleCompositionOutputParser(BaseOutputParser):
         
         for match in matches:
             try:
-                composition = ast.literal_eval(match)
+                composition = parse_composition(match)
                 if isinstance(composition, dict):
                     if self.validation:
                         validated = self._validate_composition(composition)
@@ -263,7 +281,7 @@ class MultipleCompositionOutputParser(BaseOutputParser):
         
         for match in matches:
             try:
-                composition = ast.literal_eval(match)
+                composition = parse_composition(match)
                 if isinstance(composition, dict):
                     if self.validation:
                         validated = self._validate_composition(composition)
@@ -307,6 +325,93 @@ composition_3 = {"Pd": 0.5, "Ag": 0.5}
 """
 
 
+class IncrementalCompositionParser:
+    """
+    스트리밍 중인 LLM 출력에서 composition_N = {...} 를 닫는 중괄호가 도착하는 즉시 추출하는 파서
+    (MultipleCompositionOutputParser 와 같은 패턴 / 검증 / 중복 제거)
+    
+    사용법:
+        parser = IncrementalCompositionParser()
+        for delta in stream:
+            for composition in parser.feed(delta):
+                ...  # 새로 완성된 조성
+    """
+    
+    PATTERN = re.compile(r'composition_\d+\s*=\s*(\{[^}]*\})', re.IGNORECASE)
+    START = re.compile(r'composition_', re.IGNORECASE)
+    # 텍스트 끝에서 아직 완성되지 않은 composition_N = {... (다음 조각이 오면 PATTERN 이 될 수 있는 부분)
+    PARTIAL = re.compile(r'composition_(?:\d+(?:\s*(?:=\s*(?:\{[^}]*)?)?)?)?', re.IGNORECASE)
+    # 시작 표지가 없을 때 남겨 둘 꼬리 길이 ("composition_" 이 두 chunk 에 걸쳐 도착하는 경우)
+    _TAIL = len("composition_")
+    
+    def __init__(self, validation: bool = True):
+        """
+        Args:
+            validation: 파싱된 조성의 유효성을 검증할지 여부
+        """
+        self.validation = validation
+        self.single_parser = CompositionOutputParser(validation=validation)
+        self.compositions: List[Dict[str, float]] = []
+        self._chunks: List[str] = []
+        self._pending = ""
+        self._seen = set()
+    
+    @property
+    def text(self) -> str:
+        """지금까지 받은 전체 텍스트"""
+        return "".join(self._chunks)
+    
+    def feed(self, chunk: str) -> List[Dict[str, float]]:
+        """
+        텍스트 조각을 추가하고 이번에 새로 완성된 조성 목록을 반환합니다.
+        아직 완성되지 않은 composition_N = {... 은 다음 조각까지 보관하므로 전체 텍스트를 다시 검색하지 않습니다.
+        """
+        if not chunk:
+            return []
+        self._chunks.append(chunk)
+        pending = self._pending + chunk
+        completed = []
+        end = 0
+        for match in self.PATTERN.finditer(pending):
+            end = match.end()
+            composition = self._accept(match.group(1))
+            if composition is not None:
+                completed.append(composition)
+        
+        # 완성된 패턴 뒤에서 아직 닫히지 않은 composition_N = {... 부터 보관 (없으면 짧은 꼬리만)
+        start = None
+        for match in self.START.finditer(pending, end):
+            if self.PARTIAL.fullmatch(pending, match.start()):
+                start = match.start()
+                break
+        if start is None:
+            start = max(end, len(pending) - self._TAIL)
+        self._pending = pending[start:]
+        return completed
+    
+    def _accept(self, dict_text: str) -> Optional[Dict[str, float]]:
+        try:
+            composition = parse_composition(dict_text)
+        except Exception as e:
+            logger.debug(f"Failed to parse streamed composition {dict_text}: {e}")
+            return None
+        if not isinstance(composition, dict):
+            return None
+        if self.validation:
+            composition = self.single_parser._validate_composition(composition)
+            if not composition:
+                return None
+        try:
+            key = Composition.coerce(composition)
+        except (TypeError, ValueError):
+            key = json.dumps(composition, sort_keys=True, default=str)
+        if key in self._seen:
+            return None
+        self._seen.add(key)
+        self.compositions.append(composition)
+        return composition
+
+
 class EnhancedAnalysisOutputParser(BaseOutputParser):
     """향상된 분석 결과 파서 (여러 조성 지원)"""
     
@@ -379,6 +484,11 @@ def create_multiple_composition_parser(validation: bool = True) -> MultipleCompo
     return MultipleCompositionOutputParser(validation=validation)
 
 
+def create_incremental_composition_parser(validation: bool = True) -> IncrementalCompositionParser:
+    """IncrementalCompositionParser 팩토리 함수"""
+    return IncrementalCompositionParser(validation=validation)
+
+
 def create_analysis_parser() -> EnhancedAnalysisOutputParser:
     """AnalysisOutputParser 팩토리 함수"""
     return EnhancedAnalysisOutputParser()
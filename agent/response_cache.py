@@ -0,0 +1,204 @@
+"""
+LLM response cache
+
+chat.completions.create 요청을 (model, messages, tools, tool_choice, sampling 인자 등) 전체의 해시로 식별하여
+응답을 디스크(cache_dir/<sha256>.json)에 저장하는 content-addressed 캐시입니다.
+context, search group, tool 정의가 같은 실험을 다시 실행하면 OpenAI 호출 없이 저장된 응답을 그대로 사용합니다.
+
+모드:
+- off:       캐시 사용 안 함 (기본값 - 같은 prompt 를 다시 실행하면 새 응답을 받음)
+- readwrite: 캐시에 있으면 사용, 없으면 API 호출 후 저장
+- replay:    캐시에서만 응답 (없으면 CacheMissError) - API 키 없이 오프라인으로 결정적 재실행
+
+용량은 max_entries / max_bytes 로 제한되며, 넘치면 가장 오래 사용되지 않은(LRU) 항목부터 삭제합니다.
+사용 시각은 파일 mtime 으로 기록하므로 프로세스를 다시 시작해도 LRU 순서가 유지됩니다.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CACHE_MODES = ("off", "readwrite", "replay")
+DEFAULT_CACHE_DIR = "cache/llm"
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_MAX_BYTES = 512 * 2 ** 20
+# 저장 형식이나 키 규칙이 바뀌면 올려서 이전 항목을 무효화
+CACHE_FORMAT_VERSION = 1
+
+
+class CacheMissError(RuntimeError):
+    """replay 모드에서 캐시에 없는 요청"""
+
+
+def _normalize(value: Any) -> Any:
+    """요청 인자를 JSON 으로 직렬화할 수 있는 값으로 변환 (pydantic 메시지 객체 포함)"""
+    if hasattr(value, "model_dump"):
+        return _normalize(value.model_dump(mode="json", exclude_none=True))
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def request_key(request: Dict[str, Any]) -> str:
+    """요청 인자 전체(model, messages, tools, sampling 인자 등)의 sha256 hex"""
+    payload = json.dumps({"version": CACHE_FORMAT_VERSION, "request": _normalize(request)},
+                         sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """디스크 기반 content-addressed LLM 응답 캐시 (스레드 안전)"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, mode: str = "off",
+                 max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"cache mode 는 {CACHE_MODES} 중 하나여야 합니다: {mode!r}")
+        self.cache_dir = cache_dir
+        self.mode = mode
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key → (파일 크기, 마지막 사용 시각)
+        self._entries: Dict[str, Tuple[int, float]] = {}
+        self._total_bytes = 0
+
+        # 관측용 카운터
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+        if mode != "off" and os.path.isdir(cache_dir):
+            for entry in os.scandir(cache_dir):
+                if entry.is_file() and entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    self._entries[entry.name[:-5]] = (stat.st_size, stat.st_mtime)
+                    self._total_bytes += stat.st_size
+            logger.info(f"LLM 응답 캐시 {len(self._entries)}개 로드 ({cache_dir}, mode={mode})")
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """저장된 응답 dictionary (없으면 None) - 사용 시각을 갱신"""
+        with self._lock:
+            if key not in self._entries:
+                return None
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                stored = json.load(f)
+            now = time.time()
+            os.utime(path, (now, now))
+        except (OSError, ValueError) as e:
+            logger.warning(f"LLM 응답 캐시 항목을 읽을 수 없습니다 ({path}): {e}")
+            with self._lock:
+                self._drop(key)
+            return None
+        with self._lock:
+            if key in self._entries:
+                self._entries[key] = (self._entries[key][0], now)
+        return stored.get("response")
+
+    def put(self, key: str, response: Dict[str, Any], request: Optional[Dict[str, Any]] = None):
+        """응답을 저장하고 용량을 넘으면 LRU 항목을 삭제"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        data = {"version": CACHE_FORMAT_VERSION, "created": time.time(), "response": response}
+        if request is not None:
+            data["model"] = request.get("model")
+        tmp_path = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        size = os.path.getsize(path)
+        with self._lock:
+            self._drop(key, remove_file=False)
+            self._entries[key] = (size, time.time())
+            self._total_bytes += size
+            self.stores += 1
+            self._evict()
+
+    def _drop(self, key: str, remove_file: bool = True):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._total_bytes -= entry[0]
+        if remove_file:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def _evict(self):
+        if len(self._entries) <= self.max_entries and self._total_bytes <= self.max_bytes:
+            return
+        for key, _ in sorted(self._entries.items(), key=lambda item: item[1][1]):
+            if len(self._entries) <= self.max_entries and self._total_bytes <= self.max_bytes:
+                break
+            if len(self._entries) == 1:
+                break  # 방금 저장한 항목 하나는 남김
+            self._drop(key)
+            self.evictions += 1
+
+    def fetch(self, request: Dict[str, Any], call: Callable[[], Any],
+              to_dict: Callable[[Any], Dict[str, Any]], from_dict: Callable[[Dict[str, Any]], Any]) -> Any:
+        """
+        캐시에 있으면 from_dict(저장된 응답), 없으면 call() 결과를 to_dict 로 저장한 뒤 반환합니다.
+        replay 모드에서 캐시에 없으면 CacheMissError 를 발생시킵니다.
+        """
+        if self.mode == "off":
+            return call()
+        key = request_key(request)
+        stored = self.get(key)
+        if stored is not None:
+            self.hits += 1
+            return from_dict(stored)
+        self.misses += 1
+        if self.mode == "replay":
+            raise CacheMissError(f"replay 모드: 캐시에 없는 LLM 요청입니다 (key={key[:12]}, model={request.get('model')})")
+        response = call()
+        self.put(key, to_dict(response), request)
+        return response
+
+    async def fetch_async(self, request: Dict[str, Any], call: Callable[[], Awaitable[Any]],
+                          to_dict: Callable[[Any], Dict[str, Any]],
+                          from_dict: Callable[[Dict[str, Any]], Any]) -> Any:
+        """
+        fetch 의 async 버전 (call 은 coroutine 을 반환하는 함수)
+        키 계산과 파일 읽기/쓰기는 asyncio.to_thread 로 실행하여 event loop 를 막지 않습니다.
+        """
+        if self.mode == "off":
+            return await call()
+        key = await asyncio.to_thread(request_key, request)
+        stored = await asyncio.to_thread(self.get, key)
+        if stored is not None:
+            self.hits += 1
+            return from_dict(stored)
+        self.misses += 1
+        if self.mode == "replay":
+            raise CacheMissError(f"replay 모드: 캐시에 없는 LLM 요청입니다 (key={key[:12]}, model={request.get('model')})")
+        response = await call()
+        await asyncio.to_thread(self.put, key, to_dict(response), request)
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,202 @@
+"""
+Tool result memoization
+
+LLM 은 같은 조성을 여러 라운드, 여러 실행에 걸쳐 반복해서 조회합니다. (get_adsorp_energy, check_composition_exists,
+get_adsorp_energy_batch) 조성별 조회 결과를 정규화 조성 키(dft.composition.Composition.key)와 조회 인자
+(reduction, k_neighbors, predict)로 식별하여 저장해 두고, 같은 조회는 데이터 파일이나 인덱스를 거치지 않고 반환합니다.
+
+- 1차: 프로세스 내 LRU (max_entries)
+- 2차: 실행 간에 공유되는 SQLite 파일 (mode="persistent", 선택)
+
+LRU 에는 결과의 깊은 복사본을 저장하고 조회할 때도 복사본을 반환하므로, 호출자가 결과(neighbors, group 등)를
+수정해도 memo 에 남은 값은 바뀌지 않습니다.
+
+저장된 결과는 데이터셋 지문(원본 CSV, 바이너리 저장소, surrogate 모델 meta.json 의 mtime/size)별로 구분되며,
+데이터나 모델이 바뀌면 이전 지문의 항목은 사용하지 않고 파일을 열 때 삭제합니다.
+
+모드:
+- off:        memoization 사용 안 함
+- memory:     프로세스 내 LRU 만 사용 (기본값)
+- persistent: LRU + SQLite
+"""
+
+import copy
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from dft.binary_store import STORE_DIRNAME
+from dft.composition import Composition
+from dft.composition_index import DEFAULT_COMP_CSV_PATH, DEFAULT_INFO_CSV_PATH
+from dft.surrogate_regressor import DEFAULT_MODEL_DIR
+
+logger = logging.getLogger(__name__)
+
+MEMO_MODES = ("off", "memory", "persistent")
+DEFAULT_MEMO_PATH = "cache/tools/tool_results.sqlite"
+DEFAULT_MAX_ENTRIES = 50000
+# 결과 형식이나 키 규칙이 바뀌면 올려서 이전 항목을 무효화
+MEMO_FORMAT_VERSION = 2
+# 다시 조회해도 같은 결과가 나오는 status 만 저장 ("invalid" 등은 저장하지 않음)
+_MEMO_STATUSES = ("success", "predicted", "not_found")
+
+
+def dataset_fingerprint(comp_csv_path: str = DEFAULT_COMP_CSV_PATH, info_csv_path: str = DEFAULT_INFO_CSV_PATH,
+                        model_dir: str = DEFAULT_MODEL_DIR) -> str:
+    """조회 결과를 결정하는 파일들의 (mtime, size) 지문 - 파일 내용은 읽지 않음"""
+    paths = [comp_csv_path, info_csv_path,
+             os.path.join(os.path.dirname(comp_csv_path), STORE_DIRNAME, "meta.json"),
+             os.path.join(model_dir, "meta.json")]
+    fingerprint = [MEMO_FORMAT_VERSION]
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            fingerprint.append([path, stat.st_mtime_ns, stat.st_size])
+        except OSError:
+            fingerprint.append([path, None])
+    return json.dumps(fingerprint, separators=(",", ":"))
+
+
+class ToolResultMemo:
+    """조성별 tool 조회 결과의 2단계(LRU + SQLite) memo (스레드 안전)"""
+
+    def __init__(self, path: str = DEFAULT_MEMO_PATH, mode: str = "memory",
+                 max_entries: int = DEFAULT_MAX_ENTRIES, fingerprint: Optional[str] = None):
+        """
+        Args:
+            path: SQLite 파일 경로 (mode="persistent" 일 때)
+            mode: "off" | "memory" | "persistent"
+            max_entries: 프로세스 내 LRU 항목 수 상한
+            fingerprint: 데이터셋 지문 (None 이면 기본 데이터 경로로 계산)
+        """
+        if mode not in MEMO_MODES:
+            raise ValueError(f"tool memo mode 는 {MEMO_MODES} 중 하나여야 합니다: {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.max_entries = max_entries
+        self.fingerprint = fingerprint or dataset_fingerprint()
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+
+        # 관측용 카운터 (hits: LRU, persistent_hits: SQLite)
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.stores = 0
+
+        if mode == "persistent":
+            self._open()
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # worker 스레드들이 함께 사용하므로 check_same_thread=False, 접근은 self._lock 으로 직렬화
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        with self._db:
+            self._db.execute("CREATE TABLE IF NOT EXISTS results ("
+                             "dataset TEXT NOT NULL, key TEXT NOT NULL, result TEXT NOT NULL, "
+                             "PRIMARY KEY (dataset, key))")
+            stale = self._db.execute("DELETE FROM results WHERE dataset != ?", (self.fingerprint,)).rowcount
+        count = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        logger.info(f"tool 결과 memo {count}개 로드 ({self.path}, 이전 데이터셋 항목 {stale}개 삭제)")
+
+    @staticmethod
+    def make_key(composition: Composition, reduction: str, k_neighbors: int, predict: bool) -> str:
+        return json.dumps([composition.key, reduction, k_neighbors, bool(predict)], separators=(",", ":"))
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """저장된 결과의 복사본 (없으면 None) - SQLite 에서 찾으면 LRU 로 올림"""
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(result)
+            if self._db is not None:
+                row = self._db.execute("SELECT result FROM results WHERE dataset = ? AND key = ?",
+                                       (self.fingerprint, key)).fetchone()
+                if row is not None:
+                    result = json.loads(row[0])
+                    self._remember(key, copy.deepcopy(result))
+                    self.persistent_hits += 1
+                    return result
+            self.misses += 1
+            return None
+
+    def put_many(self, items: Sequence[tuple]):
+        """(key, result) 목록의 복사본을 저장 (SQLite 는 한 transaction)"""
+        if not items:
+            return
+        with self._lock:
+            for key, result in items:
+                self._remember(key, copy.deepcopy(result))
+            if self._db is not None:
+                with self._db:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO results (dataset, key, result) VALUES (?, ?, ?)",
+                        [(self.fingerprint, key, json.dumps(result, ensure_ascii=False)) for key, result in items])
+            self.stores += len(items)
+
+    def _remember(self, key: str, result: Dict[str, Any]):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def lookup(self, compositions: Sequence[Any], reduction: str, k_neighbors: int, predict: bool,
+               compute: Callable[[List[Any]], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        조성별 결과를 입력 순서대로 반환합니다. memo 에 없는 조성만 모아 compute(조성 목록) 를 한 번 호출합니다.
+        (compute 는 dft.dft_surrogate_model.get_adsorp_energies 와 같은 형식의 결과 목록을 반환)
+        반환되는 결과의 "composition" 은 호출자가 넘긴 조성입니다.
+        """
+        if self.mode == "off":
+            return compute(list(compositions))
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(compositions)
+        pending = []  # (입력 위치, memo 키 또는 None)
+        for i, composition in enumerate(compositions):
+            key = None
+            if isinstance(composition, dict) and composition:
+                try:
+                    key = self.make_key(Composition.coerce(composition), reduction, k_neighbors, predict)
+                except (TypeError, ValueError):
+                    key = None  # 잘못된 조성은 그대로 compute 에 넘겨 기존 오류 결과를 받음
+            stored = self.get(key) if key is not None else None
+            if stored is not None:
+                results[i] = dict(stored, composition=composition)
+            else:
+                pending.append((i, key))
+
+        if pending:
+            computed = compute([compositions[i] for i, _ in pending])
+            new_items = []
+            for (i, key), result in zip(pending, computed):
+                results[i] = result
+                if key is not None and result.get("status") in _MEMO_STATUSES:
+                    new_items.append((key, result))
+            self.put_many(new_items)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "persistent_hits": self.persistent_hits,
+                "misses": self.misses,
+                "stores": self.stores,
+            }
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
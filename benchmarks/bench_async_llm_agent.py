@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""bench_async_llm_agent.py
+
+여러 prompt 를 처리할 때 LLMAgent (한 번에 하나) 와 AsyncLLMAgent.ask_many (동시 처리) 의 처리량을 비교합니다.
+
+OpenAI 를 호출하지 않도록 chat.completions.create 를 지연 시간(--latency)과 분당 요청 수 상한(--provider-rpm)을
+흉내 내는 가짜 client 로 바꿉니다. 상한을 넘는 요청은 openai.RateLimitError (429, retry-after 헤더) 로 거절됩니다.
+
+- serial:      prompt 를 하나씩 처리 (기존 LLMAgent 와 같은 방식)
+- async c=N:   AsyncLLMAgent.ask_many, 동시 처리 수 N, limiter 는 provider 상한에 맞춤
+
+실행 (프로젝트 루트에서, openai 패키지 필요 / API 키는 사용하지 않음):
+    python benchmarks/bench_async_llm_agent.py --prompts 200 --latency 0.5 --provider-rpm 3000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import httpx
+import openai
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark-dummy-key")
+
+from agent.async_llm_agent import AsyncLLMAgent
+
+
+class SimulatedProvider:
+    """지연 시간과 분당 요청 수 상한(고정 1초 창)을 흉내 내는 chat.completions"""
+
+    def __init__(self, latency, rpm):
+        self.latency = latency
+        self.per_second = max(rpm / 60.0, 1.0)
+        self.window = 0
+        self.count = 0
+        self.rejected = 0
+
+    def _admit(self):
+        window = int(time.monotonic())
+        if window != self.window:
+            self.window, self.count = window, 0
+        self.count += 1
+        return self.count <= self.per_second
+
+    def _response(self, prompt):
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=f"answer to {prompt[:16]}", tool_calls=None))],
+            usage=SimpleNamespace(total_tokens=300))
+
+    def _rate_limit_error(self):
+        self.rejected += 1
+        request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+        response = httpx.Response(429, headers={"retry-after": "1"}, request=request)
+        return openai.RateLimitError("rate limited", response=response, body=None)
+
+    def create_sync(self, **request):
+        if not self._admit():
+            raise self._rate_limit_error()
+        time.sleep(self.latency)
+        return self._response(request["messages"][0]["content"])
+
+    async def create(self, **request):
+        if not self._admit():
+            raise self._rate_limit_error()
+        await asyncio.sleep(self.latency)
+        return self._response(request["messages"][0]["content"])
+
+
+def run_serial(prompts, provider):
+    """기존 LLMAgent.ask 와 같이 한 번에 하나씩 (serial 은 상한에 닿지 않음)"""
+    start = time.perf_counter()
+    for prompt in prompts:
+        provider.create_sync(model="gpt-4o", messages=[{"role": "user", "content": prompt}])
+    return time.perf_counter() - start
+
+
+def run_async(prompts, provider, concurrency, rpm):
+    agent = AsyncLLMAgent(cache_mode="off", max_concurrency=concurrency,
+                          requests_per_minute=rpm, tokens_per_minute=None)
+    agent.async_client = SimpleNamespace(chat=SimpleNamespace(completions=provider))
+    start = time.perf_counter()
+    results = agent.run_batch(prompts)
+    elapsed = time.perf_counter() - start
+    agent.close()
+    failed = sum(1 for result in results if isinstance(result, BaseException))
+    return elapsed, failed, agent.rate_limited
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prompts", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.5, help="요청 하나의 응답 지연 시간(s)")
+    parser.add_argument("--provider-rpm", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    args = parser.parse_args()
+
+    prompts = [f"search group shard {i}" for i in range(args.prompts)]
+    print(f"{args.prompts} prompts, latency {args.latency}s, provider {args.provider_rpm} RPM")
+    print(f"{'variant':<12} {'wall s':>8} {'prompts/s':>10} {'429':>6} {'failed':>7}")
+
+    elapsed = run_serial(prompts, SimulatedProvider(args.latency, args.provider_rpm))
+    print(f"{'serial':<12} {elapsed:8.2f} {len(prompts) / elapsed:10.1f} {0:6d} {0:7d}")
+    for concurrency in args.concurrency:
+        provider = SimulatedProvider(args.latency, args.provider_rpm)
+        elapsed, failed, rate_limited = run_async(prompts, provider, concurrency, args.provider_rpm)
+        print(f"{f'async c={concurrency}':<12} {elapsed:8.2f} {len(prompts) / elapsed:10.1f} "
+              f"{rate_limited:6d} {failed:7d}")
+
+
+if __name__ == "__main__":
+    main()
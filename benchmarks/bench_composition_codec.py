@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""bench_composition_codec.py
+
+조성 문자열 디코딩 방식별 처리량을 비교합니다.
+
+1) 실제 데이터셋 (data/hydrogen/system_compositions_fraction.csv):
+   ast.literal_eval vs parse_composition (행 단위) vs parse_composition_column (컬럼 단위)
+2) 합성 데이터셋 (--synthetic 행, 기본 10,000,000): --chunk 행씩 나누어 parse_composition_column 으로 디코딩
+   (ast.literal_eval 은 앞쪽 --literal-sample 행으로 측정한 처리량으로 전체 시간을 추정)
+
+실행 (프로젝트 루트에서):
+    python benchmarks/bench_composition_codec.py --synthetic 10000000 --chunk 1000000
+"""
+
+import argparse
+import ast
+import csv
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dft.composition_codec import format_composition, parse_composition, parse_composition_column
+from dft.composition_index import DEFAULT_COMP_CSV_PATH
+
+
+def literal_eval_rows(texts):
+    """코덱 도입 이전의 방식"""
+    out = []
+    for text in texts:
+        try:
+            value = ast.literal_eval(text)
+        except Exception:
+            value = None
+        out.append(value if isinstance(value, dict) else None)
+    return out
+
+
+def codec_rows(texts):
+    return [parse_composition(text) for text in texts]
+
+
+def timed(func, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(label, seconds, n_rows):
+    print(f"{label:<40} {seconds * 1e3:10.1f} ms  {seconds / n_rows * 1e6:6.2f} us/row  "
+          f"{n_rows / seconds / 1e6:6.2f} M rows/s")
+
+
+def synthetic_texts(n_rows, n_elements, rng):
+    """2~4 원계 분율 조성 문자열 n_rows 개 (데이터 파일과 같은 str(dict) 형식)"""
+    elements = [f"E{chr(97 + i % 26)}{i // 26}" if i >= 26 else f"E{chr(97 + i)}" for i in range(n_elements)]
+    counts = rng.integers(2, 5, size=n_rows)
+    texts = []
+    for count in counts.tolist():
+        picked = rng.choice(n_elements, size=count, replace=False).tolist()
+        fractions = rng.dirichlet(np.ones(count)).tolist()
+        texts.append(format_composition({elements[e]: f for e, f in zip(picked, fractions)}))
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--synthetic", type=int, default=10_000_000)
+    parser.add_argument("--chunk", type=int, default=1_000_000)
+    parser.add_argument("--literal-sample", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with open(DEFAULT_COMP_CSV_PATH, encoding="utf-8-sig") as f:
+        texts = [row["composition_fraction"] for row in csv.DictReader(f)]
+    n = len(texts)
+    print(f"[real] {n} rows")
+    report("ast.literal_eval", timed(literal_eval_rows, texts), n)
+    report("parse_composition (per row)", timed(codec_rows, texts), n)
+    report("parse_composition_column", timed(parse_composition_column, texts), n)
+    report("parse_composition_column + to_dicts", timed(lambda t: parse_composition_column(t).to_dicts(), texts), n)
+
+    if args.synthetic:
+        rng = np.random.default_rng(args.seed)
+        # 문자열 생성은 측정에서 제외하고, 한 덩어리를 만들어 반복 사용 (메모리 사용량 제한)
+        chunk = synthetic_texts(min(args.chunk, args.synthetic), 60, rng)
+        print(f"\n[synthetic] {args.synthetic} rows in chunks of {len(chunk)}")
+        sample = chunk[:args.literal_sample]
+        literal = timed(literal_eval_rows, sample, repeat=1) / len(sample) * args.synthetic
+        report("ast.literal_eval (extrapolated)", literal, args.synthetic)
+
+        element_table = {}
+        total, done, entries = 0.0, 0, 0
+        while done < args.synthetic:
+            part = chunk[:args.synthetic - done]
+            start = time.perf_counter()
+            column = parse_composition_column(part, element_table)
+            total += time.perf_counter() - start
+            done += len(part)
+            entries += len(column.values)
+        report("parse_composition_column (chunked)", total, args.synthetic)
+        print(f"{'':<40} {entries} entries, {len(element_table)} elements")
+
+
+if __name__ == "__main__":
+    main()
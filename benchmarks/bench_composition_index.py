@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""bench_composition_index.py
+
+기존 CSV 선형 탐색 방식과 CompositionIndex 해시 조회 방식의
+get_adsorp_energy_by_composition 지연 시간을 비교합니다.
+
+실행 (프로젝트 루트에서):
+    python benchmarks/bench_composition_index.py --queries 200
+"""
+
+import argparse
+import ast
+import csv
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dft.composition_index import (
+    DEFAULT_COMP_CSV_PATH,
+    DEFAULT_INFO_CSV_PATH,
+    CompositionIndex,
+)
+
+
+def legacy_scan(composition_dict, comp_csv_path=DEFAULT_COMP_CSV_PATH, info_csv_path=DEFAULT_INFO_CSV_PATH):
+    """인덱스 도입 이전의 get_adsorp_energy_by_composition 구현 (비교 기준)"""
+    tolerance = 1e-6
+    with open(comp_csv_path, encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            try:
+                comp = ast.literal_eval(row["composition_fraction"])
+                if set(comp.keys()) == set(composition_dict.keys()):
+                    if all(abs(comp[k] - composition_dict[k]) < tolerance for k in comp):
+                        system_id = row["system_id"]
+                        break
+            except Exception:
+                continue
+        else:
+            return None
+    with open(info_csv_path, encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            if row["system_id"] == system_id:
+                return float(row["adsorp_energy"])
+    return None
+
+
+def make_queries(index, n_queries, seed):
+    """데이터셋에 존재하는 조성(약간의 부동소수 잡음 포함)과 존재하지 않는 조성을 섞어 생성"""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(n_queries):
+        comp = dict(rng.choice(index.compositions))
+        if rng.random() < 0.2:
+            comp = {el: frac + 0.01 for el, frac in comp.items()}  # miss
+        else:
+            comp = {el: frac + rng.uniform(-5e-7, 5e-7) for el, frac in comp.items()}
+        queries.append(comp)
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CompositionIndex microbenchmark")
+    parser.add_argument("--queries", type=int, default=200, help="조회 횟수")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    index = CompositionIndex.from_csv()
+    build_s = time.perf_counter() - t0
+    print(f"[build] {len(index)}개 시스템 인덱싱: {build_s * 1e3:.1f} ms")
+
+    queries = make_queries(index, args.queries, args.seed)
+
+    t0 = time.perf_counter()
+    legacy = [legacy_scan(q) for q in queries]
+    legacy_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    indexed = [index.get_energy(q) for q in queries]
+    indexed_s = time.perf_counter() - t0
+
+    mismatches = sum(1 for a, b in zip(legacy, indexed) if a != b)
+    print(f"[legacy scan] {legacy_s / len(queries) * 1e3:.3f} ms/query")
+    print(f"[index]       {indexed_s / len(queries) * 1e6:.3f} us/query")
+    print(f"[speedup]     x{legacy_s / max(indexed_s, 1e-12):.0f} (빌드 포함 시 x{legacy_s / (indexed_s + build_s):.1f})")
+    print(f"[check]       결과 불일치 {mismatches}건 / {len(queries)}건")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""bench_composition_sampler.py
+
+get_random_compositions 의 기존 방식(필터 목록 재생성 + random.sample)과 CompositionSampler 전략별로
+호출당 시간과 50 개 후보 그룹의 다양성(최소/평균 쌍별 L1 거리, 포함된 원소 수, 원소 계열 조합 수)을 비교합니다.
+
+실행 (프로젝트 루트에서):
+    python benchmarks/bench_composition_sampler.py --count 50 --repeat 20
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dft.composition_index import get_composition_index
+from dft.composition_sampler import SAMPLING_STRATEGIES
+
+
+def legacy_sample(db, count, n_elements):
+    """샘플러 도입 이전의 방식"""
+    filtered_db = db
+    if n_elements:
+        filtered_db = [c for c in db if c["n_elements"] == n_elements]
+    return random.sample(range(len(filtered_db)), min(count, len(filtered_db)))
+
+
+def pairwise_l1(compositions):
+    elements = sorted({e for comp in compositions for e in comp})
+    matrix = np.array([[comp.get(e, 0.0) for e in elements] for comp in compositions])
+    distances = np.abs(matrix[:, None, :] - matrix[None, :, :]).sum(axis=2)
+    return distances[np.triu_indices(len(compositions), k=1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--n-elements", type=int, default=None)
+    args = parser.parse_args()
+
+    index = get_composition_index()
+    sampler = index.composition_sampler()
+    db = [{"system_id": sid, "composition": comp, "n_elements": len(comp)}
+          for sid, comp in zip(index.system_ids, index.compositions)]
+    print(f"{len(index)} systems, count={args.count}, n_elements={args.n_elements}")
+    print(f"{'method':<12} {'ms/call':>8} {'min L1':>7} {'mean L1':>8} {'elements':>9} {'families':>9}")
+
+    methods = {"legacy": lambda seed: legacy_sample(db, args.count, args.n_elements)}
+    for strategy in SAMPLING_STRATEGIES:
+        methods[strategy] = (lambda s: lambda seed: sampler.sample(args.count, args.n_elements, s, seed))(strategy)
+
+    for label, method in methods.items():
+        times, min_l1, mean_l1, n_elements, n_families = [], [], [], [], []
+        for seed in range(args.repeat):
+            random.seed(seed)
+            start = time.perf_counter()
+            rows = method(seed)
+            times.append((time.perf_counter() - start) * 1e3)
+            if label == "legacy":
+                pool = sampler.pool(args.n_elements)
+                rows = pool[np.asarray(rows)]
+            compositions = [index.compositions[row] for row in rows]
+            distances = pairwise_l1(compositions)
+            min_l1.append(distances.min())
+            mean_l1.append(distances.mean())
+            n_elements.append(len({e for comp in compositions for e in comp}))
+            n_families.append(len(set(sampler.stratum[rows].tolist())))
+        print(f"{label:<12} {np.median(times):8.2f} {np.mean(min_l1):7.3f} {np.mean(mean_l1):8.3f} "
+              f"{np.mean(n_elements):9.1f} {np.mean(n_families):9.1f}")
+
+
+if __name__ == "__main__":
+    main()
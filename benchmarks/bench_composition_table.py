@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""bench_composition_table.py
+
+compositions_db 의 메모리 사용량과 행 접근 시간을 비교합니다. (tracemalloc 으로 할당량 측정)
+
+- legacy:        행마다 {"system_id", "composition", "elements", "n_elements"} dict (composition dict 는 인덱스와 공유)
+- legacy+comps:  위와 같고 composition dict 까지 행마다 따로 가진 경우 (인덱스 없이 db 만 들고 있을 때)
+- table:         CompositionTable (원소 테이블 + CSR 배열 + system_id byte 배열, 행 뷰는 접근 시 생성)
+
+각 데이터셋에 대해 CompositionIndex 자체가 상주시키는 byte 수(조성 표, 그룹 배열, 키 해시 배열)도 함께 출력합니다.
+
+1) 실제 데이터셋 (data/hydrogen)
+2) 합성 데이터셋 (--synthetic 행, 기본 1,000,000)
+
+실행 (프로젝트 루트에서):
+    python benchmarks/bench_composition_table.py --synthetic 1000000
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dft.composition_index import CompositionIndex, get_composition_index
+from dft.composition_table import CompositionTable
+
+
+def legacy_db(system_ids, compositions, copy_compositions=False):
+    """CompositionTable 도입 이전의 compositions_db"""
+    return [
+        {
+            "system_id": system_id,
+            "composition": dict(comp_dict) if copy_compositions else comp_dict,
+            "elements": list(comp_dict.keys()),
+            "n_elements": len(comp_dict)
+        }
+        for system_id, comp_dict in zip(system_ids, compositions)
+    ]
+
+
+def measure(build):
+    """build() 가 남기는 할당량(byte)과 생성 시간(s)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+def access_us(db, rows):
+    start = time.perf_counter()
+    for row in rows:
+        record = db[row]
+        record["system_id"], record["composition"]
+    return (time.perf_counter() - start) / len(rows) * 1e6
+
+
+def compare(label, system_ids, compositions, energies, n_access, seed):
+    print(f"[{label}] {len(system_ids)} systems")
+    print(f"{'variant':<14} {'MiB':>9} {'bytes/row':>10} {'shrink':>7} {'build s':>8} {'access us':>10}")
+    rows = np.random.default_rng(seed).integers(0, len(system_ids), size=n_access).tolist()
+    variants = {
+        "legacy": lambda: legacy_db(system_ids, compositions),
+        "legacy+comps": lambda: legacy_db(system_ids, compositions, copy_compositions=True),
+        "table": lambda: CompositionTable.from_compositions(system_ids, compositions),
+    }
+    baseline = None
+    for name, build in variants.items():
+        db, size, elapsed = measure(build)
+        baseline = baseline or size
+        print(f"{name:<14} {size / 2 ** 20:9.1f} {size / len(system_ids):10.1f} {baseline / size:6.1f}x "
+              f"{elapsed:8.2f} {access_us(db, rows):10.2f}")
+        del db
+    index, size, elapsed = measure(lambda: CompositionIndex(system_ids, compositions, energies))
+    print(f"CompositionIndex resident {size / 2 ** 20:.1f} MiB ({size / len(system_ids):.1f} bytes/row), "
+          f"build {elapsed:.2f}s")
+    print()
+
+
+def synthetic_rows(n_rows, elements, seed):
+    rng = np.random.default_rng(seed)
+    compositions = []
+    for count in rng.integers(1, 5, size=n_rows).tolist():
+        picked = rng.choice(len(elements), size=count, replace=False).tolist()
+        fractions = rng.dirichlet(np.ones(count)).tolist()
+        compositions.append({elements[e]: f for e, f in zip(picked, fractions)})
+    return [f"random{i}" for i in range(n_rows)], compositions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--synthetic", type=int, default=1_000_000)
+    parser.add_argument("--access", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    index = get_composition_index()
+    # 인덱스의 조성은 지연 열이므로 비교용 dict 목록으로 한 번 만듦
+    compositions = index.compositions[:]
+    compare("real", index.system_ids, compositions, index.energies, args.access, args.seed)
+
+    if args.synthetic:
+        elements = sorted({e for comp in compositions for e in comp})
+        system_ids, compositions = synthetic_rows(args.synthetic, elements, args.seed)
+        energies = dict(zip(system_ids, np.random.default_rng(args.seed).normal(size=len(system_ids)).tolist()))
+        compare("synthetic", system_ids, compositions, energies, args.access, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""bench_element_postings.py
+
+search_compositions_by_elements 의 기존 선형 스캔 방식과 ElementPostings 역색인 방식을 비교합니다.
+
+1) 실제 데이터셋 (data/hydrogen): 선형 스캔(전체 일치 수까지 계산) vs 역색인 질의 + 첫 페이지
+2) 합성 데이터셋 (--synthetic 행, 기본 2,000,000): 역색인 질의 지연 시간 (교집합 + 정렬 + 페이지)
+
+실행 (프로젝트 루트에서):
+    python benchmarks/bench_element_postings.py --queries 200 --synthetic 2000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dft.composition_index import get_composition_index
+from dft.element_postings import ElementPostings
+
+
+def linear_scan(compositions, elements, exact_match):
+    """역색인 도입 이전의 방식 (limit 없이 전체 일치 수까지 계산)"""
+    search_elements = set(elements)
+    matches = []
+    for comp in compositions:
+        comp_elements = set(comp)
+        if exact_match:
+            if comp_elements == search_elements:
+                matches.append(comp)
+        elif search_elements.issubset(comp_elements):
+            matches.append(comp)
+    return len(matches)
+
+
+def make_queries(elements, n_queries, seed):
+    rng = random.Random(seed)
+    return [(rng.sample(elements, rng.randint(1, 3)), rng.random() < 0.3) for _ in range(n_queries)]
+
+
+def time_queries(postings, queries, sort_by):
+    latencies = []
+    for elements, exact in queries:
+        start = time.perf_counter()
+        postings.search(elements, exact=exact, sort_by=sort_by, limit=10)
+        latencies.append((time.perf_counter() - start) * 1e6)
+    return np.asarray(latencies)
+
+
+def report(label, latencies_us):
+    print(f"{label:<44} p50={np.percentile(latencies_us, 50):9.1f} us  "
+          f"p99={np.percentile(latencies_us, 99):9.1f} us")
+
+
+def synthetic_postings(n_rows, n_elements, seed):
+    """원소 빈도가 고르지 않은(Zipf 형) 2~4 원계 조성 n_rows 개의 CSR 표현으로 인덱스 생성"""
+    rng = np.random.default_rng(seed)
+    counts = rng.integers(2, 5, size=n_rows)
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    weights = 1.0 / np.arange(1, n_elements + 1)
+    weights /= weights.sum()
+    element_idx = rng.choice(n_elements, size=int(indptr[-1]), p=weights).astype(np.int32)
+    elements = [f"E{i}" for i in range(n_elements)]
+    system_ids = np.char.add("sys_", np.arange(n_rows).astype(str))
+    energies = rng.normal(-0.3, 0.5, size=n_rows)
+    return ElementPostings(elements, indptr, element_idx, system_ids, energies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--synthetic", type=int, default=2_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    index = get_composition_index()
+    postings = index.element_postings()
+    queries = make_queries(postings.elements, args.queries, args.seed)
+
+    print(f"[real] {len(index)} systems, {len(postings.elements)} elements")
+    scan = []
+    for elements, exact in queries[:50]:
+        start = time.perf_counter()
+        linear_scan(index.compositions, elements, exact)
+        scan.append((time.perf_counter() - start) * 1e6)
+    report("linear scan (total count)", np.asarray(scan))
+    for sort_by in ("none", "adsorp_energy"):
+        report(f"postings search (sort_by={sort_by})", time_queries(postings, queries, sort_by))
+
+    if args.synthetic:
+        start = time.perf_counter()
+        big = synthetic_postings(args.synthetic, 60, args.seed)
+        big.sort_order("adsorp_energy")
+        print(f"\n[synthetic] {len(big)} systems, build {time.perf_counter() - start:.2f} s")
+        big_queries = make_queries(big.elements, args.queries, args.seed)
+        selective = [q for q in big_queries if len(q[0]) >= 2]
+        for sort_by in ("none", "adsorp_energy"):
+            report(f"postings, all queries (sort_by={sort_by})", time_queries(big, big_queries, sort_by))
+            report(f"postings, >=2 elements (sort_by={sort_by})", time_queries(big, selective, sort_by))
+
+
+if __name__ == "__main__":
+    main()
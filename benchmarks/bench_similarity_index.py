@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""bench_similarity_index.py
+
+find_similar_compositions 의 질의 지연 시간을 측정합니다.
+
+1) 실제 데이터셋 (data/hydrogen): dense 분율 행렬 brute-force L1 vs SimilarityIndex (l1 / cosine / property)
+2) 합성 데이터셋 (--synthetic 행, 기본 1,000,000): SimilarityIndex 질의 지연 시간
+
+실행 (프로젝트 루트에서):
+    python benchmarks/bench_similarity_index.py --queries 100 --synthetic 1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dft.composition_index import CompositionIndex, get_composition_index
+from dft.similarity_index import ELEMENT_DESCRIPTORS, SIMILARITY_METRICS
+
+
+def report(label, latencies_ms):
+    print(f"{label:<36} p50={np.percentile(latencies_ms, 50):8.2f} ms  p99={np.percentile(latencies_ms, 99):8.2f} ms")
+
+
+def time_queries(similarity, queries, metric, k):
+    latencies = []
+    for composition in queries:
+        start = time.perf_counter()
+        similarity.query(composition, k, metric)
+        latencies.append((time.perf_counter() - start) * 1e3)
+    return np.asarray(latencies)
+
+
+def synthetic_index(n_rows, seed):
+    """물성표의 원소로 이루어진 2~4 원계 분율 조성 n_rows 개"""
+    rng = np.random.default_rng(seed)
+    elements = sorted(ELEMENT_DESCRIPTORS)
+    compositions = []
+    for count in rng.integers(2, 5, size=n_rows).tolist():
+        picked = rng.choice(len(elements), size=count, replace=False).tolist()
+        fractions = rng.dirichlet(np.ones(count)).tolist()
+        compositions.append({elements[e]: f for e, f in zip(picked, fractions)})
+    system_ids = [f"sys_{i}" for i in range(n_rows)]
+    energies = dict(zip(system_ids, rng.normal(-0.3, 0.5, size=n_rows).tolist()))
+    return CompositionIndex(system_ids, compositions, energies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--synthetic", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    index = get_composition_index()
+    rng = random.Random(args.seed)
+    queries = [index.compositions[rng.randrange(len(index))] for _ in range(args.queries)]
+    similarity = index.similarity_index()
+
+    elements = sorted({e for comp in index.compositions for e in comp})
+    position = {e: i for i, e in enumerate(elements)}
+    dense = np.zeros((len(index), len(elements)))
+    for row, comp in enumerate(index.compositions):
+        for element, fraction in comp.items():
+            dense[row, position[element]] = fraction
+    brute = []
+    for composition in queries:
+        start = time.perf_counter()
+        vector = np.zeros(len(elements))
+        for element, fraction in composition.items():
+            vector[position[element]] = fraction
+        distances = np.abs(dense - vector).sum(axis=1)
+        np.argpartition(distances, args.k)[:args.k + 1]
+        brute.append((time.perf_counter() - start) * 1e3)
+
+    print(f"[real] {len(index)} systems")
+    report("dense brute-force l1", np.asarray(brute))
+    for metric in SIMILARITY_METRICS:
+        report(f"SimilarityIndex ({metric})", time_queries(similarity, queries, metric, args.k))
+
+    if args.synthetic:
+        start = time.perf_counter()
+        big = synthetic_index(args.synthetic, args.seed)
+        big_similarity = big.similarity_index()
+        print(f"\n[synthetic] {len(big)} systems, build {time.perf_counter() - start:.1f} s")
+        big_queries = [big.compositions[rng.randrange(len(big))] for _ in range(args.queries)]
+        for metric in SIMILARITY_METRICS:
+            report(f"SimilarityIndex ({metric})", time_queries(big_similarity, big_queries, metric, args.k))
+
+
+if __name__ == "__main__":
+    main()
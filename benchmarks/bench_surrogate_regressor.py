@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""bench_surrogate_regressor.py
+
+흡착 에너지 surrogate 회귀 모델의 정확도(hold-out MAE)와 배치 추론 처리량을 측정합니다.
+hold-out 은 조성 그룹 단위로 나눕니다. (같은 조성의 다른 시스템이 학습 데이터에 있으면 MAE 가 낙관적으로 나옴)
+
+실행 (프로젝트 루트에서):
+    python benchmarks/bench_surrogate_regressor.py --test-fraction 0.1
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dft.composition_index import CompositionIndex
+from dft.surrogate_regressor import AdsorptionSurrogate, group_holdout_split
+
+
+def main():
+    parser = argparse.ArgumentParser(description="surrogate regressor benchmark")
+    parser.add_argument("--test-fraction", type=float, default=0.1)
+    parser.add_argument("--n-features", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    index = CompositionIndex.load()
+    compositions = index.compositions
+    energies = np.array([index.energies.get(sid, np.nan) for sid in index.system_ids])
+
+    groups = index.groups.row_group
+    rng = np.random.default_rng(args.seed)
+    test, train = group_holdout_split(groups, args.test_fraction, rng)
+
+    t0 = time.perf_counter()
+    model = AdsorptionSurrogate.fit([compositions[i] for i in train], energies[train],
+                                    n_features=args.n_features, seed=args.seed, groups=groups[train])
+    print(f"[fit]       {len(train)}개 학습: {time.perf_counter() - t0:.2f} s "
+          f"(lengthscale={model.meta['lengthscale']:.2f}, alpha={model.meta['alpha']})")
+
+    test_comps = [compositions[i] for i in test]
+    pred, std = model.predict(test_comps, return_std=True)
+    mae = float(np.nanmean(np.abs(pred - energies[test])))
+    baseline = float(np.mean(np.abs(energies[train].mean() - energies[test])))
+    coverage = float(np.nanmean(np.abs(pred - energies[test]) <= std))
+    print(f"[accuracy]  hold-out MAE {mae:.3f} eV (평균값 예측 baseline {baseline:.3f} eV), 1σ coverage {coverage:.2f}")
+
+    for batch in (1, 100, 1000, 10000):
+        comps = [compositions[i % len(compositions)] for i in range(batch)]
+        for return_std in (False, True):
+            repeats = max(1, 20000 // batch)
+            t0 = time.perf_counter()
+            for _ in range(repeats):
+                model.predict(comps, return_std=return_std)
+            elapsed = (time.perf_counter() - t0) / repeats
+            label = "mean+std" if return_std else "mean"
+            print(f"[predict]   batch {batch:>5} ({label:>8}): {elapsed * 1e3:8.3f} ms "
+                  f"= {batch / elapsed / 1e3:8.1f} compositions/ms")
+
+    # 배치 1000 의 단계별 시간 (특징화 / random Fourier features / 예측 분산)
+    comps = [compositions[i % len(compositions)] for i in range(1000)]
+    X, _ = model.featurizer.transform(comps)
+    phi = model._random_features(X)
+    stages = {
+        "featurize": lambda: model.featurizer.transform(comps),
+        "rff": lambda: model._random_features(X),
+        "mean": lambda: phi @ model.weights,
+        "variance": lambda: ((phi @ model.posterior_cov) * phi).sum(axis=1, dtype=np.float64),
+    }
+    for name, stage in stages.items():
+        t0 = time.perf_counter()
+        for _ in range(100):
+            stage()
+        print(f"[stage]     {name:<9} {(time.perf_counter() - t0) / 100 * 1e3:7.3f} ms / 1000 compositions")
+
+
+if __name__ == "__main__":
+    main()
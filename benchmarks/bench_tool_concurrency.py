@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""bench_tool_concurrency.py
+
+MCP tool 호출이 한꺼번에 몰릴 때 빠른 호출(단일 조성 조회)의 지연 시간 분포를 측정합니다.
+
+- inline: 기존처럼 async handler 안에서 동기 작업을 그대로 실행 (이벤트 루프 점유)
+- executor: ToolExecutor 로 스레드 풀에서 실행 (tool 별 동시 실행 제한 + single-flight)
+
+부하는 빠른 조회 호출(일부 인기 조성에 몰림)과 느린 호출(데이터에 없는 조성 수천 개의
+surrogate 예측 + k-NN 배치 조회)을 섞어 동시에 보냅니다.
+mcp 패키지 없이 실행되도록 서버의 tool 본문과 같은 작업을 직접 호출합니다.
+
+실행 (프로젝트 루트에서):
+    python benchmarks/bench_tool_concurrency.py --calls 400 --slow-ratio 0.02 --batch-size 500
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dft.composition_index import get_composition_index
+from dft.dft_surrogate_model import get_adsorp_energies
+from dft.tool_executor import ToolExecutor
+
+
+def call_tool(name, arguments):
+    """서버 tool 본문과 같은 동기 작업"""
+    if name == "get_adsorp_energy":
+        return get_adsorp_energies([arguments["composition"]])[0]
+    if name == "get_adsorp_energy_batch":
+        return get_adsorp_energies(arguments["compositions"], k_neighbors=3, predict=True)
+    raise ValueError(name)
+
+
+def make_workload(index, n_calls, slow_ratio, batch_size, seed):
+    rng = random.Random(seed)
+    hot = rng.sample(index.compositions, 100)
+    calls = []
+    for _ in range(n_calls):
+        if rng.random() < slow_ratio:
+            batch = [{el: frac + rng.uniform(0.001, 0.05) for el, frac in rng.choice(index.compositions).items()}
+                     for _ in range(batch_size)]
+            calls.append(("get_adsorp_energy_batch", {"compositions": batch}))
+        else:
+            calls.append(("get_adsorp_energy", {"composition": dict(rng.choice(hot))}))
+    return calls
+
+
+async def run_load(calls, handler, gap):
+    """
+    호출 i 를 시작 시각 + i * gap 에 도착시키고, 빠른 호출의 지연 시간(ms) 목록을 반환합니다.
+    지연 시간은 예정된 도착 시각부터 측정하므로 이벤트 루프가 막혀 있던 시간도 포함됩니다.
+    """
+    latencies = []
+
+    async def one(name, arguments, arrival):
+        await handler(name, arguments)
+        if name == "get_adsorp_energy":
+            latencies.append((time.perf_counter() - arrival) * 1000)
+
+    start = time.perf_counter()
+    tasks = []
+    for i, (name, arguments) in enumerate(calls):
+        arrival = start + i * gap
+        delay = arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(name, arguments, arrival)))
+    await asyncio.gather(*tasks)
+    return latencies, time.perf_counter() - start
+
+
+def report(label, latencies, wall):
+    lat = np.asarray(latencies)
+    print(f"{label:<22} n={len(lat):5d}  p50={np.percentile(lat, 50):8.2f} ms  "
+          f"p99={np.percentile(lat, 99):8.2f} ms  max={lat.max():8.2f} ms  wall={wall:6.2f} s")
+
+
+async def main_async(args):
+    index = get_composition_index()
+    get_adsorp_energies([{"Pt": 0.3, "Ru": 0.7}], k_neighbors=3, predict=True)  # 인덱스/k-NN/모델 warm-up
+
+    async def inline(name, arguments):
+        return call_tool(name, arguments)
+
+    executor = ToolExecutor(tool_limits={"get_adsorp_energy_batch": 2})
+
+    async def pooled(name, arguments):
+        return await executor.run(name, arguments, call_tool)
+
+    for n_calls in (1, args.calls):
+        calls = make_workload(index, n_calls if n_calls > 1 else 50, args.slow_ratio if n_calls > 1 else 0.0,
+                              args.batch_size, args.seed)
+        mode = "idle" if n_calls == 1 else f"burst x{n_calls}"
+        for label, handler in (("inline", inline), ("executor", pooled)):
+            latencies, wall = await run_load(calls, handler, args.gap_ms / 1000)
+            report(f"{label} ({mode})", latencies, wall)
+    print(f"executor: executed={executor.executed}, coalesced={executor.coalesced}")
+    executor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--slow-ratio", type=float, default=0.02)
+    parser.add_argument("--gap-ms", type=float, default=1.0, help="호출 도착 간격 (ms)")
+    parser.add_argument("--batch-size", type=int, default=500, help="느린 배치 호출 하나의 조성 수")
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
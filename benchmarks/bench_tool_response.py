@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""bench_tool_response.py
+
+search_compositions_by_elements 응답의 결과 1개당 크기(byte, 대략적인 token 수)를 비교합니다.
+
+- legacy:  기존 응답 (전체 dict: system_id, composition, elements, n_elements, 반올림 없음, 기본 구분자)
+- records: 기본 projection (system_id, composition) + 공백 없는 구분자 (조성 분율은 반올림하지 않음)
+- table:   위와 같고 {columns, rows} 표 형식
+- minimal: table + fields=["composition"]
+
+실행 (프로젝트 루트에서):
+    python benchmarks/bench_tool_response.py --queries 200 --limit 20
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dft.composition_index import get_composition_index
+from dft.tool_response import dumps_compact, encode_matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    index = get_composition_index()
+    postings = index.element_postings()
+    db = [{"system_id": sid, "composition": comp, "elements": list(comp), "n_elements": len(comp)}
+          for sid, comp in zip(index.system_ids, index.compositions)]
+    rng = random.Random(args.seed)
+    pages = []
+    for _ in range(args.queries):
+        page = postings.search(rng.sample(postings.elements, 1), sort_by="adsorp_energy", limit=args.limit)
+        pages.append([dict(db[row], adsorp_energy=index.energies.get(db[row]["system_id"])) for row in page.rows])
+
+    variants = {
+        "legacy": lambda records: json.dumps({"matches": records}, ensure_ascii=False),
+        "records": lambda records: dumps_compact({"matches": encode_matches(records, max_bytes=None)[0]}),
+        "table": lambda records: dumps_compact({"matches": encode_matches(records, layout="table", max_bytes=None)[0]}),
+        "minimal": lambda records: dumps_compact({"matches": encode_matches(
+            records, fields=["composition"], layout="table", max_bytes=None)[0]}),
+    }
+
+    n_results = sum(len(records) for records in pages)
+    print(f"{args.queries} queries, {n_results} results (limit={args.limit}, sort_by=adsorp_energy)")
+    print(f"{'variant':<10} {'bytes/result':>13} {'~tokens/result':>15} {'shrink':>7} {'encode us/query':>16}")
+    baseline = None
+    for label, encode in variants.items():
+        start = time.perf_counter()
+        sizes = [len(encode(records).encode("utf-8")) for records in pages if records]
+        elapsed = (time.perf_counter() - start) / len(pages) * 1e6
+        per_result = sum(sizes) / n_results
+        baseline = baseline or per_result
+        print(f"{label:<10} {per_result:13.1f} {per_result / 4:15.1f} {baseline / per_result:6.2f}x {elapsed:16.1f}")
+
+    # max_bytes 로 응답 크기 상한 확인
+    budget = 1000
+    kept = [encode_matches(records, max_bytes=budget)[1] for records in pages if records]
+    sizes = [len(dumps_compact(encode_matches(records, max_bytes=budget)[0]).encode("utf-8"))
+             for records in pages if records]
+    print(f"\nmax_bytes={budget}: kept {np.mean(kept):.1f} results on average, largest list {max(sizes)} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Binary phase lines
+
+원소 쌍 (A, B) 의 이원계 조성들을 혼합 축 x_A = A / (A + B) 를 따라 정렬한 (x_A, 흡착 에너지, 행) 배열입니다.
+로드 시 모든 이원계 행을 (원소 쌍, x, 에너지) 순으로 한 번 정렬해 두고 원소 쌍마다 구간만 기록하므로,
+get_binary_phase_line 은 요청마다 전체를 거르지 않고 해당 구간을 그대로 잘라 반환합니다. (B 가 앞이면 1 - x 로 뒤집음)
+순수 원소(단원계) 행은 x = 1 (A) / x = 0 (B) 끝점으로 함께 제공합니다. 에너지가 없는 시스템은 제외합니다.
+"""
+
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from dft.composition_groups import REDUCTIONS, CompositionGroups
+
+
+class PhaseLine(NamedTuple):
+    """혼합 축을 따라 정렬된 한 원소 쌍의 (x_A, 에너지, 행) 배열"""
+    x: np.ndarray
+    energies: np.ndarray
+    rows: np.ndarray
+
+
+class BinaryPhaseLines:
+    """원소 쌍 → 이원계 phase line, 원소 → 순수 원소 끝점"""
+
+    def __init__(self, compositions: Sequence[Dict[str, float]], system_ids: Sequence[str],
+                 energies: Dict[str, float], groups: Optional[CompositionGroups] = None):
+        """
+        Args:
+            compositions: 행 순서의 조성 dictionary 목록
+            system_ids: 행 순서의 system_id
+            energies: system_id → adsorption energy
+            groups: 같은 조성 그룹 (reduction 으로 같은 x 의 시스템을 하나로 합칠 때 사용)
+        """
+        pair_ids: Dict[Tuple[str, str], int] = {}
+        pure_rows: Dict[str, List[int]] = {}
+        entry_pairs, entry_x, entry_energy, entry_rows = [], [], [], []
+        for row, composition in enumerate(compositions):
+            energy = energies.get(system_ids[row])
+            if energy is None or len(composition) > 2:
+                continue
+            if len(composition) == 1:
+                pure_rows.setdefault(next(iter(composition)), []).append(row)
+                continue
+            a, b = sorted(composition)
+            total = float(composition[a]) + float(composition[b])
+            if total <= 0:
+                continue
+            entry_pairs.append(pair_ids.setdefault((a, b), len(pair_ids)))
+            entry_x.append(float(composition[a]) / total)
+            entry_energy.append(energy)
+            entry_rows.append(row)
+
+        # (원소 쌍, x, 에너지) 순 정렬 → 원소 쌍마다 연속 구간
+        entry_pairs = np.asarray(entry_pairs, dtype=np.int64)
+        entry_x = np.asarray(entry_x, dtype=np.float64)
+        entry_energy = np.asarray(entry_energy, dtype=np.float64)
+        entry_rows = np.asarray(entry_rows, dtype=np.int64)
+        order = np.lexsort((entry_energy, entry_x, entry_pairs))
+        self.x = entry_x[order]
+        self.energies = entry_energy[order]
+        self.rows = entry_rows[order]
+        bounds = np.searchsorted(entry_pairs[order], np.arange(len(pair_ids) + 1))
+        self.pairs: Dict[Tuple[str, str], Tuple[int, int]] = {
+            pair: (int(bounds[i]), int(bounds[i + 1])) for pair, i in pair_ids.items()
+        }
+        self.pure: Dict[str, PhaseLine] = {}
+        for element, rows in pure_rows.items():
+            rows = np.asarray(rows, dtype=np.int64)
+            pure_energies = np.array([energies[system_ids[row]] for row in rows], dtype=np.float64)
+            order = np.argsort(pure_energies, kind="stable")
+            self.pure[element] = PhaseLine(np.ones(len(rows)), pure_energies[order], rows[order])
+        self.groups = groups
+
+    @classmethod
+    def from_index(cls, index) -> "BinaryPhaseLines":
+        """CompositionIndex 의 조성·에너지·조성 그룹으로 phase line 을 생성합니다."""
+        return cls(index.compositions, index.system_ids, index.energies, index.groups)
+
+    def __len__(self) -> int:
+        return len(self.pairs)
+
+    def line(self, element_a: str, element_b: str, include_pure: bool = True,
+             reduction: Optional[str] = None) -> PhaseLine:
+        """
+        x_A (A 의 분율, A + B = 1 로 정규화) 오름차순으로 정렬된 phase line.
+        같은 x 는 에너지 오름차순이며, reduction(first/min/mean/max) 을 주면 같은 조성의 시스템을 하나로 합칩니다.
+        """
+        if element_a == element_b:
+            raise ValueError(f"서로 다른 두 원소가 필요합니다: {element_a!r}")
+        if reduction is not None and reduction not in REDUCTIONS:
+            raise ValueError(f"reduction 은 {REDUCTIONS} 중 하나여야 합니다: {reduction!r}")
+        swapped = element_a > element_b
+        start, stop = self.pairs.get((element_b, element_a) if swapped else (element_a, element_b), (0, 0))
+        x, energies, rows = self.x[start:stop], self.energies[start:stop], self.rows[start:stop]
+        if swapped:
+            # 저장된 축은 B 의 분율 - 1 - x 로 뒤집고 (x, 에너지) 순으로 다시 정렬
+            x = 1.0 - x
+            order = np.lexsort((energies, x))
+            x, energies, rows = x[order], energies[order], rows[order]
+
+        parts = [PhaseLine(x, energies, rows)]
+        if include_pure:
+            end_b = self.pure.get(element_b)
+            end_a = self.pure.get(element_a)
+            if end_b is not None:
+                parts.insert(0, PhaseLine(np.zeros(len(end_b.x)), end_b.energies, end_b.rows))
+            if end_a is not None:
+                parts.append(end_a)
+        line = PhaseLine(*(np.concatenate(column) for column in zip(*parts)))
+        if reduction is None or self.groups is None or not len(line.rows):
+            return line
+        return self._reduce(line, reduction)
+
+    def _reduce(self, line: PhaseLine, reduction: str) -> PhaseLine:
+        """같은 조성 그룹의 시스템들을 reduction 으로 고른 점 하나로 합침 (mean 은 그룹 첫 시스템 자리에 평균 에너지)"""
+        groups = self.groups
+        keep, rows, energies = [], [], []
+        seen = set()
+        for i, row in enumerate(line.rows.tolist()):
+            group = int(groups.row_group[row])
+            if group in seen:
+                continue
+            seen.add(group)
+            if reduction == "min":
+                row = int(groups.min_row[group])
+            elif reduction == "max":
+                row = int(groups.max_row[group])
+            else:
+                row = groups.rows_of(group)[0]
+            energy = groups.reduce(row, reduction)
+            if energy is None:
+                continue
+            keep.append(i)
+            rows.append(row)
+            energies.append(energy)
+        x = line.x[keep]
+        energies = np.asarray(energies, dtype=np.float64)
+        order = np.lexsort((energies, x))
+        return PhaseLine(x[order], energies[order], np.asarray(rows, dtype=np.int64)[order])
@@ -0,0 +1,332 @@
+"""
+Binary columnar dataset store
+
+data/hydrogen/*.csv 네 파일을 한 번 컴파일하여 numpy .npy 컬럼 파일들로 저장하고,
+np.load(mmap_mode="r") 로 열어 텍스트 파싱 없이 즉시 로드합니다.
+mmap 으로 열린 배열은 OS 페이지 캐시를 통해 여러 서버 프로세스가 메모리를 공유합니다.
+
+저장 형식 (store_dir/):
+    meta.json              형식 버전, 원소 테이블(interned), 원본 CSV 지문
+    system_ids.npy         |S  system_id (fraction CSV 행 순서)
+    valid.npy              bool   조성 파싱 성공 여부 ("Error or Not Available" 행은 False)
+    indptr.npy             int64  CSR 행 오프셋 (n_systems + 1)
+    element_idx.npy        int16  CSR 원소 번호 (원소 테이블 인덱스)
+    fraction.npy           float32 CSR 원소 비율 (H 제외, 합 = 1) - 벡터 연산용
+    atom_count.npy         int32  CSR 원자 개수 (system_compositions.csv)
+    exact_fraction.npy     bool   atom_count / Σatom_count (float64) 가 원본 CSV 의 분율과 정확히 같은 행
+    h_count.npy            int32  시스템별 H 원자 개수
+    reference_energy.npy   float64 (없으면 NaN)
+    get_energy.npy         float64 (없으면 NaN)
+    adsorp_energy.npy      float64 (없으면 NaN)
+
+조성 dictionary / 문자열을 읽을 때는 exact_fraction 행의 분율을 atom_count 에서 float64 로 다시 계산하므로
+저장소와 CSV 경로가 같은 값(같은 문자열)을 반환합니다.
+
+컴파일 (프로젝트 루트에서):
+    python -m dft.binary_store --data-dir data/hydrogen
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from dft.composition_codec import ERROR_SENTINEL, format_composition, parse_composition_column, try_parse_composition
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 2
+DEFAULT_DATA_DIR = "data/hydrogen"
+STORE_DIRNAME = "store"
+
+COMPOSITIONS_CSV = "system_compositions.csv"
+FRACTION_CSV = "system_compositions_fraction.csv"
+INFO_CSV = "system_info.csv"
+ADSORP_CSV = "system_info_with_adsorp.csv"
+SOURCE_FILES = [COMPOSITIONS_CSV, FRACTION_CSV, INFO_CSV, ADSORP_CSV]
+
+
+def _file_fingerprint(path: str) -> Dict[str, object]:
+    """원본 파일의 크기, mtime, sha1"""
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha1.update(chunk)
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha1": sha1.hexdigest()}
+
+
+def save_npy_atomic(path: str, array: np.ndarray):
+    """
+    임시 파일에 쓴 뒤 rename 으로 교체합니다.
+    다른 프로세스가 mmap 중인 기존 파일(inode)은 그대로 남으므로 읽던 배열이 깨지지 않습니다.
+    """
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def write_json_atomic(path: str, data: dict):
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _read_csv_rows(path: str) -> List[Dict[str, str]]:
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+def _float_or_nan(text: Optional[str]) -> float:
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def compile_dataset(data_dir: str = DEFAULT_DATA_DIR, store_dir: Optional[str] = None) -> str:
+    """
+    data_dir 의 CSV 파일들을 바이너리 컬럼 저장소로 컴파일합니다.
+
+    Args:
+        data_dir: system_compositions_fraction.csv 등이 있는 디렉토리
+        store_dir: 출력 디렉토리 (기본값: data_dir/store)
+
+    Returns:
+        생성된 저장소 디렉토리 경로
+    """
+    store_dir = store_dir or os.path.join(data_dir, STORE_DIRNAME)
+    fraction_rows = _read_csv_rows(os.path.join(data_dir, FRACTION_CSV))
+    if not fraction_rows:
+        raise FileNotFoundError(f"{os.path.join(data_dir, FRACTION_CSV)} 가 없거나 비어 있습니다.")
+
+    atom_counts = {row["system_id"]: try_parse_composition(row["composition"])
+                   for row in _read_csv_rows(os.path.join(data_dir, COMPOSITIONS_CSV))}
+    info = {row["system_id"]: row for row in _read_csv_rows(os.path.join(data_dir, INFO_CSV))}
+    adsorp = {}
+    for row in _read_csv_rows(os.path.join(data_dir, ADSORP_CSV)):
+        adsorp.setdefault(row["system_id"], row)
+
+    n_systems = len(fraction_rows)
+    element_table: Dict[str, int] = {}
+    # 분율 컬럼 전체를 한 번에 CSR 로 디코딩 (ERROR_SENTINEL 행은 valid=False)
+    column = parse_composition_column((r["composition_fraction"] for r in fraction_rows), element_table)
+    valid = column.valid & (np.diff(column.indptr) > 0)
+    indptr = column.indptr
+    h_count = np.zeros(n_systems, dtype=np.int32)
+    reference_energy = np.full(n_systems, np.nan)
+    get_energy = np.full(n_systems, np.nan)
+    adsorp_energy = np.full(n_systems, np.nan)
+    atom_count = np.zeros(len(column.element_idx), dtype=np.int32)
+    element_symbols = [column.elements[e] for e in column.element_idx.tolist()]
+
+    for row, record in enumerate(fraction_rows):
+        system_id = record["system_id"]
+        counts = atom_counts.get(system_id) or {}
+        if counts:
+            for pos in range(indptr[row], indptr[row + 1]):
+                atom_count[pos] = int(counts.get(element_symbols[pos], 0))
+        h_count[row] = int(counts.get("H", 0))
+
+        energy_row = adsorp.get(system_id)
+        if energy_row is not None:
+            reference_energy[row] = _float_or_nan(energy_row.get("reference_energy"))
+            get_energy[row] = _float_or_nan(energy_row.get("get_energy"))
+            adsorp_energy[row] = _float_or_nan(energy_row.get("adsorp_energy"))
+        if np.isnan(reference_energy[row]) and system_id in info:
+            reference_energy[row] = _float_or_nan(info[system_id].get("reference_energy"))
+
+    # 원자 개수로 CSV 의 float64 분율을 그대로 복원할 수 있는 행 (읽을 때 float32 대신 사용)
+    counts = atom_count.astype(np.float64)
+    row_of = np.repeat(np.arange(n_systems), np.diff(indptr))
+    totals = np.bincount(row_of, weights=counts, minlength=n_systems)[row_of]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inexact = ~((counts > 0) & (counts / totals == column.values))
+    exact_fraction = valid & (np.bincount(row_of, weights=inexact, minlength=n_systems) == 0)
+    if (valid & ~exact_fraction).any():
+        logger.warning(f"원자 개수로 분율을 복원할 수 없는 {int((valid & ~exact_fraction).sum())}개 행은 "
+                       f"float32 분율의 최단 10진 표현으로 읽습니다.")
+
+    os.makedirs(store_dir, exist_ok=True)
+    columns = {
+        "system_ids": np.array([r["system_id"].encode("utf-8") for r in fraction_rows], dtype=np.bytes_),
+        "valid": valid,
+        "indptr": indptr,
+        "element_idx": column.element_idx.astype(np.int16),
+        "fraction": column.values.astype(np.float32),
+        "atom_count": atom_count,
+        "exact_fraction": exact_fraction,
+        "h_count": h_count,
+        "reference_energy": reference_energy,
+        "get_energy": get_energy,
+        "adsorp_energy": adsorp_energy,
+    }
+    for name, array in columns.items():
+        save_npy_atomic(os.path.join(store_dir, f"{name}.npy"), array)
+
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "n_systems": n_systems,
+        "elements": list(element_table),
+        "sources": {name: _file_fingerprint(os.path.join(data_dir, name))
+                    for name in SOURCE_FILES if os.path.exists(os.path.join(data_dir, name))},
+    }
+    # meta.json 은 마지막에 기록하여, 컴파일 도중의 저장소가 완성본으로 보이지 않도록 함
+    write_json_atomic(os.path.join(store_dir, "meta.json"), meta)
+
+    logger.info(f"바이너리 저장소 컴파일 완료: {store_dir} ({n_systems}개 시스템, {len(element_table)}개 원소)")
+    return store_dir
+
+
+class CompositionStore:
+    """mmap 으로 열린 바이너리 컬럼 저장소"""
+
+    COLUMNS = ["system_ids", "valid", "indptr", "element_idx", "fraction", "atom_count", "exact_fraction",
+               "h_count", "reference_energy", "get_energy", "adsorp_energy"]
+
+    def __init__(self, store_dir: str, mmap: bool = True):
+        """
+        Args:
+            store_dir: compile_dataset 으로 생성한 디렉토리
+            mmap: True 이면 배열을 읽기 전용 memory map 으로 엶
+        """
+        with open(os.path.join(store_dir, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 저장소 형식 버전: {self.meta.get('format_version')}")
+
+        self.store_dir = store_dir
+        self.elements: List[str] = self.meta["elements"]
+        self.n_systems: int = self.meta["n_systems"]
+        mmap_mode = "r" if mmap else None
+        for name in self.COLUMNS:
+            setattr(self, name, np.load(os.path.join(store_dir, f"{name}.npy"), mmap_mode=mmap_mode))
+        # 재컴파일 도중에 열린 경우 컬럼 길이가 서로 맞지 않을 수 있음
+        if (len(self.system_ids) != self.n_systems or len(self.indptr) != self.n_systems + 1
+                or len(self.fraction) != self.indptr[-1]):
+            raise ValueError("저장소 컬럼 길이가 meta.json 과 일치하지 않습니다 (재컴파일 중일 수 있음)")
+
+    def __len__(self) -> int:
+        return self.n_systems
+
+    def system_id(self, row: int) -> str:
+        return self.system_ids[row].decode("utf-8")
+
+    def exact_fractions(self, start: int, stop: int) -> np.ndarray:
+        """
+        CSR 항목 [start, stop) 의 float64 분율 (start, stop 은 행 경계)
+        exact_fraction 행은 atom_count / Σatom_count 로 CSV 와 같은 값을, 나머지 행은 float32 값의 최단 10진 표현을 사용
+        """
+        row_start = int(np.searchsorted(self.indptr, start, side="right")) - 1
+        row_stop = int(np.searchsorted(self.indptr, stop, side="left"))
+        lengths = np.diff(self.indptr[row_start:row_stop + 1])
+        row_of = np.repeat(np.arange(row_stop - row_start), lengths)
+        counts = self.atom_count[start:stop].astype(np.float64)
+        totals = np.bincount(row_of, weights=counts, minlength=len(lengths))[row_of]
+        # float32 → 최단 10진 표현 → float64 (0.33333334 가 0.3333333432674408 로 보이지 않도록)
+        fractions = self.fraction[start:stop].astype(str).astype(np.float64)
+        exact = np.asarray(self.exact_fraction[row_start:row_stop])[row_of]
+        fractions[exact] = counts[exact] / totals[exact]
+        return fractions
+
+    def composition(self, row: int) -> Optional[Dict[str, float]]:
+        """행의 조성 dictionary (분율은 exact_fractions 참고). 파싱 실패 행은 None"""
+        if not self.valid[row]:
+            return None
+        start, end = int(self.indptr[row]), int(self.indptr[row + 1])
+        return dict(zip((self.elements[e] for e in self.element_idx[start:end].tolist()),
+                        self.exact_fractions(start, end).tolist()))
+
+    def compositions(self, limit: Optional[int] = None) -> List[Optional[Dict[str, float]]]:
+        """앞에서부터 limit 개 행의 조성 dictionary 목록 (컬럼 단위로 한 번에 변환)"""
+        n = self.n_systems if limit is None else min(limit, self.n_systems)
+        indptr = self.indptr[:n + 1].tolist()
+        nnz = indptr[-1]
+        symbols = [self.elements[e] for e in self.element_idx[:nnz].tolist()]
+        fractions = self.exact_fractions(0, nnz).tolist()
+        valid = self.valid[:n].tolist()
+        return [
+            dict(zip(symbols[indptr[row]:indptr[row + 1]], fractions[indptr[row]:indptr[row + 1]]))
+            if valid[row] else None
+            for row in range(n)
+        ]
+
+    def composition_strings(self, limit: Optional[int] = None) -> List[str]:
+        """system_compositions_fraction.csv 의 composition_fraction 컬럼과 같은 형식의 문자열 목록"""
+        return [format_composition(comp) if comp is not None else ERROR_SENTINEL for comp in self.compositions(limit)]
+
+    def is_fresh(self, data_dir: str) -> bool:
+        """원본 CSV 가 컴파일 이후 변경되지 않았는지 확인 (mtime 이 다르면 sha1 로 재확인)"""
+        for name, recorded in self.meta.get("sources", {}).items():
+            path = os.path.join(data_dir, name)
+            if not os.path.exists(path):
+                continue
+            stat = os.stat(path)
+            if stat.st_size != recorded["size"]:
+                return False
+            if stat.st_mtime_ns != recorded["mtime_ns"] and _file_fingerprint(path)["sha1"] != recorded["sha1"]:
+                return False
+        return True
+
+
+def open_store(data_dir: str = DEFAULT_DATA_DIR, store_dir: Optional[str] = None,
+               mmap: bool = True) -> Optional[CompositionStore]:
+    """
+    data_dir 옆의 바이너리 저장소를 엽니다.
+    저장소가 없거나 원본 CSV 보다 오래되었거나 numpy 로 열 수 없으면 None 을 반환하므로,
+    호출 측은 CSV 경로로 대체(fallback)하면 됩니다.
+    """
+    store_dir = store_dir or os.path.join(data_dir, STORE_DIRNAME)
+    if not os.path.exists(os.path.join(store_dir, "meta.json")):
+        return None
+    try:
+        store = CompositionStore(store_dir, mmap=mmap)
+    except Exception as e:
+        logger.warning(f"바이너리 저장소를 열 수 없습니다 ({store_dir}): {e}")
+        return None
+    if not store.is_fresh(data_dir):
+        logger.warning(f"바이너리 저장소가 원본 CSV 보다 오래되었습니다 - CSV 를 사용합니다: {store_dir}")
+        return None
+    return store
+
+
+def read_composition_strings(data_dir: str = DEFAULT_DATA_DIR, limit: Optional[int] = None) -> List[str]:
+    """
+    composition_fraction 컬럼을 파일 순서대로 최대 limit 개 반환합니다.
+    최신 바이너리 저장소가 있으면 저장소에서, 없으면 CSV 에서 읽습니다.
+    """
+    store = open_store(data_dir)
+    if store is not None:
+        return store.composition_strings(limit)
+    strings = []
+    with open(os.path.join(data_dir, FRACTION_CSV), encoding="utf-8-sig") as f:
+        for record in csv.DictReader(f):
+            if limit is not None and len(strings) >= limit:
+                break
+            strings.append(record["composition_fraction"])
+    return strings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV 데이터셋을 바이너리 컬럼 저장소로 컴파일")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    parser.add_argument("--store-dir", default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    store_dir = compile_dataset(args.data_dir, args.store_dir)
+    store = CompositionStore(store_dir)
+    print(f"{store_dir}: {len(store)}개 시스템, {len(store.elements)}개 원소, {store.fraction.size}개 CSR 항목")
+
+
+if __name__ == "__main__":
+    main()
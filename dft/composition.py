@@ -0,0 +1,141 @@
+"""
+Canonical composition type
+
+조성은 {원소: 분율} dict 로 오가며, 같은 조성인지 비교하려면 원소 집합과 원소별 분율 차이를 매번 확인해야 했습니다.
+Composition 은 변경할 수 없는(frozen) dict 이며 생성 시 한 번 정규화 키(canonical key)를 계산해 둡니다.
+
+- 정규화 키:  정렬된 원소와 tolerance 격자로 양자화한 분율 (예: {'Pt': 0.75, 'Sc': 0.25} → (('Pt', 750000), ('Sc', 250000)))
+- 같음/해시:  정규화 키로 비교하므로 ==, hash, set/dict 를 이용한 중복 제거가 O(1)
+- 정수비:    atom_ratio() 는 분율을 가장 작은 정수 원자비로 변환 (예: {'Pt': 3, 'Sc': 1}), formula() 는 "Pt3Sc"
+
+dict 의 하위 클래스이므로 기존에 조성 dict 를 받던 코드와 json 직렬화가 그대로 동작합니다.
+원소 순서는 입력 순서를 유지합니다. (응답과 로그가 이전과 같도록)
+"""
+
+import math
+import numbers
+from fractions import Fraction
+from typing import Dict, Iterable, Mapping, Tuple, Union
+
+TOLERANCE = 1e-6
+# atom_ratio 의 분모 상한 (데이터셋의 슬랩 원자 수 범위)
+MAX_DENOMINATOR = 64
+
+CanonicalKey = Tuple[Tuple[str, int], ...]
+
+
+def canonical_key(composition: Mapping[str, float], tolerance: float = TOLERANCE) -> CanonicalKey:
+    """
+    조성 dictionary 를 원소 순서와 무관한 해시 가능한 키로 변환합니다.
+    각 fraction 은 tolerance 격자로 양자화됩니다. (예: {'Pt': 0.75, 'Sc': 0.25} → (('Pt', 750000), ('Sc', 250000)))
+    Composition 은 생성 시 계산해 둔 키를 그대로 반환합니다.
+    """
+    if isinstance(composition, Composition) and tolerance == TOLERANCE:
+        return composition.key
+    return tuple(sorted((element, int(round(fraction / tolerance))) for element, fraction in composition.items()))
+
+
+def _frozen(self, *args, **kwargs):
+    raise TypeError("Composition 은 변경할 수 없습니다. (dict(composition) 으로 복사한 뒤 수정하세요)")
+
+
+class Composition(dict):
+    """정규화 키로 비교·해시되는 변경 불가능한 조성 dictionary"""
+
+    __slots__ = ("_key", "_hash")
+
+    def __init__(self, fractions: Union[Mapping[str, float], Iterable[Tuple[str, float]]] = ()):
+        """
+        Args:
+            fractions: {원소: 분율} dictionary 또는 (원소, 분율) 목록
+
+        원소가 문자열이 아니거나 분율이 유한한 숫자가 아니면 TypeError / ValueError 를 발생시킵니다.
+        """
+        items = fractions.items() if isinstance(fractions, Mapping) else fractions
+        normalized = {}
+        for element, fraction in items:
+            if not isinstance(element, str):
+                raise TypeError(f"원소 이름은 문자열이어야 합니다: {element!r}")
+            if isinstance(fraction, bool) or not isinstance(fraction, numbers.Real):
+                raise TypeError(f"{element} 의 분율이 숫자가 아닙니다: {fraction!r}")
+            if not math.isfinite(fraction):
+                raise ValueError(f"{element} 의 분율이 유한한 값이 아닙니다: {fraction!r}")
+            # numpy 실수 등은 json 직렬화가 되도록 float 로 변환
+            normalized[element] = fraction if type(fraction) in (int, float) else float(fraction)
+        dict.__init__(self, normalized)
+        self._key = canonical_key(normalized)
+        self._hash = hash(self._key)
+
+    @classmethod
+    def coerce(cls, composition: Union["Composition", Mapping[str, float]]) -> "Composition":
+        """이미 Composition 이면 그대로, 아니면 변환하여 반환합니다."""
+        return composition if isinstance(composition, cls) else cls(composition)
+
+    @property
+    def key(self) -> CanonicalKey:
+        """정규화 키 (정렬된 원소, 양자화된 분율)"""
+        return self._key
+
+    @property
+    def elements(self) -> Tuple[str, ...]:
+        """정렬된 원소 tuple"""
+        return tuple(element for element, _ in self._key)
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Composition):
+            return self._hash == other._hash and self._key == other._key
+        if isinstance(other, Mapping):
+            try:
+                return self._key == canonical_key(other)
+            except (AttributeError, TypeError, ValueError):
+                return False
+        return NotImplemented
+
+    def __ne__(self, other) -> bool:
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __repr__(self) -> str:
+        return f"Composition({dict.__repr__(self)})"
+
+    def __reduce__(self):
+        return Composition, (dict(self),)
+
+    def __copy__(self) -> "Composition":
+        return self
+
+    def __deepcopy__(self, memo) -> "Composition":
+        return self
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = __ior__ = _frozen
+
+    def to_dict(self) -> Dict[str, float]:
+        """수정 가능한 일반 dict 복사본"""
+        return dict(self)
+
+    def atom_ratio(self, max_denominator: int = MAX_DENOMINATOR) -> Dict[str, int]:
+        """
+        분율을 가장 작은 정수 원자비로 변환합니다. (정렬된 원소 순서)
+        예: {'Pt': 0.75, 'Sc': 0.25} → {'Pt': 3, 'Sc': 1}, {'Hf': 0.33333334, 'Sb': 0.5, 'Ga': 0.16666667} → {'Ga': 1, 'Hf': 2, 'Sb': 3}
+        """
+        total = sum(self.values())
+        if total <= 0:
+            raise ValueError("조성의 분율 합이 0 입니다.")
+        ratios = {element: Fraction(self[element] / total).limit_denominator(max_denominator)
+                  for element in self.elements}
+        denominator = 1
+        for ratio in ratios.values():
+            denominator = denominator * ratio.denominator // math.gcd(denominator, ratio.denominator)
+        counts = {element: int(ratio * denominator) for element, ratio in ratios.items()}
+        divisor = 0
+        for count in counts.values():
+            divisor = math.gcd(divisor, count)
+        return {element: count // divisor for element, count in counts.items()} if divisor else counts
+
+    def formula(self, max_denominator: int = MAX_DENOMINATOR) -> str:
+        """정수 원자비 화학식 (예: "Pt3Sc")"""
+        return "".join(element + (str(count) if count != 1 else "")
+                       for element, count in self.atom_ratio(max_denominator).items() if count)
@@ -0,0 +1,154 @@
+"""
+Composition string codec
+
+데이터 파일과 LLM 출력에 쓰이는 조성 문자열 {'Pt': 0.75, 'Sc': 0.25} (Python dict repr) 전용 인코더/디코더입니다.
+ast.literal_eval 은 임의의 Python 리터럴을 위한 범용 파서(토크나이저 + AST 생성)라서 이 단순한 문법에는
+과하게 느리므로, 문법을 정규식 하나로 정의하고 문자열을 앞에서부터 한 번만 훑어 파싱합니다.
+
+    조성   := '{' (쌍 (',' 쌍)* ','?)? '}'
+    쌍     := 따옴표 원소기호 따옴표 ':' 숫자        (따옴표는 ' 또는 ")
+    숫자   := 정수 | 소수 | 지수 표기               (정수는 int, 나머지는 float 로 디코딩)
+
+- 원소 기호는 sys.intern 으로 intern 되어 수많은 조성 dict 가 같은 문자열 객체를 공유합니다.
+- "Error or Not Available" (ERROR_SENTINEL) 은 오류가 아니라 "값 없음" 으로 처리되어 None 을 반환합니다.
+- parse_composition_column 은 컬럼 전체를 한 번에 CSR 배열(원소 번호 + float64 값)로 변환합니다.
+"""
+
+import re
+import sys
+from typing import Dict, Iterable, List, NamedTuple, Optional, Union
+
+import numpy as np
+
+ERROR_SENTINEL = "Error or Not Available"
+
+Number = Union[int, float]
+
+_SYMBOL = r"[A-Za-z][A-Za-z0-9_]*"
+_NUMBER = r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+_KEY = rf"""(?:'{_SYMBOL}'|"{_SYMBOL}")"""
+
+# 한 쌍 - match(text, pos) 로 이어서 적용하여 문자열을 한 번만 훑음
+_PAIR = re.compile(rf"""\s*['"]({_SYMBOL})['"]\s*:\s*({_NUMBER})\s*(,?)""")
+# 조성 전체 (컬럼 파싱 시 행 단위 검증)
+_COMPOSITION = re.compile(rf"\s*\{{\s*(?:{_KEY}\s*:\s*{_NUMBER}\s*(?:,\s*{_KEY}\s*:\s*{_NUMBER}\s*)*,?\s*)?\}}\s*")
+# 검증된 컬럼 텍스트에서 원소 기호와 숫자를 각각 추출 (검증 후이므로 단순한 패턴으로 충분)
+_FLAT_SYMBOLS = re.compile(rf"""['"]({_SYMBOL})['"]""")
+_FLAT_NUMBERS = re.compile(r":\s*([^,}\s]+)")
+
+
+class CompositionParseError(ValueError):
+    """조성 문자열이 문법에 맞지 않음"""
+
+
+def _number(text: str) -> Number:
+    if "." in text or "e" in text or "E" in text:
+        return float(text)
+    return int(text)
+
+
+def parse_composition(text: Optional[str]) -> Optional[Dict[str, Number]]:
+    """
+    조성 문자열 하나를 dict 로 디코딩합니다.
+
+    Returns:
+        원소 → 값 dict. 빈 문자열, None, ERROR_SENTINEL 이면 None
+    Raises:
+        CompositionParseError: 문법에 맞지 않는 문자열
+    """
+    if text is None:
+        return None
+    text = text.strip()
+    if not text or text == ERROR_SENTINEL:
+        return None
+    if text[0] != "{" or text[-1] != "}":
+        raise CompositionParseError(f"조성 문자열이 아닙니다: {text[:80]!r}")
+
+    end = len(text) - 1
+    pos = 1
+    composition: Dict[str, Number] = {}
+    while True:
+        match = _PAIR.match(text, pos, end)
+        if match is None:
+            break
+        symbol, number, comma = match.groups()
+        composition[sys.intern(symbol)] = _number(number)
+        pos = match.end()
+        if not comma:
+            break
+    if text[pos:end].strip():
+        raise CompositionParseError(f"조성 문자열을 해석할 수 없습니다 (위치 {pos}): {text[:80]!r}")
+    return composition
+
+
+def try_parse_composition(text: Optional[str]) -> Optional[Dict[str, Number]]:
+    """parse_composition 과 같지만 문법 오류도 None 으로 반환합니다."""
+    try:
+        return parse_composition(text)
+    except CompositionParseError:
+        return None
+
+
+def format_composition(composition: Dict[str, Number]) -> str:
+    """dict 를 데이터 파일과 같은 형식(str(dict) 와 동일)의 문자열로 인코딩합니다."""
+    return "{" + ", ".join(f"{symbol!r}: {value!r}" for symbol, value in composition.items()) + "}"
+
+
+class CompositionColumn(NamedTuple):
+    """
+    조성 컬럼의 CSR 표현
+
+    행 r 의 원소 번호는 element_idx[indptr[r]:indptr[r+1]], 값은 values[같은 구간] 입니다.
+    파싱할 수 없는 행(ERROR_SENTINEL 포함)은 valid[r] 이 False 이고 항목이 없습니다.
+    """
+    elements: List[str]
+    indptr: np.ndarray
+    element_idx: np.ndarray
+    values: np.ndarray
+    valid: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.valid)
+
+    def to_dicts(self) -> List[Optional[Dict[str, float]]]:
+        """행별 조성 dict 목록 (파싱할 수 없는 행은 None)"""
+        indptr = self.indptr.tolist()
+        symbols = [self.elements[e] for e in self.element_idx.tolist()]
+        values = self.values.tolist()
+        return [
+            dict(zip(symbols[indptr[row]:indptr[row + 1]], values[indptr[row]:indptr[row + 1]]))
+            if is_valid else None
+            for row, is_valid in enumerate(self.valid.tolist())
+        ]
+
+
+def parse_composition_column(texts: Iterable[Optional[str]],
+                             element_table: Optional[Dict[str, int]] = None) -> CompositionColumn:
+    """
+    조성 문자열 컬럼 전체를 한 번에 CSR 배열로 디코딩합니다.
+    각 행을 문법으로 검증한 뒤 유효한 행들을 하나의 문자열로 이어 붙여 원소 기호와 숫자를
+    정규식으로 한꺼번에 추출하고, 숫자는 NumPy 로 한꺼번에 float64 변환합니다.
+
+    Args:
+        texts: 조성 문자열들 (None, ERROR_SENTINEL, 문법 오류 행은 invalid 로 표시)
+        element_table: 원소 → 번호 테이블. 주어지면 새 원소를 이어서 추가하며 갱신합니다.
+    """
+    texts = [text or "" for text in texts]
+    valid = np.fromiter((_COMPOSITION.fullmatch(text) is not None for text in texts), dtype=bool, count=len(texts))
+    valid_texts = [text for text, is_valid in zip(texts, valid.tolist()) if is_valid]
+
+    counts = np.zeros(len(texts), dtype=np.int64)
+    # 검증된 행에서 ':' 는 쌍 구분에만 쓰이므로 개수가 곧 원소 수
+    counts[valid] = np.fromiter((text.count(":") for text in valid_texts), dtype=np.int64, count=len(valid_texts))
+    indptr = np.zeros(len(texts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+
+    joined = "\n".join(valid_texts)
+    symbols = _FLAT_SYMBOLS.findall(joined)
+    table = {} if element_table is None else element_table
+    for symbol in dict.fromkeys(symbols):  # 처음 등장한 순서대로 번호 부여
+        table.setdefault(sys.intern(symbol), len(table))
+    element_idx = np.fromiter(map(table.__getitem__, symbols), dtype=np.int32, count=len(symbols))
+    values = np.array(_FLAT_NUMBERS.findall(joined), dtype=np.float64)
+    elements = list(table)
+    return CompositionColumn(elements, indptr, element_idx, values, valid)
@@ -0,0 +1,132 @@
+"""
+Composition groups
+
+같은 분율 조성(정규화 키가 같은 행들)을 가진 여러 system_id 를 하나의 그룹으로 묶고,
+그룹별 흡착 에너지 개수·최솟값·평균·표준편차·최댓값을 로드 시 한 번에 계산해 둡니다.
+(예: 같은 합금의 다른 표면/흡착 자리) 조회는 행 → 그룹 번호 → 미리 계산된 값으로 O(1) 입니다.
+"""
+
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+# 조성 하나에 여러 시스템이 있을 때 대표 에너지를 고르는 방법 (first: 파일 순서상 첫 시스템)
+REDUCTIONS = ("first", "min", "mean", "max")
+
+
+class CompositionGroup(NamedTuple):
+    """같은 조성을 가진 시스템들과 흡착 에너지 집계 (에너지가 없는 시스템은 집계에서 제외)"""
+    system_ids: List[str]
+    count: int
+    energy_count: int
+    min: Optional[float]
+    mean: Optional[float]
+    std: Optional[float]
+    max: Optional[float]
+    min_system_id: Optional[str]
+    max_system_id: Optional[str]
+
+    def to_dict(self, include_system_ids: bool = True) -> Dict[str, object]:
+        """응답용 집계 dictionary (std 는 모표준편차)"""
+        stats = {
+            "count": self.count,
+            "energy_count": self.energy_count,
+            "min": self.min,
+            "mean": self.mean,
+            "std": self.std,
+            "max": self.max,
+            "min_system_id": self.min_system_id,
+            "max_system_id": self.max_system_id,
+        }
+        if include_system_ids:
+            stats["system_ids"] = self.system_ids
+        return stats
+
+
+class CompositionGroups:
+    """행 → 그룹 번호와 그룹별 에너지 집계 배열"""
+
+    def __init__(self, row_group: np.ndarray, system_ids: Sequence[str], energies: Dict[str, float]):
+        """
+        Args:
+            row_group: 행 → 그룹 번호 (그룹 번호는 각 그룹의 첫 행 순서로 0 부터 매김, 첫 행이 대표)
+            system_ids: 행 순서의 system_id
+            energies: system_id → adsorption energy
+        """
+        self.system_ids = system_ids
+        self.row_group = np.asarray(row_group, dtype=np.int64)
+        n_groups = int(self.row_group.max()) + 1 if len(self.row_group) else 0
+        # 그룹별 행 번호 (CSR, 그룹 안에서는 파일 순서)
+        self.group_order = np.argsort(self.row_group, kind="stable")
+        self.group_indptr = np.searchsorted(self.row_group[self.group_order], np.arange(n_groups + 1))
+
+        row_energy = np.array([energies.get(sid, np.nan) for sid in system_ids], dtype=np.float64)
+        known = np.flatnonzero(~np.isnan(row_energy))
+        groups = self.row_group[known]
+        values = row_energy[known]
+        self.energy_count = np.bincount(groups, minlength=n_groups)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.mean = np.bincount(groups, weights=values, minlength=n_groups) / self.energy_count
+            deviations = (values - self.mean[groups]) ** 2
+            self.std = np.sqrt(np.bincount(groups, weights=deviations, minlength=n_groups) / self.energy_count)
+
+        # (그룹, 에너지) 순으로 정렬하면 그룹마다 첫 행이 최솟값, 마지막 행이 최댓값
+        order = known[np.lexsort((values, groups))]
+        sorted_groups = self.row_group[order]
+        bounds = np.searchsorted(sorted_groups, np.arange(n_groups + 1))
+        has_energy = self.energy_count > 0
+        self.min_row = np.full(n_groups, -1, dtype=np.int64)
+        self.max_row = np.full(n_groups, -1, dtype=np.int64)
+        self.min_row[has_energy] = order[bounds[:-1][has_energy]]
+        self.max_row[has_energy] = order[bounds[1:][has_energy] - 1]
+        self.row_energy = row_energy
+
+    def __len__(self) -> int:
+        return len(self.group_indptr) - 1
+
+    def rows_of(self, group: int) -> List[int]:
+        """그룹의 행 번호 목록 (파일 순서, 첫 행이 대표)"""
+        return self.group_order[self.group_indptr[group]:self.group_indptr[group + 1]].tolist()
+
+    def group_of(self, row: int) -> CompositionGroup:
+        """row 가 속한 그룹의 집계"""
+        group = int(self.row_group[row])
+        rows = self.rows_of(group)
+        if not self.energy_count[group]:
+            return CompositionGroup([self.system_ids[r] for r in rows], len(rows), 0,
+                                    None, None, None, None, None, None)
+        min_row, max_row = int(self.min_row[group]), int(self.max_row[group])
+        return CompositionGroup(
+            system_ids=[self.system_ids[r] for r in rows],
+            count=len(rows),
+            energy_count=int(self.energy_count[group]),
+            min=float(self.row_energy[min_row]),
+            mean=float(self.mean[group]),
+            std=float(self.std[group]),
+            max=float(self.row_energy[max_row]),
+            min_system_id=self.system_ids[min_row],
+            max_system_id=self.system_ids[max_row],
+        )
+
+    def reduce(self, row: int, reduction: str = "first") -> Optional[float]:
+        """row 가 속한 그룹의 대표 에너지 (first 는 그룹의 첫 행이 아니라 row 자신의 에너지)"""
+        if reduction not in REDUCTIONS:
+            raise ValueError(f"reduction 은 {REDUCTIONS} 중 하나여야 합니다: {reduction!r}")
+        if reduction == "first":
+            energy = self.row_energy[row]
+            return None if np.isnan(energy) else float(energy)
+        group = int(self.row_group[row])
+        if not self.energy_count[group]:
+            return None
+        if reduction == "mean":
+            return float(self.mean[group])
+        return float(self.row_energy[self.min_row[group] if reduction == "min" else self.max_row[group]])
+
+    def reduced_system_id(self, row: int, reduction: str = "first") -> str:
+        """reduction 으로 고른 에너지를 가진 system_id (mean 과 first 는 row 자신)"""
+        group = int(self.row_group[row])
+        if reduction == "min" and self.min_row[group] >= 0:
+            return self.system_ids[int(self.min_row[group])]
+        if reduction == "max" and self.max_row[group] >= 0:
+            return self.system_ids[int(self.max_row[group])]
+        return self.system_ids[row]
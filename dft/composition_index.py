@@ -0,0 +1,426 @@
+"""
+Composition lookup index
+
+system_compositions_fraction.csv 와 system_info_with_adsorp.csv 를 프로세스당 한 번만 읽어
+정규화된 조성 키(canonical key) → system_id → adsorption energy 해시 인덱스를 구축합니다.
+조회는 O(1)이며 기존 선형 탐색과 동일하게 원소별 1e-6 tolerance 를 만족하는 조성을 찾습니다.
+컴파일된 바이너리 저장소(dft.binary_store)가 CSV 옆에 있으면 CSV 파싱 대신 저장소를 사용합니다.
+장시간 실행되는 서버는 IndexReloader.start() 로 데이터 파일을 감시하여 변경 시 인덱스를 무중단 교체합니다.
+"""
+
+import csv
+import hashlib
+import itertools
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, TypeVar
+
+import numpy as np
+
+from dft.binary_phase_lines import BinaryPhaseLines
+from dft.binary_store import ADSORP_CSV, FRACTION_CSV, STORE_DIRNAME, CompositionStore, compile_dataset, open_store
+from dft.composition import TOLERANCE, CanonicalKey, canonical_key
+from dft.composition_codec import parse_composition_column
+from dft.composition_groups import REDUCTIONS, CompositionGroup, CompositionGroups
+from dft.composition_sampler import CompositionSampler
+from dft.composition_table import CompositionTable
+from dft.element_energy_stats import ElementEnergyStats
+from dft.element_postings import ElementPostings
+from dft.range_index import RangeIndex
+from dft.similarity_index import SimilarityIndex
+
+DEFAULT_COMP_CSV_PATH = "data/hydrogen/system_compositions_fraction.csv"
+DEFAULT_INFO_CSV_PATH = "data/hydrogen/system_info_with_adsorp.csv"
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class CompositionMatch(NamedTuple):
+    """조성 조회 결과"""
+    system_id: str
+    composition: Dict[str, float]
+    adsorp_energy: Optional[float]
+    group: Optional[CompositionGroup] = None  # 같은 조성을 가진 모든 시스템과 에너지 집계
+
+
+class CompositionIndex:
+    """조성 → system_id → adsorption energy 인메모리 인덱스"""
+
+    # 서비스에 교체해 넣기 전에 미리 생성하는 보조 인덱스 (accessor 이름, quest_data._publish_database 참고)
+    WARM_UP = (
+        "element_postings",  # 검색용 원소 → 행 역색인
+        "range_index",  # 분율·에너지 구간 질의용 정렬 배열
+        "composition_sampler",  # 샘플링용 n 원계 partition 과 원소 계열 층
+        "similarity_index",  # 유사 조성 검색용 행 합·노름과 물성 descriptor 트리
+        "element_energy_stats",  # 원소·원소 쌍·n 원계별 에너지 통계
+        "binary_phase_lines",  # 원소 쌍별 혼합 축(x_A) 정렬 배열
+    )
+
+    def __init__(self, system_ids: List[str], compositions: List[Dict[str, float]],
+                 energies: Dict[str, float], tolerance: float = TOLERANCE):
+        """
+        Args:
+            system_ids: 파일 순서대로 정렬된 system_id 목록
+            compositions: system_ids 와 같은 순서의 조성 dictionary 목록
+            energies: system_id → adsorption energy
+            tolerance: 조성 비교 허용 오차
+        """
+        self.system_ids = system_ids
+        # 조성은 행마다 dict 로 두지 않고 CSR 배열(CompositionTable)로 저장, compositions[row] 는 읽을 때 생성
+        self.table = CompositionTable.from_compositions(system_ids, compositions)
+        self.compositions = self.table.compositions
+        self.energies = energies
+        self.tolerance = tolerance
+        # 처음 호출될 때 한 번만 생성하는 보조 인덱스 (_lazy 참고)
+        self._derived: Dict[str, object] = {}
+        self._derived_locks: Dict[str, threading.Lock] = {}
+        self._derived_lock = threading.Lock()
+
+        # 정규화 키가 같은 행들이 한 그룹 - 같은 키에 여러 행이 있으면 파일 순서상 첫 행이 대표 (기존 선형 탐색과 동일)
+        keys: Dict[CanonicalKey, int] = {}
+        row_group = np.fromiter((keys.setdefault(canonical_key(composition, tolerance), len(keys))
+                                 for composition in compositions), dtype=np.int64, count=len(compositions))
+        # 키 tuple 은 상주시키지 않고 그룹별 키 해시의 정렬 배열만 보관 (해시가 같은 다른 키의 행은 _matches 에서 걸러짐)
+        key_hash = np.fromiter((hash(key) for key in keys), dtype=np.int64, count=len(keys))
+        self._key_groups = np.argsort(key_hash, kind="stable")
+        self._key_hash = key_hash[self._key_groups]
+        # 조성 그룹별 system_id 목록과 에너지 min/mean/std/max 를 미리 계산
+        self.groups = CompositionGroups(row_group, system_ids, energies)
+
+    @classmethod
+    def from_csv(cls, comp_csv_path: str = DEFAULT_COMP_CSV_PATH,
+                 info_csv_path: str = DEFAULT_INFO_CSV_PATH,
+                 tolerance: float = TOLERANCE) -> "CompositionIndex":
+        """두 CSV 파일을 한 번씩 읽어 인덱스를 생성합니다."""
+        with open(comp_csv_path, encoding="utf-8-sig") as f:
+            rows = list(csv.DictReader(f))
+        # 분율 컬럼을 한 번에 디코딩 - "Error or Not Available" 등 파싱할 수 없는 행은 건너뜀
+        column = parse_composition_column(row["composition_fraction"] for row in rows)
+        system_ids = []
+        compositions = []
+        for row, comp in zip(rows, column.to_dicts()):
+            if comp:
+                system_ids.append(row["system_id"])
+                compositions.append(comp)
+
+        energies = {}
+        with open(info_csv_path, encoding="utf-8-sig") as f:
+            for row in csv.DictReader(f):
+                try:
+                    energies.setdefault(row["system_id"], float(row["adsorp_energy"]))
+                except (KeyError, TypeError, ValueError):
+                    continue
+
+        return cls(system_ids, compositions, energies, tolerance)
+
+    @classmethod
+    def from_store(cls, store: CompositionStore, tolerance: float = TOLERANCE) -> "CompositionIndex":
+        """mmap 으로 열린 바이너리 저장소에서 인덱스를 생성합니다. (텍스트 파싱 없음)"""
+        rows = np.flatnonzero(store.valid)
+        all_compositions = store.compositions()
+        system_ids = [sid.decode("utf-8") for sid in store.system_ids[rows].tolist()]
+        compositions = [all_compositions[row] for row in rows.tolist()]
+        energies = {}
+        for system_id, energy in zip(system_ids, store.adsorp_energy[rows].tolist()):
+            if energy == energy:  # NaN 제외
+                energies.setdefault(system_id, energy)
+        return cls(system_ids, compositions, energies, tolerance)
+
+    @classmethod
+    def load(cls, comp_csv_path: str = DEFAULT_COMP_CSV_PATH,
+             info_csv_path: str = DEFAULT_INFO_CSV_PATH) -> "CompositionIndex":
+        """최신 바이너리 저장소가 있으면 저장소에서, 없으면 CSV 에서 인덱스를 생성합니다."""
+        data_dir = os.path.dirname(comp_csv_path)
+        if (os.path.basename(comp_csv_path) == FRACTION_CSV
+                and os.path.basename(info_csv_path) == ADSORP_CSV
+                and os.path.dirname(info_csv_path) == data_dir):
+            store = open_store(data_dir)
+            if store is not None:
+                return cls.from_store(store)
+        return cls.from_csv(comp_csv_path, info_csv_path)
+
+    def __len__(self) -> int:
+        return len(self.system_ids)
+
+    def _matches(self, row: int, composition: Dict[str, float]) -> bool:
+        stored = self.compositions[row]
+        if stored.keys() != composition.keys():
+            return False
+        return all(abs(stored[k] - composition[k]) < self.tolerance for k in stored)
+
+    def _bucket_rows(self, keys: List[CanonicalKey]) -> List[List[int]]:
+        """키별로 그 키(와 해시가 같은 키)를 가진 행 번호 목록 (파일 순서)"""
+        hashes = np.fromiter((hash(key) for key in keys), dtype=np.int64, count=len(keys))
+        lo = np.searchsorted(self._key_hash, hashes, side="left").tolist()
+        hi = np.searchsorted(self._key_hash, hashes, side="right").tolist()
+        buckets = []
+        for start, stop in zip(lo, hi):
+            rows = [row for group in self._key_groups[start:stop].tolist() for row in self.groups.rows_of(group)]
+            buckets.append(sorted(rows) if stop - start > 1 else rows)
+        return buckets
+
+    def find_row(self, composition: Dict[str, float]) -> Optional[int]:
+        """
+        tolerance 이내로 일치하는 첫 번째 행 번호를 반환합니다.
+        양자화 경계에 걸친 값은 인접한 격자 키(원소당 ±1)를 추가로 확인합니다.
+        """
+        try:
+            key = canonical_key(composition, self.tolerance)
+        except (AttributeError, TypeError, ValueError):
+            return None
+
+        for row in self._bucket_rows([key])[0]:
+            if self._matches(row, composition):
+                return row
+
+        elements = [element for element, _ in key]
+        steps = [(q - 1, q, q + 1) for _, q in key]
+        neighbours = [tuple(zip(elements, quanta)) for quanta in itertools.product(*steps)]
+        neighbours.remove(key)
+        best = None
+        for rows in self._bucket_rows(neighbours):
+            for row in rows:
+                if (best is None or row < best) and self._matches(row, composition):
+                    best = row
+                    break
+        return best
+
+    def lookup(self, composition: Dict[str, float], reduction: str = "first") -> Optional[CompositionMatch]:
+        """
+        조성에 해당하는 system_id, 저장된 조성, adsorption energy 와 같은 조성의 시스템 그룹 집계를 반환합니다.
+        reduction 은 같은 조성의 시스템이 여러 개일 때 adsorp_energy 로 쓸 값입니다. (REDUCTIONS 참고,
+        first 는 파일 순서상 첫 시스템, min/max 는 그 에너지를 가진 시스템의 system_id 를 함께 반환)
+        """
+        if reduction not in REDUCTIONS:
+            raise ValueError(f"reduction 은 {REDUCTIONS} 중 하나여야 합니다: {reduction!r}")
+        row = self.find_row(composition)
+        if row is None:
+            return None
+        return CompositionMatch(self.groups.reduced_system_id(row, reduction), self.compositions[row],
+                                self.groups.reduce(row, reduction), self.groups.group_of(row))
+
+    def lookup_many(self, compositions: List[Dict[str, float]],
+                    reduction: str = "first") -> List[Optional[CompositionMatch]]:
+        """
+        여러 조성을 한 번에 조회합니다.
+        같은 정규화 키를 가진 조성은 한 번만 조회하고 결과를 공유합니다.
+        """
+        resolved: Dict[object, Optional[CompositionMatch]] = {}
+        matches = []
+        for composition in compositions:
+            try:
+                key = canonical_key(composition, self.tolerance)
+            except (AttributeError, TypeError, ValueError):
+                matches.append(None)
+                continue
+            if key not in resolved:
+                resolved[key] = self.lookup(composition, reduction)
+            matches.append(resolved[key])
+        return matches
+
+    def _lazy(self, name: str, factory: Callable[[], T]) -> T:
+        """
+        보조 인덱스 name 을 처음 호출될 때 factory() 로 한 번만 생성합니다.
+        (double-checked lock, 보조 인덱스마다 lock 이 따로 있어 서로 의존하는 인덱스도 중첩 생성 가능)
+        """
+        value = self._derived.get(name)
+        if value is None:
+            with self._derived_lock:
+                lock = self._derived_locks.setdefault(name, threading.Lock())
+            with lock:
+                value = self._derived.get(name)
+                if value is None:
+                    value = factory()
+                    self._derived[name] = value
+        return value
+
+    def nearest(self, composition: Dict[str, float], k: int = 5) -> List[Dict[str, object]]:
+        """
+        원소 비율 벡터의 L1 거리로 가장 가까운 k 개 시스템을 거리 순으로 반환합니다. (질의와 같은 조성의 시스템 포함)
+        find_similar_compositions 와 같은 SimilarityIndex 를 사용하므로 두 tool 의 이웃 순서가 일치합니다.
+        """
+        neighbors = []
+        for row, distance in self.similarity_index().query(composition, k, "l1", exclude_self=False):
+            system_id = self.system_ids[row]
+            neighbors.append({
+                "system_id": system_id,
+                "composition": self.compositions[row],
+                "adsorp_energy": self.energies.get(system_id),
+                "distance": round(distance, 6)
+            })
+        return neighbors
+
+    def element_postings(self) -> ElementPostings:
+        """원소 → 행 번호 역색인을 반환합니다. (처음 호출될 때 한 번만 생성)"""
+        return self._lazy("element_postings", lambda: ElementPostings.from_compositions(
+            self.compositions, self.system_ids, self.energies))
+
+    def range_index(self) -> RangeIndex:
+        """원소 분율·흡착 에너지 구간 질의 인덱스를 반환합니다. (처음 호출될 때 한 번만 생성)"""
+        return self._lazy("range_index", lambda: RangeIndex.from_index(self))
+
+    def composition_sampler(self) -> CompositionSampler:
+        """n 원계 partition 과 원소 계열 층을 미리 계산해 둔 샘플러를 반환합니다. (처음 호출될 때 한 번만 생성)"""
+        return self._lazy("composition_sampler", lambda: CompositionSampler.from_index(self))
+
+    def similarity_index(self) -> SimilarityIndex:
+        """l1 / cosine / property 거리 유사 조성 인덱스를 반환합니다. (처음 호출될 때 한 번만 생성)"""
+        return self._lazy("similarity_index", lambda: SimilarityIndex.from_index(self))
+
+    def element_energy_stats(self) -> ElementEnergyStats:
+        """원소·원소 쌍·n 원계별 흡착 에너지 집계를 반환합니다. (처음 호출될 때 한 번만 생성)"""
+        return self._lazy("element_energy_stats", lambda: ElementEnergyStats.from_index(self))
+
+    def binary_phase_lines(self) -> BinaryPhaseLines:
+        """원소 쌍별 혼합 축 정렬 배열을 반환합니다. (처음 호출될 때 한 번만 생성)"""
+        return self._lazy("binary_phase_lines", lambda: BinaryPhaseLines.from_index(self))
+
+    def get_energy(self, composition: Dict[str, float], reduction: str = "first") -> Optional[float]:
+        """조성에 해당하는 adsorption energy 를 반환합니다. (없으면 None)"""
+        match = self.lookup(composition, reduction)
+        return match.adsorp_energy if match else None
+
+
+class IndexReloader:
+    """
+    데이터 파일을 감시하며 CompositionIndex 를 최신 상태로 유지합니다.
+
+    파일 변경(mtime/size 또는 sha1)이 감지되면 백그라운드 스레드에서 새 인덱스를 완성한 뒤
+    self.index 참조 하나만 교체합니다. 따라서 진행 중인 tool 호출은 자신이 잡은 이전 인덱스를
+    끝까지 사용하고, 반쯤 만들어진 인덱스를 보는 일은 없습니다.
+    """
+
+    def __init__(self, comp_csv_path: str = DEFAULT_COMP_CSV_PATH,
+                 info_csv_path: str = DEFAULT_INFO_CSV_PATH,
+                 interval: float = 5.0, use_hash: bool = False):
+        """
+        Args:
+            comp_csv_path, info_csv_path: 인덱스 원본 CSV 경로
+            interval: 파일 확인 주기(초)
+            use_hash: True 이면 mtime 대신 내용 sha1 로 변경을 판단
+        """
+        self.comp_csv_path = comp_csv_path
+        self.info_csv_path = info_csv_path
+        self.interval = interval
+        self.use_hash = use_hash
+        self.store_dir = os.path.join(os.path.dirname(comp_csv_path), STORE_DIRNAME)
+        self.reload_count = 0
+
+        self._listeners: List[Callable[[CompositionIndex], None]] = []
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._fingerprint = self._current_fingerprint()
+        self.index = CompositionIndex.load(comp_csv_path, info_csv_path)
+
+    def _current_fingerprint(self) -> Tuple:
+        paths = [self.comp_csv_path, self.info_csv_path, os.path.join(self.store_dir, "meta.json")]
+        fingerprint = []
+        for path in paths:
+            if not os.path.exists(path):
+                fingerprint.append((path, None))
+            elif self.use_hash:
+                with open(path, "rb") as f:
+                    fingerprint.append((path, hashlib.sha1(f.read()).hexdigest()))
+            else:
+                stat = os.stat(path)
+                fingerprint.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(fingerprint)
+
+    def add_listener(self, callback: Callable[[CompositionIndex], None]):
+        """
+        새 인덱스가 완성될 때마다 (교체 직전에) 백그라운드 스레드에서 호출될 콜백을 등록합니다.
+        인덱스에서 파생된 자료구조를 미리 만들어 두는 용도입니다.
+        """
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def check(self, settle: float = 0.5) -> bool:
+        """
+        파일이 바뀌었으면 인덱스를 다시 만들어 교체합니다. 교체했으면 True.
+        쓰기 중인 파일을 읽지 않도록 settle 초 동안 지문이 변하지 않을 때만 재생성합니다.
+        """
+        with self._reload_lock:
+            fingerprint = self._current_fingerprint()
+            if fingerprint == self._fingerprint:
+                return False
+            if settle:
+                time.sleep(settle)
+                if self._current_fingerprint() != fingerprint:
+                    return False  # 아직 쓰는 중 - 다음 주기에 다시 확인
+
+            try:
+                self._recompile_stale_store()
+                # 읽기 전에 지문을 기록해 두어, 읽는 도중의 변경은 다음 주기에 다시 감지되도록 함
+                fingerprint = self._current_fingerprint()
+                index = CompositionIndex.load(self.comp_csv_path, self.info_csv_path)
+                for callback in self._listeners:
+                    callback(index)
+            except Exception as e:
+                logger.error(f"조성 인덱스 재생성 실패 - 이전 인덱스를 계속 사용합니다: {e}")
+                self._fingerprint = fingerprint  # 같은 파일 상태로 재시도하지 않음
+                return False
+
+            self._fingerprint = fingerprint
+            self.index = index
+            self.reload_count += 1
+            logger.info(f"조성 인덱스 교체 완료: {len(index)}개 시스템 (reload #{self.reload_count})")
+            return True
+
+    def _recompile_stale_store(self):
+        """바이너리 저장소를 쓰고 있었다면 원본 CSV 변경에 맞춰 다시 컴파일"""
+        if not os.path.exists(os.path.join(self.store_dir, "meta.json")):
+            return
+        if open_store(os.path.dirname(self.comp_csv_path), self.store_dir) is None:
+            compile_dataset(os.path.dirname(self.comp_csv_path), self.store_dir)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"데이터 파일 감시 오류: {e}")
+
+    def start(self) -> "IndexReloader":
+        """백그라운드 감시 스레드를 시작합니다. (이미 실행 중이면 무시)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="composition-index-reloader", daemon=True)
+            self._thread.start()
+            logger.info(f"데이터 파일 감시 시작: {self.comp_csv_path}, {self.info_csv_path} ({self.interval}s 주기)")
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+_reloaders: Dict[Tuple[str, str], IndexReloader] = {}
+_index_lock = threading.Lock()
+
+
+def get_index_reloader(comp_csv_path: str = DEFAULT_COMP_CSV_PATH,
+                       info_csv_path: str = DEFAULT_INFO_CSV_PATH) -> IndexReloader:
+    """파일 경로별로 프로세스 전역에서 공유되는 IndexReloader 를 반환합니다. (감시 스레드는 start() 로 시작)"""
+    cache_key = (os.path.abspath(comp_csv_path), os.path.abspath(info_csv_path))
+    reloader = _reloaders.get(cache_key)
+    if reloader is None:
+        with _index_lock:
+            reloader = _reloaders.get(cache_key)
+            if reloader is None:
+                reloader = IndexReloader(comp_csv_path, info_csv_path)
+                _reloaders[cache_key] = reloader
+    return reloader
+
+
+def get_composition_index(comp_csv_path: str = DEFAULT_COMP_CSV_PATH,
+                          info_csv_path: str = DEFAULT_INFO_CSV_PATH) -> CompositionIndex:
+    """파일 경로별로 프로세스 전역에서 공유되는 현재 CompositionIndex 를 반환합니다."""
+    return get_index_reloader(comp_csv_path, info_csv_path).index
@@ -0,0 +1,148 @@
+"""
+Composition sampler
+
+get_random_compositions 용 샘플링 엔진입니다. n 원계별 후보 행 배열(partition)과 행별 원소 계열 조합(층)을
+로드 시 한 번 계산해 두고, 호출마다 NumPy 배열 연산으로 샘플을 고릅니다. 모든 전략은 seed 로 재현할 수 있습니다.
+
+- uniform:    후보 중 균등 무작위 (기존 동작)
+- stratified: 원소 계열 조합(예: late_transition + metalloid)을 층으로 삼아 층마다 돌아가며 하나씩 뽑음
+- diverse:    분율 벡터의 L1 거리 기준 farthest-point(max-min) 샘플링 - 이미 뽑은 조성들과 가장 먼 조성을 차례로 선택
+
+farthest-point 단계마다 새로 뽑은 조성과 후보 전체의 거리를 갱신하는데, 분율 합이 각각 a, b 인 두 조성의
+L1 거리는 a + b - 2·Σ min(분율) 이므로 새 조성이 가진 원소 열(RangeIndex.fraction_column)만 훑으면 됩니다.
+따라서 k 개를 뽑는 비용은 O(후보 수 · k) 배열 연산입니다.
+"""
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from dft.element_postings import bitmap_to_rows
+from dft.range_index import RangeIndex
+
+SAMPLING_STRATEGIES = ("uniform", "stratified", "diverse")
+
+# farthest-point 후보가 이보다 많으면 먼저 이 수만큼 균등 추출한 뒤 그 안에서 선택 (호출당 비용 상한)
+FPS_MAX_POOL = 50_000
+
+ELEMENT_FAMILIES: Dict[str, Sequence[str]] = {
+    "alkali": ("Li", "Na", "K", "Rb", "Cs", "Fr"),
+    "alkaline_earth": ("Be", "Mg", "Ca", "Sr", "Ba", "Ra"),
+    "early_transition": ("Sc", "Ti", "V", "Cr", "Mn", "Y", "Zr", "Nb", "Mo", "Tc", "Hf", "Ta", "W", "Re"),
+    "late_transition": ("Fe", "Co", "Ni", "Ru", "Rh", "Pd", "Os", "Ir", "Pt"),
+    "coinage_group12": ("Cu", "Ag", "Au", "Zn", "Cd", "Hg"),
+    "post_transition": ("Al", "Ga", "In", "Tl", "Sn", "Pb", "Bi", "Po"),
+    "metalloid": ("B", "Si", "Ge", "As", "Sb", "Te"),
+    "nonmetal": ("H", "C", "N", "O", "F", "P", "S", "Cl", "Se", "Br", "I"),
+    "lanthanide": ("La", "Ce", "Pr", "Nd", "Pm", "Sm", "Eu", "Gd", "Tb", "Dy", "Ho", "Er", "Tm", "Yb", "Lu"),
+}
+_FAMILY_OF = {element: family for family, elements in ELEMENT_FAMILIES.items() for element in elements}
+
+
+def element_family(element: str) -> str:
+    """원소 계열 이름 (목록에 없으면 "other")"""
+    return _FAMILY_OF.get(element, "other")
+
+
+class CompositionSampler:
+    """n 원계 partition 과 원소 계열 층을 미리 계산해 둔 조성 샘플러"""
+
+    def __init__(self, ranges: RangeIndex, compositions: Sequence[Dict[str, float]]):
+        """
+        Args:
+            ranges: 같은 행 순서의 구간 인덱스 (원소별 분율 열과 n 원계 비트맵 공유)
+            compositions: 행 순서의 조성 dictionary 목록
+        """
+        postings = ranges.postings
+        self.ranges = ranges
+        self.compositions = compositions
+        self.all_rows = np.arange(len(postings), dtype=np.int64)
+        self.partitions: Dict[int, np.ndarray] = {
+            n: bitmap_to_rows(bitmap) for n, bitmap in postings.class_bitmaps.items()
+        }
+
+        strata: Dict[tuple, int] = {}
+        self.stratum = np.fromiter(
+            (strata.setdefault(tuple(sorted(element_family(e) for e in comp)), len(strata)) for comp in compositions),
+            dtype=np.int32, count=len(compositions))
+        self.strata = list(strata)
+        self.row_sums = np.fromiter((sum(comp.values()) for comp in compositions),
+                                    dtype=np.float64, count=len(compositions))
+
+    @classmethod
+    def from_index(cls, index) -> "CompositionSampler":
+        """CompositionIndex 의 구간 인덱스와 조성 목록으로 샘플러를 생성합니다."""
+        return cls(index.range_index(), index.compositions)
+
+    def pool(self, n_elements: Optional[int] = None) -> np.ndarray:
+        """후보 행 배열 (n_elements 가 주어지면 해당 n 원계 partition)"""
+        if n_elements:
+            return self.partitions.get(int(n_elements), np.empty(0, dtype=np.int64))
+        return self.all_rows
+
+    def sample(self, count: int, n_elements: Optional[int] = None, strategy: str = "diverse",
+               seed: Optional[int] = None) -> np.ndarray:
+        """
+        후보에서 count 개 행을 뽑아 선택 순서대로 반환합니다.
+
+        Args:
+            count: 뽑을 개수 (후보 수를 넘으면 후보 수)
+            n_elements: n 원계 필터
+            strategy: SAMPLING_STRATEGIES 중 하나
+            seed: 난수 seed (같은 seed, 같은 데이터면 같은 결과)
+        """
+        if strategy not in SAMPLING_STRATEGIES:
+            raise ValueError(f"strategy 는 {SAMPLING_STRATEGIES} 중 하나여야 합니다: {strategy!r}")
+        rng = np.random.default_rng(seed)
+        pool = self.pool(n_elements)
+        count = min(max(int(count), 0), len(pool))
+        if not count:
+            return np.empty(0, dtype=np.int64)
+        if strategy == "uniform":
+            return rng.choice(pool, size=count, replace=False)
+        if strategy == "stratified":
+            return self._stratified(pool, count, rng)
+        return self._farthest_point(pool, count, rng)
+
+    def _stratified(self, pool: np.ndarray, count: int, rng: np.random.Generator) -> np.ndarray:
+        """층마다 돌아가며 하나씩 무작위 선택 (층 순서도 무작위)"""
+        shuffled = pool[rng.permutation(len(pool))]
+        codes = self.stratum[shuffled]
+        # 층 안에서의 순번: 층 번호로 안정 정렬한 위치 - 그 층의 시작 위치
+        order = np.argsort(codes, kind="stable")
+        sorted_codes = codes[order]
+        starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+        within = np.empty(len(pool), dtype=np.int64)
+        within[order] = np.arange(len(pool)) - np.repeat(starts, np.diff(np.r_[starts, len(pool)]))
+        priority = rng.permutation(len(self.strata))[codes]
+        return shuffled[np.lexsort((priority, within))[:count]]
+
+    def _distances(self, row: int, pool: np.ndarray, position: np.ndarray, pool_sums: np.ndarray) -> np.ndarray:
+        """row 와 후보 각각의 분율 L1 거리 (row 가 가진 원소 열만 훑음)"""
+        overlap = np.zeros(len(pool))
+        for element, value in self.compositions[row].items():
+            values, rows = self.ranges.fraction_column(element)
+            slots = position[rows]
+            keep = slots >= 0
+            overlap[slots[keep]] += np.minimum(values[keep], value)
+        return pool_sums + self.row_sums[row] - 2.0 * overlap
+
+    def _farthest_point(self, pool: np.ndarray, count: int, rng: np.random.Generator) -> np.ndarray:
+        """무작위 시작점에서 출발해 이미 뽑은 조성들과의 최소 거리가 가장 큰 조성을 차례로 선택"""
+        if len(pool) > FPS_MAX_POOL:
+            pool = np.sort(rng.choice(pool, size=FPS_MAX_POOL, replace=False))
+        position = np.full(len(self.all_rows), -1, dtype=np.int64)
+        position[pool] = np.arange(len(pool))
+        pool_sums = self.row_sums[pool]
+
+        min_distance = np.full(len(pool), np.inf)
+        chosen = np.empty(count, dtype=np.int64)
+        slot = int(rng.integers(len(pool)))
+        for i in range(count):
+            chosen[i] = pool[slot]
+            if i + 1 == count:
+                break
+            np.minimum(min_distance, self._distances(int(pool[slot]), pool, position, pool_sums), out=min_distance)
+            min_distance[slot] = -np.inf  # 이미 뽑은 후보 제외 (같은 조성의 중복 행은 거리 0 이라 가장 나중에 선택)
+            slot = int(np.argmax(min_distance))
+        return chosen
@@ -0,0 +1,186 @@
+"""
+Compact composition table
+
+quest_data 의 compositions_db 를 행마다 dict (system_id, composition dict, elements list, n_elements) 대신
+열(column) 배열로 저장합니다.
+
+- 원소 테이블: interned 원소 이름 tuple
+- CSR:         indptr (int64, 행 오프셋), element_idx (int16, 원소 번호), fractions (float64, 분율)
+- system_id:   고정 폭 byte 문자열 배열 (|S)
+
+db[row] 는 __slots__ 만 가진 지연 행 뷰(CompositionRow)를 반환하며, 필드는 읽을 때 배열에서 만듭니다.
+행 뷰는 읽기 전용 Mapping 이므로 기존 코드의 db[row]["system_id"], dict(db[row], ...), record.get(field) 가 그대로 동작합니다.
+JSON 으로 직렬화할 때는 to_dict() 를 사용합니다.
+
+CompositionIndex 도 같은 표를 가지며, index.compositions 는 행마다 조성 dictionary 를 읽을 때 만드는
+CompositionColumn 입니다. (행별 dict 를 상주시키지 않음)
+"""
+
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+ROW_FIELDS = ("system_id", "composition", "elements", "n_elements")
+
+
+class CompositionRow(Mapping):
+    """CompositionTable 한 행의 지연 뷰 (system_id, composition, elements, n_elements)"""
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table: "CompositionTable", row: int):
+        self._table = table
+        self._row = row
+
+    def __getitem__(self, field: str):
+        if field == "system_id":
+            return self._table.system_id(self._row)
+        if field == "composition":
+            return self._table.composition(self._row)
+        if field == "elements":
+            return self._table.elements_of(self._row)
+        if field == "n_elements":
+            return self._table.n_elements(self._row)
+        raise KeyError(field)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(ROW_FIELDS)
+
+    def __len__(self) -> int:
+        return len(ROW_FIELDS)
+
+    def __repr__(self) -> str:
+        return f"CompositionRow({self.to_dict()!r})"
+
+    @property
+    def row(self) -> int:
+        return self._row
+
+    def to_dict(self) -> Dict[str, object]:
+        """JSON 직렬화용 dictionary"""
+        composition = self._table.composition(self._row)
+        return {
+            "system_id": self._table.system_id(self._row),
+            "composition": composition,
+            "elements": list(composition),
+            "n_elements": len(composition),
+        }
+
+
+class CompositionColumn(Sequence):
+    """CompositionTable 의 조성 열 - column[row] 는 읽을 때 만든 조성 dictionary"""
+
+    __slots__ = ("_table",)
+
+    def __init__(self, table: "CompositionTable"):
+        self._table = table
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            start, stop, step = row.indices(len(self))
+            if step != 1:
+                return [self._table.composition(r) for r in range(start, stop, step)]
+            return list(self._table.iter_compositions(start, stop))
+        row = int(row)
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        return self._table.composition(row)
+
+    def __iter__(self) -> Iterator[Dict[str, float]]:
+        return self._table.iter_compositions()
+
+
+class CompositionTable(Sequence):
+    """조성 목록의 열 저장소 (행 순서는 CompositionIndex 와 같음)"""
+
+    def __init__(self, elements: Sequence[str], indptr: np.ndarray, element_idx: np.ndarray,
+                 fractions: np.ndarray, system_ids: np.ndarray):
+        """
+        Args:
+            elements: 원소 이름 테이블
+            indptr, element_idx, fractions: 행별 원소 번호와 분율의 CSR 표현 (행 안의 순서는 원래 조성 순서)
+            system_ids: 행 순서의 system_id (|S 배열)
+        """
+        self.elements = tuple(elements)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.element_idx = np.asarray(element_idx, dtype=np.int16)
+        self.fractions = np.asarray(fractions, dtype=np.float64)
+        self.system_ids = np.asarray(system_ids, dtype=np.bytes_)
+        self.compositions = CompositionColumn(self)
+
+    @classmethod
+    def from_compositions(cls, system_ids: Sequence[str],
+                          compositions: Sequence[Dict[str, float]]) -> "CompositionTable":
+        """system_id 목록과 조성 dictionary 목록(CompositionIndex.compositions)에서 표를 생성합니다."""
+        elements = sorted({element for composition in compositions for element in composition})
+        position = {element: i for i, element in enumerate(elements)}
+        indptr = np.zeros(len(compositions) + 1, dtype=np.int64)
+        np.cumsum([len(composition) for composition in compositions], out=indptr[1:])
+        size = int(indptr[-1])
+        element_idx = np.fromiter((position[e] for composition in compositions for e in composition),
+                                  dtype=np.int16, count=size)
+        fractions = np.fromiter((float(v) for composition in compositions for v in composition.values()),
+                                dtype=np.float64, count=size)
+        encoded = np.array([sid.encode("utf-8") for sid in system_ids], dtype=np.bytes_)
+        return cls(elements, indptr, element_idx, fractions, encoded)
+
+    @classmethod
+    def from_index(cls, index) -> "CompositionTable":
+        """CompositionIndex 가 가진 표를 반환합니다. (배열을 복사하지 않고 공유)"""
+        return index.table
+
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [CompositionRow(self, r) for r in range(*row.indices(len(self)))]
+        row = int(row)
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        return CompositionRow(self, row)
+
+    def __iter__(self) -> Iterator[CompositionRow]:
+        return (CompositionRow(self, row) for row in range(len(self)))
+
+    def system_id(self, row: int) -> str:
+        return self.system_ids[row].decode("utf-8")
+
+    def composition(self, row: int) -> Dict[str, float]:
+        start, stop = self.indptr[row], self.indptr[row + 1]
+        elements = self.elements
+        return {elements[e]: f for e, f in zip(self.element_idx[start:stop].tolist(),
+                                               self.fractions[start:stop].tolist())}
+
+    def iter_compositions(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Dict[str, float]]:
+        """start ~ stop 행의 조성 dictionary 를 차례로 만듭니다. (구간 배열을 한 번에 변환)"""
+        stop = len(self) if stop is None else stop
+        indptr = self.indptr[start:stop + 1].tolist()
+        if len(indptr) < 2:
+            return
+        base, end = indptr[0], indptr[-1]
+        elements = self.elements
+        symbols = [elements[e] for e in self.element_idx[base:end].tolist()]
+        fractions = self.fractions[base:end].tolist()
+        for lo, hi in zip(indptr, indptr[1:]):
+            yield dict(zip(symbols[lo - base:hi - base], fractions[lo - base:hi - base]))
+
+    def elements_of(self, row: int) -> List[str]:
+        elements = self.elements
+        return [elements[e] for e in self.element_idx[self.indptr[row]:self.indptr[row + 1]].tolist()]
+
+    def n_elements(self, row: int) -> int:
+        return int(self.indptr[row + 1] - self.indptr[row])
+
+    def nbytes(self) -> int:
+        """배열이 차지하는 byte 수 (원소 테이블 제외)"""
+        return (self.indptr.nbytes + self.element_idx.nbytes + self.fractions.nbytes
+                + self.system_ids.nbytes)
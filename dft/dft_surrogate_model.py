@@ -1,42 +1,113 @@
-import csv
-import ast
+import math
+
+from dft.composition_index import DEFAULT_COMP_CSV_PATH, DEFAULT_INFO_CSV_PATH, get_composition_index
+from dft.surrogate_regressor import DEFAULT_MODEL_DIR, get_surrogate_model
 
 def get_adsorp_energy_by_composition(
     composition_dict,
-    comp_csv_path="data/hydrogen/system_compositions_fraction.csv",
-    info_csv_path="data/hydrogen/system_info_with_adsorp.csv"
+    comp_csv_path=DEFAULT_COMP_CSV_PATH,
+    info_csv_path=DEFAULT_INFO_CSV_PATH,
+    reduction="first",
+    k_neighbors=0
 ):
     """
     composition_dict (예: {'Pt': 0.5, 'Ru': 0.5})와 일치하는 system_id를 system_compositions_fraction.csv에서 찾고,
     system_info_with_adsorp.csv에서 해당 system_id의 adsorption energy를 반환합니다.
     (소수점 오차로 인해 완벽히 일치하지 않을 수 있으므로, tolerance를 둘 수 있음)
+    두 파일은 프로세스당 한 번만 읽혀 CompositionIndex로 캐시되며, 이후 조회는 O(1)입니다.
+
+    같은 조성의 시스템이 여러 개이면 reduction("first" | "min" | "mean" | "max")으로 대표 에너지를 고릅니다.
+    일치하는 조성이 없으면 None 을 반환합니다.
+
+    k_neighbors > 0 을 주면 float 대신 get_adsorp_energies 와 같은 형식의 결과 dictionary를 반환하며,
+    일치하는 조성이 없을 때 가장 가까운 k개 시스템을 "neighbors"로 함께 제공합니다.
+    (surrogate 예측값이 필요하면 get_adsorp_energies(..., predict=True) 를 사용하세요.)
     """
-    tolerance = 1e-6
-    # 1. system_compositions_fraction.csv에서 composition_dict와 일치하는 system_id 찾기
-    with open(comp_csv_path, encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                comp = ast.literal_eval(row["composition_fraction"])
-                # 키셋이 동일하고, 각 값이 tolerance 이내로 모두 일치하면 매칭
-                if set(comp.keys()) == set(composition_dict.keys()):
-                    if all(abs(comp[k] - composition_dict[k]) < tolerance for k in comp):
-                        system_id = row["system_id"]
-                        break
-            except Exception:
-                continue
+    if k_neighbors:
+        return get_adsorp_energies([composition_dict], comp_csv_path, info_csv_path, k_neighbors,
+                                   reduction=reduction)[0]
+    if not isinstance(composition_dict, dict):
+        return None
+    return get_composition_index(comp_csv_path, info_csv_path).get_energy(composition_dict, reduction)
+
+def get_adsorp_energies(
+    compositions,
+    comp_csv_path=DEFAULT_COMP_CSV_PATH,
+    info_csv_path=DEFAULT_INFO_CSV_PATH,
+    k_neighbors=0,
+    predict=False,
+    model_dir=DEFAULT_MODEL_DIR,
+    reduction="first"
+):
+    """
+    여러 조성의 adsorption energy를 한 번에 조회합니다.
+    입력 순서대로 항목별 결과 dictionary를 반환합니다.
+    (status: "success" | "predicted" | "not_found" | "invalid")
+    k_neighbors > 0 이면 DFT 값이 없는 항목에 원소 비율 공간에서 (L1 거리) 가장 가까운 k개 시스템을 "neighbors"로 추가합니다.
+    predict=True 이면 DFT 값이 없는 항목을 surrogate 회귀 모델로 한 번에 예측하여
+    "adsorp_energy"와 "uncertainty"(1σ, eV)를 채우고 status를 "predicted"로 표시합니다.
+    같은 조성의 시스템이 여러 개이면 reduction("first": 파일 순서상 첫 시스템 | "min" | "mean" | "max")으로
+    adsorp_energy 를 고르고, 그룹의 에너지 집계(count/min/mean/std/max)를 "energy_stats"로 함께 반환합니다.
+    """
+    valid = [isinstance(comp, dict) and bool(comp) for comp in compositions]
+    valid_compositions = [comp for comp, ok in zip(compositions, valid) if ok]
+    # 유효한 조성이 없으면 데이터 파일을 읽지 않음
+    index = get_composition_index(comp_csv_path, info_csv_path) if valid_compositions else None
+    matches = iter(index.lookup_many(valid_compositions, reduction) if index is not None else ())
+
+    results = []
+    missing = []
+    for composition, ok in zip(compositions, valid):
+        if not ok:
+            results.append({
+                "composition": composition,
+                "adsorp_energy": None,
+                "status": "invalid",
+                "message": "composition must be a non-empty dictionary"
+            })
+            continue
+        match = next(matches)
+        if match is not None and match.adsorp_energy is not None:
+            result = {
+                "composition": composition,
+                "system_id": match.system_id,
+                "adsorp_energy": match.adsorp_energy,
+                "source": "dft",
+                "status": "success"
+            }
+            if match.group.count > 1:
+                result["reduction"] = reduction
+                result["energy_stats"] = match.group.to_dict(include_system_ids=False)
+            results.append(result)
         else:
-            return None  # 일치하는 system_id 없음
-    # 2. system_info_with_adsorp.csv에서 해당 system_id의 adsorption energy 찾기
-    with open(info_csv_path, encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if row["system_id"] == system_id:
-                return float(row["adsorp_energy"])
-    return None
+            result = {
+                "composition": composition,
+                "adsorp_energy": None,
+                "status": "not_found"
+            }
+            if k_neighbors:
+                result["neighbors"] = index.nearest(composition, k_neighbors)
+            results.append(result)
+            missing.append(result)
+
+    if predict and missing:
+        model = get_surrogate_model(index, model_dir)
+        means, stds = model.predict([r["composition"] for r in missing], return_std=True)
+        for result, mean, std in zip(missing, means.tolist(), stds.tolist()):
+            if math.isnan(mean):
+                continue  # 물성 테이블에 없는 원소 등으로 예측 불가
+            result.update({
+                "adsorp_energy": round(mean, 4),
+                "uncertainty": round(std, 4),
+                "source": "surrogate",
+                "status": "predicted"
+            })
+    return results
 
 # 사용 예시
 if __name__ == "__main__":
     comp = {'Sc': 0.25, 'Pt': 0.75}
     energy = get_adsorp_energy_by_composition(comp)
-    print("adsorption energy:", energy)
\ No newline at end of file
+    print("adsorption energy:", energy)
+    print(get_adsorp_energy_by_composition({'Sc': 0.3, 'Pt': 0.7}, k_neighbors=3))
+    print(get_adsorp_energies([{'Sc': 0.3, 'Pt': 0.7}], predict=True)[0])
@@ -0,0 +1,151 @@
+"""
+Element energy statistics
+
+원소 하나, 원소 쌍(두 원소를 모두 포함하는 조성), n 원계별 흡착 에너지 통계를 로드 시 한 번에 계산해 둔 집계 큐브입니다.
+키는 (원소 tuple, n 원계) 이며 원소 tuple 은 0~2 개의 정렬된 원소, n 원계 0 은 전체를 뜻합니다.
+예: ((), 0) 전체, (("Pt",), 0) Pt 포함 전체, (("Pt", "Sc"), 2) Pt-Sc 이원계, ((), 3) 삼원계 전체.
+
+행마다 자신이 기여하는 모든 키를 펼친 뒤 bincount/lexsort 로 개수·최솟값·평균·표준편차·중앙값·최댓값을 구하므로,
+get_element_energy_stats 는 dictionary 조회 한 번으로 상수 시간에 응답합니다.
+"""
+
+from itertools import combinations
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 모든 n 원계
+ALL_CLASSES = 0
+# 키 하나에 지정할 수 있는 최대 원소 수 (원소 쌍까지)
+MAX_KEY_ELEMENTS = 2
+
+StatsKey = Tuple[Tuple[str, ...], int]
+
+
+class EnergyStats(NamedTuple):
+    """키에 해당하는 시스템들의 흡착 에너지 통계 (에너지가 없는 시스템은 count 에만 포함)"""
+    count: int
+    energy_count: int
+    min: Optional[float]
+    mean: Optional[float]
+    std: Optional[float]
+    median: Optional[float]
+    max: Optional[float]
+    min_system_id: Optional[str]
+    max_system_id: Optional[str]
+
+    def to_dict(self, precision: Optional[int] = None, include_system_ids: bool = True) -> Dict[str, object]:
+        """응답용 dictionary (std 는 모표준편차, precision 이 있으면 에너지를 반올림)"""
+        stats = {}
+        for field, value in zip(self._fields, self):
+            if field.endswith("system_id") and not include_system_ids:
+                continue
+            if isinstance(value, float) and precision is not None:
+                value = round(value, precision)
+            stats[field] = value
+        return stats
+
+
+class ElementEnergyStats:
+    """(원소 tuple, n 원계) → 흡착 에너지 통계"""
+
+    def __init__(self, system_ids: Sequence[str], compositions: Sequence[Dict[str, float]],
+                 energies: Dict[str, float]):
+        """
+        Args:
+            system_ids: 행 순서의 system_id
+            compositions: 행 순서의 조성 dictionary 목록
+            energies: system_id → adsorption energy
+        """
+        keys: Dict[StatsKey, int] = {}
+        partners: Dict[str, set] = {}
+        entry_keys: List[int] = []
+        entry_rows: List[int] = []
+        for row, composition in enumerate(compositions):
+            elements = sorted(composition)
+            subsets = [()] + [(element,) for element in elements] + list(combinations(elements, 2))
+            for a, b in combinations(elements, 2):
+                partners.setdefault(a, set()).add(b)
+                partners.setdefault(b, set()).add(a)
+            for subset in subsets:
+                for n_class in (ALL_CLASSES, len(elements)):
+                    entry_keys.append(keys.setdefault((subset, n_class), len(keys)))
+                    entry_rows.append(row)
+
+        n_keys = len(keys)
+        entry_keys = np.asarray(entry_keys, dtype=np.int64)
+        entry_rows = np.asarray(entry_rows, dtype=np.int64)
+        row_energy = np.array([energies.get(sid, np.nan) for sid in system_ids], dtype=np.float64)
+        values = row_energy[entry_rows]
+        known = ~np.isnan(values)
+        groups, rows, values = entry_keys[known], entry_rows[known], values[known]
+
+        self.count = np.bincount(entry_keys, minlength=n_keys)
+        self.energy_count = np.bincount(groups, minlength=n_keys)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.mean = np.bincount(groups, weights=values, minlength=n_keys) / self.energy_count
+            deviations = (values - self.mean[groups]) ** 2
+            self.std = np.sqrt(np.bincount(groups, weights=deviations, minlength=n_keys) / self.energy_count)
+
+        # (키, 에너지) 순으로 정렬하면 키마다 첫 항목이 최솟값, 마지막 항목이 최댓값, 가운데가 중앙값
+        order = np.lexsort((values, groups))
+        sorted_values, sorted_rows = values[order], rows[order]
+        starts = np.searchsorted(groups[order], np.arange(n_keys))
+        has_energy = self.energy_count > 0
+        first = starts[has_energy]
+        last = first + self.energy_count[has_energy] - 1
+        self.min = np.full(n_keys, np.nan)
+        self.max = np.full(n_keys, np.nan)
+        self.median = np.full(n_keys, np.nan)
+        self.min_row = np.full(n_keys, -1, dtype=np.int64)
+        self.max_row = np.full(n_keys, -1, dtype=np.int64)
+        self.min[has_energy] = sorted_values[first]
+        self.max[has_energy] = sorted_values[last]
+        self.median[has_energy] = (sorted_values[(first + last) // 2] + sorted_values[(first + last + 1) // 2]) / 2
+        self.min_row[has_energy] = sorted_rows[first]
+        self.max_row[has_energy] = sorted_rows[last]
+
+        self.keys = keys
+        self.system_ids = system_ids
+        self.partners: Dict[str, List[str]] = {element: sorted(others) for element, others in partners.items()}
+        self.elements: List[str] = sorted(element for (subset, n_class) in keys if len(subset) == 1
+                                          and n_class == ALL_CLASSES for element in subset)
+        self.n_classes: List[int] = sorted(n_class for (subset, n_class) in keys if not subset and n_class)
+
+    @classmethod
+    def from_index(cls, index) -> "ElementEnergyStats":
+        """CompositionIndex 의 조성과 에너지로 집계를 생성합니다."""
+        return cls(index.system_ids, index.compositions, index.energies)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @staticmethod
+    def make_key(elements: Sequence[str] = (), n_elements: Optional[int] = None) -> StatsKey:
+        """원소 목록과 n 원계를 집계 키로 변환 (원소가 3개 이상이면 ValueError)"""
+        subset = tuple(sorted(set(elements)))
+        if len(subset) > MAX_KEY_ELEMENTS:
+            raise ValueError(f"원소는 최대 {MAX_KEY_ELEMENTS}개까지 지정할 수 있습니다: {list(elements)}")
+        return subset, int(n_elements) if n_elements else ALL_CLASSES
+
+    def get(self, elements: Sequence[str] = (), n_elements: Optional[int] = None) -> Optional[EnergyStats]:
+        """
+        원소(0~2개)를 모두 포함하고 n_elements 원계(None 이면 전체)인 시스템들의 통계.
+        해당하는 시스템이 없으면 None 을 반환합니다.
+        """
+        key = self.keys.get(self.make_key(elements, n_elements))
+        if key is None:
+            return None
+        if not self.energy_count[key]:
+            return EnergyStats(int(self.count[key]), 0, None, None, None, None, None, None, None)
+        return EnergyStats(
+            count=int(self.count[key]),
+            energy_count=int(self.energy_count[key]),
+            min=float(self.min[key]),
+            mean=float(self.mean[key]),
+            std=float(self.std[key]),
+            median=float(self.median[key]),
+            max=float(self.max[key]),
+            min_system_id=self.system_ids[int(self.min_row[key])],
+            max_system_id=self.system_ids[int(self.max_row[key])],
+        )
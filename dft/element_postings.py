@@ -0,0 +1,259 @@
+"""
+Element postings index
+
+원소 → 해당 원소를 포함하는 행 집합을 행 수 크기의 비트맵(uint64 word 배열)으로 저장한 역색인입니다.
+"이 원소들을 모두 포함하는 조성" (subset) 질의는 원소 비트맵의 AND 로, "정확히 이 원소들로만 이루어진 조성"
+(exact) 질의는 여기에 n 원계 비트맵을 한 번 더 AND 하여 답합니다. 전체 일치 수는 popcount 로 구하므로
+전체 목록을 훑지 않고도 정확한 total_found 를 얻습니다.
+
+정렬 기준마다 정렬 순서(순위 → 행)와 순위(행 → 순위) 배열을 한 번 만들어 두고, 페이지는
+"cursor 로 받은 순위 다음부터 일치하는 limit 개" 로 잘라 cursor 기반 pagination 을 제공합니다.
+일치 행이 많으면 정렬 순서를 따라가며 비트를 확인하고, 적으면 일치 행만 꺼내 정렬합니다.
+"""
+
+import threading
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 지원하는 정렬 기준 (none: 데이터 파일 순서)
+SORT_OPTIONS = ("none", "adsorp_energy", "-adsorp_energy", "system_id")
+
+# 정렬 순서를 따라가며 비트를 확인할 때 살펴볼 최대 행 수 (이보다 많이 봐야 하면 일치 행을 꺼내 정렬)
+_WALK_BUDGET = 65536
+_MIN_CHUNK = 256
+
+if hasattr(np, "bitwise_count"):
+    def _popcount(words: np.ndarray) -> int:
+        return int(np.bitwise_count(words).sum())
+else:  # NumPy < 2.0
+    _BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _popcount(words: np.ndarray) -> int:
+        return int(_BYTE_POPCOUNT[words.view(np.uint8)].sum(dtype=np.int64))
+
+
+class PostingsPage(NamedTuple):
+    """질의 결과 한 페이지"""
+    rows: List[int]
+    total_found: int
+    next_cursor: Optional[str]
+
+
+def rows_to_bitmap(rows: np.ndarray, n_rows: int) -> np.ndarray:
+    """행 번호 배열을 n_rows 비트 비트맵(little-endian uint64 word 배열)으로 변환"""
+    mask = np.zeros(-(-n_rows // 64) * 64, dtype=bool)
+    mask[rows] = True
+    return np.packbits(mask, bitorder="little").view("<u8")
+
+
+def bitmap_to_rows(bitmap: np.ndarray, start_word: int = 0) -> np.ndarray:
+    """비트맵에서 켜진 비트의 행 번호를 오름차순으로 반환 (start_word 는 bitmap[0] 의 word 위치)"""
+    # 0 이 아닌 word → 그 안의 0 이 아닌 byte 만 펼쳐서 희소한 비트맵도 빠르게 처리
+    words = np.flatnonzero(bitmap)
+    data = bitmap[words].view(np.uint8)
+    nonzero = np.flatnonzero(data)
+    bits = np.unpackbits(data[nonzero], bitorder="little").reshape(len(nonzero), 8)
+    byte, bit = np.nonzero(bits)
+    byte = nonzero[byte]
+    return (words[byte // 8] + start_word) * 64 + (byte % 8) * 8 + bit
+
+
+class ElementPostings:
+    """원소별 비트맵과 정렬 순서를 가진 검색 인덱스"""
+
+    def __init__(self, elements: Sequence[str], indptr: np.ndarray, element_idx: np.ndarray,
+                 system_ids: Sequence[str], energies: np.ndarray):
+        """
+        Args:
+            elements: 원소 이름 테이블
+            indptr, element_idx: 행별 원소 번호의 CSR 표현 (행 r 의 원소는 element_idx[indptr[r]:indptr[r+1]])
+            system_ids: 행 순서의 system_id (system_id 정렬용)
+            energies: 행 순서의 흡착 에너지 (없으면 NaN)
+        """
+        n_rows = len(indptr) - 1
+        counts = np.diff(indptr)
+        rows = np.repeat(np.arange(n_rows, dtype=np.int64), counts)
+        # 원소 번호로 안정 정렬하면 각 원소 구간 안의 행 번호가 오름차순으로 유지됨
+        order = np.argsort(element_idx, kind="stable")
+        sorted_rows = rows[order]
+        bounds = np.searchsorted(element_idx[order], np.arange(len(elements) + 1))
+
+        self.n_rows = n_rows
+        self.bitmaps: Dict[str, np.ndarray] = {}
+        self.element_counts: Dict[str, int] = {}
+        for i, element in enumerate(elements):
+            posting = sorted_rows[bounds[i]:bounds[i + 1]]
+            if len(posting):
+                self.bitmaps[element] = rows_to_bitmap(posting, n_rows)
+                self.element_counts[element] = len(posting)
+        self.n_elements = counts.astype(np.int16)
+        self.class_bitmaps: Dict[int, np.ndarray] = {
+            int(n): rows_to_bitmap(np.flatnonzero(self.n_elements == n), n_rows)
+            for n in np.unique(self.n_elements)
+        }
+        self.all_rows = rows_to_bitmap(np.arange(n_rows), n_rows)
+        self.system_ids = system_ids
+        self.energies = np.asarray(energies, dtype=np.float64)
+        self._orders: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._order_lock = threading.Lock()
+
+    @classmethod
+    def from_compositions(cls, compositions: Sequence[Dict[str, float]], system_ids: Sequence[str],
+                          energies: Dict[str, float]) -> "ElementPostings":
+        """조성 dictionary 목록(CompositionIndex.compositions)에서 인덱스를 생성합니다."""
+        elements = sorted({element for comp in compositions for element in comp})
+        element_pos = {element: i for i, element in enumerate(elements)}
+        indptr = np.zeros(len(compositions) + 1, dtype=np.int64)
+        np.cumsum([len(comp) for comp in compositions], out=indptr[1:])
+        element_idx = np.fromiter((element_pos[element] for comp in compositions for element in comp),
+                                  dtype=np.int32, count=int(indptr[-1]))
+        energy_array = np.array([energies.get(sid, np.nan) for sid in system_ids], dtype=np.float64)
+        return cls(elements, indptr, element_idx, system_ids, energy_array)
+
+    def __len__(self) -> int:
+        return self.n_rows
+
+    @property
+    def elements(self) -> List[str]:
+        return sorted(self.bitmaps)
+
+    def match_bitmap(self, elements: Sequence[str], exact: bool = False) -> np.ndarray:
+        """
+        원소를 모두 포함하는 행의 비트맵을 반환합니다.
+        exact=True 이면 정확히 그 원소들로만 이루어진 행만 남깁니다.
+        """
+        wanted = set(elements)
+        if any(element not in self.bitmaps for element in wanted):
+            return np.zeros_like(self.all_rows)
+        if exact:
+            result = self.class_bitmaps.get(len(wanted))
+            if result is None:
+                return np.zeros_like(self.all_rows)
+        else:
+            result = self.all_rows
+        # 희소한 원소부터 AND
+        for element in sorted(wanted, key=self.element_counts.get):
+            result = result & self.bitmaps[element]
+        return result.copy() if result is self.all_rows else result
+
+    def match(self, elements: Sequence[str], exact: bool = False) -> np.ndarray:
+        """match_bitmap 과 같은 조건의 행 번호 배열(오름차순)을 반환합니다."""
+        return bitmap_to_rows(self.match_bitmap(elements, exact))
+
+    def count(self, bitmap: np.ndarray) -> int:
+        return _popcount(bitmap)
+
+    def sort_order(self, sort_by: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (정렬 순서: 순위 → 행, 순위: 행 → 순위) 배열을 반환합니다.
+        에너지가 없는 행은 에너지 정렬에서 항상 뒤에 옵니다.
+        """
+        if sort_by not in SORT_OPTIONS:
+            raise ValueError(f"sort_by 는 {SORT_OPTIONS} 중 하나여야 합니다: {sort_by!r}")
+        cached = self._orders.get(sort_by)
+        if cached is None:
+            with self._order_lock:
+                cached = self._orders.get(sort_by)
+                if cached is None:
+                    if sort_by == "none":
+                        order = np.arange(self.n_rows)
+                    elif sort_by == "system_id":
+                        order = np.argsort(np.asarray(self.system_ids, dtype=object), kind="stable")
+                    else:
+                        values = self.energies if sort_by == "adsorp_energy" else -self.energies
+                        order = np.argsort(values, kind="stable")  # NaN 은 argsort 에서 마지막
+                    rank = np.empty(self.n_rows, dtype=np.int64)
+                    rank[order] = np.arange(self.n_rows)
+                    cached = (order, rank)
+                    self._orders[sort_by] = cached
+        return cached
+
+    def page(self, bitmap: np.ndarray, sort_by: str = "none", limit: int = 10,
+             cursor: Optional[str] = None) -> PostingsPage:
+        """
+        일치 비트맵을 정렬 기준에 따라 한 페이지 잘라 반환합니다.
+        cursor 는 이전 페이지의 next_cursor 이며, 같은 sort_by 로만 사용할 수 있습니다.
+        """
+        order, rank = self.sort_order(sort_by)
+        total_found = self.count(bitmap)
+        start = 0
+        if cursor:
+            cursor_sort, _, cursor_rank = cursor.rpartition(":")
+            if cursor_sort != sort_by or not cursor_rank.isdigit():
+                raise ValueError(f"잘못된 cursor 입니다 (sort_by={sort_by!r}): {cursor!r}")
+            start = int(cursor_rank) + 1
+        limit = max(int(limit), 0)
+        want = limit + 1  # 한 개 더 찾아서 다음 페이지 존재 여부를 판단
+
+        if sort_by == "none":
+            ranks = self._scan_words(bitmap, start, want, total_found)
+        else:
+            ranks, pos = self._walk_order(bitmap, order, start, want, total_found)
+            if len(ranks) < want and pos < self.n_rows and total_found:
+                # 일치 행이 희소하거나 정렬 순서 뒤쪽에 몰려 있음 - 남은 일치 행을 꺼내 정렬
+                rest = rank[bitmap_to_rows(bitmap)]
+                rest = rest[rest >= pos]
+                if len(rest) > want - len(ranks):
+                    rest = rest[np.argpartition(rest, want - len(ranks) - 1)[:want - len(ranks)]]
+                ranks = np.concatenate([ranks, np.sort(rest)])
+
+        selected = ranks[:limit]
+        next_cursor = f"{sort_by}:{int(selected[-1])}" if len(ranks) > limit and len(selected) else None
+        return PostingsPage(order[selected].tolist(), total_found, next_cursor)
+
+    def cursor_after(self, row: int, sort_by: str = "none") -> str:
+        """row 다음부터 이어서 조회하는 cursor (페이지를 잘라서 반환할 때 사용)"""
+        _, rank = self.sort_order(sort_by)
+        return f"{sort_by}:{int(rank[row])}"
+
+    def _chunk_size(self, want: int, total_found: int) -> int:
+        """want 개를 찾기 위해 살펴봐야 할 것으로 예상되는 행 수 (일치 비율 기준, 여유 2배)"""
+        if not total_found:
+            return 0
+        return max(_MIN_CHUNK, 2 * want * self.n_rows // total_found)
+
+    def _scan_words(self, bitmap: np.ndarray, start: int, want: int, total_found: int) -> np.ndarray:
+        """행 번호 start 부터 켜진 비트를 최대 want 개 찾음 (데이터 순서)"""
+        found = []
+        n_found = 0
+        chunk = self._chunk_size(want, total_found) // 64 + 1
+        word = start // 64
+        while total_found and word < len(bitmap) and n_found < want:
+            rows = bitmap_to_rows(bitmap[word:word + chunk], word)
+            rows = rows[rows >= start]
+            found.append(rows)
+            n_found += len(rows)
+            word += chunk
+            chunk *= 2
+        return np.concatenate(found)[:want] if found else np.empty(0, dtype=np.int64)
+
+    def _walk_order(self, bitmap: np.ndarray, order: np.ndarray, start: int, want: int,
+                    total_found: int) -> Tuple[np.ndarray, int]:
+        """
+        정렬 순서를 start 순위부터 최대 _WALK_BUDGET 행까지 따라가며 일치하는 순위를 최대 want 개 찾습니다.
+        (찾은 순위, 다음에 살펴볼 순위) 를 반환합니다.
+        """
+        found = []
+        n_found = 0
+        pos = start
+        chunk = self._chunk_size(want, total_found)
+        if not chunk or chunk > _WALK_BUDGET:
+            return np.empty(0, dtype=np.int64), pos
+        end = min(len(order), start + _WALK_BUDGET)
+        while pos < end and n_found < want:
+            rows = order[pos:min(pos + chunk, end)]
+            hits = np.flatnonzero((bitmap[rows >> 6] >> (rows & 63).astype(np.uint64)) & np.uint64(1))
+            found.append(hits + pos)
+            n_found += len(hits)
+            pos += len(rows)
+            chunk *= 2
+        ranks = np.concatenate(found)[:want] if found else np.empty(0, dtype=np.int64)
+        if n_found >= want:
+            pos = int(ranks[-1]) + 1
+        return ranks, pos
+
+    def search(self, elements: Sequence[str], exact: bool = False, sort_by: str = "none",
+               limit: int = 10, cursor: Optional[str] = None) -> PostingsPage:
+        """원소 조건 질의와 pagination 을 한 번에 수행합니다."""
+        return self.page(self.match_bitmap(elements, exact), sort_by=sort_by, limit=limit, cursor=cursor)
@@ -3,46 +3,35 @@
 from fastapi import FastAPI
 from pydantic import BaseModel
 from typing import Dict, Optional
-import csv
-import ast
+
+from dft.composition_index import get_composition_index
 
 app = FastAPI()
 
+COMP_CSV_PATH = r"C:\Users\spark\Desktop\LLM_Catalyst_Agent\data\hydrogen\system_compositions_fraction.csv"
+INFO_CSV_PATH = r"C:\Users\spark\Desktop\LLM_Catalyst_Agent\data\hydrogen\system_info_with_adsorp.csv"
+
 # 입력 형식 정의
 class CompositionRequest(BaseModel):
     composition: Dict[str, float]
+    k_neighbors: int = 0  # 일치하는 조성이 없을 때 반환할 최근접 시스템 수
 
 # 기존 함수
 def get_adsorp_energy_by_composition(
     composition_dict,
-    comp_csv_path=r"C:\Users\spark\Desktop\LLM_Catalyst_Agent\data\hydrogen\system_compositions_fraction.csv",
-    info_csv_path=r"C:\Users\spark\Desktop\LLM_Catalyst_Agent\data\hydrogen\system_info_with_adsorp.csv"
+    comp_csv_path=COMP_CSV_PATH,
+    info_csv_path=INFO_CSV_PATH
 ) -> Optional[float]:
-    tolerance = 1e-6
-    with open(comp_csv_path, encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                comp = ast.literal_eval(row["composition_fraction"])
-                if set(comp.keys()) == set(composition_dict.keys()):
-                    if all(abs(comp[k] - composition_dict[k]) < tolerance for k in comp):
-                        system_id = row["system_id"]
-                        break
-            except Exception:
-                continue
-        else:
-            return None
-    with open(info_csv_path, encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if row["system_id"] == system_id:
-                return float(row["adsorp_energy"])
-    return None
+    return get_composition_index(comp_csv_path, info_csv_path).get_energy(composition_dict)
 
 # 엔드포인트
 @app.post("/get_adsorp_energy")
 def get_energy(request: CompositionRequest):
     energy = get_adsorp_energy_by_composition(request.composition)
     if energy is None:
-        return {"status": "error", "message": "No matching system found."}
+        response = {"status": "error", "message": "No matching system found."}
+        if request.k_neighbors > 0:
+            index = get_composition_index(COMP_CSV_PATH, INFO_CSV_PATH)
+            response["neighbors"] = index.nearest(request.composition, request.k_neighbors)
+        return response
     return {"status": "ok", "adsorp_energy": energy}
@@ -0,0 +1,193 @@
+"""
+Range index
+
+원소 분율 구간(예: Pt 0.2~0.5)과 흡착 에너지 구간(예: |E| < 0.1 eV) 질의를 위한 정렬 배열 인덱스입니다.
+로드 시 원소별로 (분율, 행) 을 분율 순으로 정렬해 두고, 에너지도 한 번 정렬해 두므로
+구간 질의는 이진 탐색 두 번 + 해당 구간 행들의 비트맵 변환으로 끝나며 전체 테이블을 훑지 않습니다.
+여러 조건은 ElementPostings 와 같은 행 비트맵으로 표현되어 AND 로 결합됩니다.
+
+목표 에너지에 가장 가까운 k 개 질의는 정렬된 에너지 배열에서 목표 위치를 이진 탐색한 뒤
+양쪽으로 창을 두 배씩 넓혀 가며, 창 밖의 어떤 행도 k 번째 후보보다 가까울 수 없을 때 멈춥니다.
+"""
+
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from dft.element_postings import ElementPostings, bitmap_to_rows, rows_to_bitmap
+
+# 분율 경계 비교 여유 (파일의 분율은 v/total 로 계산된 float 이므로 0.25 가 0.25000000000000006 일 수 있음)
+FRACTION_SLACK = 1e-9
+
+# 필터 비트맵의 일치 행이 이 수 이하이면 창을 넓히지 않고 일치 행을 직접 꺼내 비교
+_DIRECT_LIMIT = 4096
+
+
+class EnergyNeighbor(NamedTuple):
+    """목표 에너지 근처 질의 결과 한 행"""
+    row: int
+    energy: float
+    delta: float
+
+
+def _bounds(value_range) -> Tuple[float, float]:
+    """{"min": a, "max": b} 또는 [a, b] 를 (하한, 상한) 으로 변환 (생략된 쪽은 무한대)"""
+    if isinstance(value_range, Mapping):
+        lo, hi = value_range.get("min"), value_range.get("max")
+    elif isinstance(value_range, (list, tuple)) and len(value_range) == 2:
+        lo, hi = value_range
+    else:
+        raise ValueError(f"구간은 {{'min': a, 'max': b}} 또는 [a, b] 형식이어야 합니다: {value_range!r}")
+    lo = -np.inf if lo is None else float(lo)
+    hi = np.inf if hi is None else float(hi)
+    if np.isnan(lo) or np.isnan(hi):
+        raise ValueError(f"구간의 min / max 는 숫자여야 합니다: {value_range!r}")
+    if lo > hi:
+        raise ValueError(f"구간의 min 이 max 보다 큽니다: {value_range!r}")
+    return lo, hi
+
+
+class RangeIndex:
+    """원소 분율·흡착 에너지 구간 질의 인덱스"""
+
+    def __init__(self, postings: ElementPostings, compositions: Sequence[Dict[str, float]]):
+        """
+        Args:
+            postings: 같은 행 순서의 원소 역색인 (행 비트맵, 에너지 배열, 정렬/페이지 기능 공유)
+            compositions: 행 순서의 조성 dictionary 목록
+        """
+        self.postings = postings
+        n_rows = len(postings)
+
+        elements = sorted(postings.bitmaps)
+        element_pos = {element: i for i, element in enumerate(elements)}
+        counts = np.fromiter((len(comp) for comp in compositions), dtype=np.int64, count=n_rows)
+        rows = np.repeat(np.arange(n_rows, dtype=np.int64), counts)
+        element_idx = np.fromiter((element_pos[element] for comp in compositions for element in comp),
+                                  dtype=np.int32, count=len(rows))
+        values = np.fromiter((value for comp in compositions for value in comp.values()),
+                             dtype=np.float64, count=len(rows))
+        # 원소 번호 → 분율 순으로 정렬하면 원소마다 분율 오름차순 구간이 연속으로 놓임
+        order = np.lexsort((values, element_idx))
+        bounds = np.searchsorted(element_idx[order], np.arange(len(elements) + 1))
+        sorted_rows = rows[order]
+        sorted_values = values[order]
+        self._fractions: Dict[str, Tuple[np.ndarray, np.ndarray]] = {
+            element: (sorted_values[bounds[i]:bounds[i + 1]], sorted_rows[bounds[i]:bounds[i + 1]])
+            for i, element in enumerate(elements)
+        }
+
+        energies = postings.energies
+        known = np.flatnonzero(~np.isnan(energies))
+        energy_order = known[np.argsort(energies[known], kind="stable")]
+        self.energy_rows = energy_order
+        self.energy_values = energies[energy_order]
+
+    @classmethod
+    def from_index(cls, index) -> "RangeIndex":
+        """CompositionIndex 의 원소 역색인과 조성 목록으로 인덱스를 생성합니다."""
+        return cls(index.element_postings(), index.compositions)
+
+    def __len__(self) -> int:
+        return len(self.postings)
+
+    def fraction_column(self, element: str) -> Tuple[np.ndarray, np.ndarray]:
+        """element 를 포함하는 행들의 (분율 오름차순 배열, 같은 순서의 행 번호 배열)"""
+        return self._fractions.get(element, (np.empty(0), np.empty(0, dtype=np.int64)))
+
+    def fraction_bitmap(self, element: str, lo: float, hi: float) -> np.ndarray:
+        """element 의 분율이 [lo, hi] 에 드는 행의 비트맵 (0 이 구간에 들면 element 가 없는 행도 포함)"""
+        values, rows = self.fraction_column(element)
+        start = np.searchsorted(values, lo - FRACTION_SLACK, side="left")
+        stop = np.searchsorted(values, hi + FRACTION_SLACK, side="right")
+        bitmap = rows_to_bitmap(rows[start:stop], len(self))
+        if lo - FRACTION_SLACK <= 0 <= hi + FRACTION_SLACK:
+            absent = self.postings.bitmaps.get(element)
+            bitmap |= self.postings.all_rows if absent is None else (self.postings.all_rows & ~absent)
+        return bitmap
+
+    def energy_bitmap(self, lo: float, hi: float) -> np.ndarray:
+        """흡착 에너지가 [lo, hi] 에 드는 행의 비트맵 (에너지가 없는 행은 제외)"""
+        start = np.searchsorted(self.energy_values, lo, side="left")
+        stop = np.searchsorted(self.energy_values, hi, side="right")
+        return rows_to_bitmap(self.energy_rows[start:stop], len(self))
+
+    def match_bitmap(self, fraction_ranges: Optional[Mapping[str, object]] = None,
+                     energy_range=None, elements: Sequence[str] = (), exact: bool = False,
+                     n_elements: Optional[int] = None) -> Optional[np.ndarray]:
+        """
+        조건을 모두 만족하는 행의 비트맵을 반환합니다. 조건이 하나도 없으면 None (전체 행).
+
+        Args:
+            fraction_ranges: 원소 → 분율 구간 ({"min": a, "max": b} 또는 [a, b])
+            energy_range: 흡착 에너지 구간 (같은 형식)
+            elements: 반드시 포함할 원소들 (exact=True 이면 정확히 이 원소들로만 구성)
+            n_elements: n 원계 필터
+        """
+        parts: List[np.ndarray] = []
+        if elements:
+            parts.append(self.postings.match_bitmap(elements, exact))
+        if n_elements:
+            parts.append(self.postings.class_bitmaps.get(int(n_elements), np.zeros_like(self.postings.all_rows)))
+        for element, value_range in (fraction_ranges or {}).items():
+            parts.append(self.fraction_bitmap(element, *_bounds(value_range)))
+        if energy_range is not None:
+            parts.append(self.energy_bitmap(*_bounds(energy_range)))
+        if not parts:
+            return None
+        # 일치 행이 적은 조건부터 AND
+        parts.sort(key=self.postings.count)
+        result = parts[0].copy()
+        for part in parts[1:]:
+            result &= part
+        return result
+
+    def closest_to_energy(self, target: float, k: int = 10,
+                          bitmap: Optional[np.ndarray] = None) -> List[EnergyNeighbor]:
+        """
+        흡착 에너지가 target 에 가장 가까운 k 개 행을 |E - target| 오름차순으로 반환합니다.
+        bitmap 이 주어지면 그 비트맵에 속한 행 중에서만 고릅니다.
+        """
+        k = max(int(k), 0)
+        n = len(self.energy_values)
+        if not k or not n:
+            return []
+        target = float(target)
+        if bitmap is not None and self.postings.count(bitmap) <= _DIRECT_LIMIT:
+            rows = bitmap_to_rows(bitmap)
+            energies = self.postings.energies[rows]
+            known = ~np.isnan(energies)
+            rows, energies = rows[known], energies[known]
+            best = np.argsort(np.abs(energies - target), kind="stable")[:k]
+            return [EnergyNeighbor(int(rows[i]), float(energies[i]), float(energies[i] - target)) for i in best]
+
+        center = int(np.searchsorted(self.energy_values, target))
+        radius = k
+        while True:
+            lo, hi = max(center - radius, 0), min(center + radius, n)
+            ranks = np.arange(lo, hi)
+            rows = self.energy_rows[lo:hi]
+            if bitmap is not None:
+                keep = ((bitmap[rows >> 6] >> (rows & 63).astype(np.uint64)) & np.uint64(1)).astype(bool)
+                ranks, rows = ranks[keep], rows[keep]
+            deltas = np.abs(self.energy_values[ranks] - target)
+            covered = lo == 0 and hi == n
+            if len(ranks) >= k or covered:
+                best = np.argsort(deltas, kind="stable")[:k]
+                # 창 밖의 행은 창 경계보다 가까울 수 없음
+                outside = min(target - self.energy_values[lo - 1] if lo > 0 else np.inf,
+                              self.energy_values[hi] - target if hi < n else np.inf)
+                if covered or (len(best) == k and deltas[best[-1]] <= outside):
+                    return [EnergyNeighbor(int(rows[i]), float(self.energy_values[ranks[i]]),
+                                           float(self.energy_values[ranks[i]] - target)) for i in best]
+            radius *= 2
+
+    def search(self, fraction_ranges: Optional[Mapping[str, object]] = None, energy_range=None,
+               elements: Sequence[str] = (), exact: bool = False, n_elements: Optional[int] = None,
+               sort_by: str = "none", limit: int = 10, cursor: Optional[str] = None):
+        """구간 조건 질의와 pagination 을 한 번에 수행합니다. (ElementPostings.page 결과 반환)"""
+        bitmap = self.match_bitmap(fraction_ranges, energy_range, elements, exact, n_elements)
+        if bitmap is None:
+            bitmap = self.postings.all_rows
+        return self.postings.page(bitmap, sort_by=sort_by, limit=limit, cursor=cursor)
+
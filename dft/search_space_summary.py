@@ -0,0 +1,151 @@
+"""
+Search-space summary
+
+연구 공간 전체의 집계(원소별 빈도, n 원계 분포, 흡착 에너지 히스토그램)를 한 번 계산해 두고,
+시스템이 추가되면 추가된 행만 반영하여 갱신합니다. 응답용 JSON 은 계산 시점에 미리 직렬화해 두므로
+get_search_space_summary / get_available_elements 는 데이터 크기와 무관하게 상수 시간에 응답합니다.
+
+히스토그램은 0 eV 에 정렬된 고정 폭(HISTOGRAM_BIN_WIDTH) 구간을 사용하므로,
+새 시스템이 기존 범위 밖의 에너지를 가져도 구간을 다시 나눌 필요 없이 그대로 누적됩니다.
+"""
+
+import json
+import math
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+
+HISTOGRAM_BIN_WIDTH = 0.5  # eV
+TOP_ELEMENTS = 20
+
+
+def _bin(energy: float) -> int:
+    return math.floor(energy / HISTOGRAM_BIN_WIDTH)
+
+
+def _render_histogram(counts: Counter) -> Dict[str, object]:
+    """{bin 번호: 개수} → {"start": 첫 구간 하한, "counts": [연속 구간 개수, ...]}"""
+    if not counts:
+        return {"start": None, "counts": []}
+    lo, hi = min(counts), max(counts)
+    return {"start": lo * HISTOGRAM_BIN_WIDTH, "counts": [counts.get(b, 0) for b in range(lo, hi + 1)]}
+
+
+class SearchSpaceSummary:
+    """연구 공간 집계 (원소 빈도, n 원계 분포, 에너지 히스토그램)"""
+
+    def __init__(self):
+        self.total = 0
+        self.element_counts: Counter = Counter()
+        self.n_element_counts: Counter = Counter()
+        self.energy_hist: Counter = Counter()
+        self.element_energy_hist: Dict[str, Counter] = {}
+        self.n_element_energy_hist: Dict[int, Counter] = {}
+        self._summary_json: Optional[str] = None
+        self._elements_json: Optional[str] = None
+
+    @classmethod
+    def from_rows(cls, system_ids: Sequence[str], compositions: Sequence[Dict[str, float]],
+                  energies: Dict[str, float]) -> "SearchSpaceSummary":
+        summary = cls()
+        summary.add_systems(system_ids, compositions, energies)
+        return summary
+
+    @classmethod
+    def from_index(cls, index, previous: Optional["SearchSpaceSummary"] = None,
+                   previous_index=None) -> "SearchSpaceSummary":
+        """
+        CompositionIndex 의 집계를 반환합니다.
+        previous_index 의 행이 index 의 앞부분과 같으면(시스템이 뒤에 추가된 경우) previous 를 복사해
+        추가된 행만 반영하고, 그렇지 않으면 처음부터 다시 계산합니다.
+        """
+        start = appended_from(previous_index, index) if previous is not None else None
+        if start is None:
+            return cls.from_rows(index.system_ids, index.compositions, index.energies)
+        summary = previous.copy()
+        summary.add_systems(index.system_ids[start:], index.compositions[start:], index.energies)
+        return summary
+
+    def copy(self) -> "SearchSpaceSummary":
+        """갱신용 복사본 (기존 객체는 진행 중인 호출이 계속 사용할 수 있도록 그대로 둠)"""
+        other = SearchSpaceSummary()
+        other.total = self.total
+        other.element_counts = self.element_counts.copy()
+        other.n_element_counts = self.n_element_counts.copy()
+        other.energy_hist = self.energy_hist.copy()
+        other.element_energy_hist = {k: v.copy() for k, v in self.element_energy_hist.items()}
+        other.n_element_energy_hist = {k: v.copy() for k, v in self.n_element_energy_hist.items()}
+        return other
+
+    def add_systems(self, system_ids: Sequence[str], compositions: Sequence[Dict[str, float]],
+                    energies: Dict[str, float]):
+        """시스템들을 집계에 추가합니다. (energies 에 없는 시스템은 빈도에만 반영)"""
+        for system_id, composition in zip(system_ids, compositions):
+            n_elements = len(composition)
+            self.total += 1
+            self.element_counts.update(composition.keys())
+            self.n_element_counts[n_elements] += 1
+
+            energy = energies.get(system_id)
+            if energy is None or energy != energy:
+                continue
+            b = _bin(energy)
+            self.energy_hist[b] += 1
+            self.n_element_energy_hist.setdefault(n_elements, Counter())[b] += 1
+            for element in composition:
+                self.element_energy_hist.setdefault(element, Counter())[b] += 1
+        self._summary_json = None
+        self._elements_json = None
+
+    @property
+    def available_elements(self) -> List[str]:
+        return sorted(self.element_counts)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "total_compositions": self.total,
+            "unique_elements": len(self.element_counts),
+            "element_frequency": dict(self.element_counts.most_common(TOP_ELEMENTS)),
+            "n_element_distribution": dict(sorted(self.n_element_counts.items())),
+            "available_elements": self.available_elements,
+            "adsorp_energy_histograms": {
+                "bin_width": HISTOGRAM_BIN_WIDTH,
+                "note": "counts[i] 는 [start + i*bin_width, start + (i+1)*bin_width) eV 구간의 시스템 수",
+                "overall": _render_histogram(self.energy_hist),
+                "by_n_elements": {n: _render_histogram(h) for n, h in sorted(self.n_element_energy_hist.items())},
+                "by_element": {el: _render_histogram(h) for el, h in sorted(self.element_energy_hist.items())},
+            },
+            "status": "success"
+        }
+
+    def summary_json(self) -> str:
+        """get_search_space_summary 응답 JSON (캐시됨)"""
+        if self._summary_json is None:
+            self._summary_json = json.dumps(self.to_dict(), ensure_ascii=False)
+        return self._summary_json
+
+    def elements_json(self) -> str:
+        """get_available_elements 응답 JSON (캐시됨)"""
+        if self._elements_json is None:
+            self._elements_json = json.dumps({
+                "available_elements": self.available_elements,
+                "total_elements": len(self.element_counts),
+                "status": "success"
+            }, ensure_ascii=False)
+        return self._elements_json
+
+
+def appended_from(old_index, new_index) -> Optional[int]:
+    """
+    new_index 가 old_index 의 모든 행을 같은 순서·같은 값으로 유지하고 뒤에 행만 추가한 것이면
+    추가가 시작되는 행 번호를, 아니면 None 을 반환합니다.
+    """
+    if old_index is None or len(new_index) < len(old_index):
+        return None
+    n = len(old_index)
+    if (new_index.system_ids[:n] != old_index.system_ids
+            or new_index.compositions[:n] != old_index.compositions[:]):
+        return None
+    for system_id in old_index.system_ids:
+        if new_index.energies.get(system_id) != old_index.energies.get(system_id):
+            return None
+    return n
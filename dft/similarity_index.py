@@ -0,0 +1,178 @@
+"""
+Composition similarity index
+
+find_similar_compositions 와 CompositionIndex.nearest (get_adsorp_energy 의 neighbors) 가 함께 쓰는
+k-최근접 조성 인덱스입니다. 세 가지 거리를 지원합니다. (nearest 는 l1)
+
+- l1:       분율 벡터의 L1 거리. 분율 합이 a, b 인 두 조성의 거리는 a + b - 2·Σ min(분율)
+- cosine:   분율 벡터의 cosine 거리 1 - a·b / (|a||b|)
+- property: 원소 물성(전기음성도, 공유결합 반지름, 족, 주기)의 분율 가중 평균 벡터를 표준화한 공간의 Euclidean 거리
+
+l1/cosine 은 희소 분율 행렬의 원소별 열(RangeIndex.fraction_column, 원소 → (분율, 행))을 역색인으로 사용하여
+질의 조성이 가진 원소 열만 훑어 Σ min / 내적을 누적하고, 원소를 공유하는 행들 중에서 k 개를 고릅니다.
+원소를 하나도 공유하지 않는 행은 거리가 최댓값(l1: a + b, cosine: 1)으로 정해져 있으므로 계산할 필요가 없습니다.
+property 는 4 차원 descriptor 이므로 scikit-learn 이 있으면 KDTree, 없으면 NumPy brute-force 로 질의합니다.
+"""
+
+import logging
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from dft.range_index import RangeIndex
+from dft.surrogate_regressor import ELEMENT_PROPERTIES, PROPERTY_NAMES
+
+try:
+    from sklearn.neighbors import KDTree
+except ImportError:  # scikit-learn 은 선택 의존성
+    KDTree = None
+
+logger = logging.getLogger(__name__)
+
+SIMILARITY_METRICS = ("l1", "cosine", "property")
+
+# 같은 조성으로 볼 L1 거리 (자기 자신 제외용)
+_SAME_COMPOSITION = 1e-6
+# 자기 자신과 중복 행을 제외하기 위해 더 찾아 둘 후보 수
+_EXTRA_CANDIDATES = 8
+
+# property 거리에 쓰는 원소 물성 (Pauling 전기음성도, 공유결합 반지름 pm, 족, 주기) - surrogate 의 원소 물성표에서 선택
+DESCRIPTOR_NAMES = ("electronegativity", "covalent_radius", "group", "period")
+_DESCRIPTOR_COLUMNS = [PROPERTY_NAMES.index(name) for name in DESCRIPTOR_NAMES]
+ELEMENT_DESCRIPTORS: Dict[str, np.ndarray] = {
+    element: np.asarray(properties, dtype=np.float64)[_DESCRIPTOR_COLUMNS]
+    for element, properties in ELEMENT_PROPERTIES.items()
+}
+
+
+class SimilarityIndex:
+    """l1 / cosine / property 거리 k-최근접 조성 인덱스"""
+
+    def __init__(self, ranges: RangeIndex, compositions: Sequence[Dict[str, float]]):
+        """
+        Args:
+            ranges: 같은 행 순서의 구간 인덱스 (원소별 분율 열 공유)
+            compositions: 행 순서의 조성 dictionary 목록
+        """
+        self.ranges = ranges
+        self.compositions = compositions
+        n_rows = len(ranges)
+        self.row_sums = np.zeros(n_rows)
+        self.row_norms = np.zeros(n_rows)
+        descriptor_sums = np.zeros((n_rows, len(DESCRIPTOR_NAMES)))
+        known_sums = np.zeros(n_rows)
+        missing = []
+        for element in ranges.postings.elements:
+            values, rows = ranges.fraction_column(element)
+            self.row_sums[rows] += values
+            self.row_norms[rows] += values ** 2
+            properties = ELEMENT_DESCRIPTORS.get(element)
+            if properties is None:
+                missing.append(element)
+                continue
+            descriptor_sums[rows] += values[:, None] * properties
+            known_sums[rows] += values
+        self.row_norms = np.sqrt(self.row_norms)
+        if missing:
+            logger.warning(f"물성표에 없는 원소는 property 거리에서 제외됩니다: {missing}")
+
+        # 분율 가중 평균 물성 → 데이터셋 기준 표준화
+        descriptors = descriptor_sums / np.where(known_sums > 0, known_sums, 1.0)[:, None]
+        self._property_mean = descriptors.mean(axis=0) if n_rows else np.zeros(len(DESCRIPTOR_NAMES))
+        std = descriptors.std(axis=0) if n_rows else np.ones(len(DESCRIPTOR_NAMES))
+        self._property_scale = np.where(std > 0, std, 1.0)
+        self.descriptors = (descriptors - self._property_mean) / self._property_scale
+        self._tree = KDTree(self.descriptors) if KDTree is not None and n_rows else None
+
+    @classmethod
+    def from_index(cls, index) -> "SimilarityIndex":
+        """CompositionIndex 의 구간 인덱스와 조성 목록으로 인덱스를 생성합니다."""
+        return cls(index.range_index(), index.compositions)
+
+    def __len__(self) -> int:
+        return len(self.row_sums)
+
+    def describe(self, composition: Dict[str, float]) -> np.ndarray:
+        """조성의 표준화된 물성 descriptor (물성표에 없는 원소가 있으면 ValueError)"""
+        unknown = [element for element in composition if element not in ELEMENT_DESCRIPTORS]
+        if unknown:
+            raise ValueError(f"property 거리를 계산할 수 없는 원소입니다: {unknown}")
+        total = sum(float(v) for v in composition.values())
+        if total <= 0:
+            raise ValueError("조성의 분율 합이 0 입니다.")
+        descriptor = sum(float(v) * ELEMENT_DESCRIPTORS[e] for e, v in composition.items()) / total
+        return (descriptor - self._property_mean) / self._property_scale
+
+    def _sparse_distances(self, composition: Dict[str, float], metric: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        질의 조성이 가진 원소 열만 훑어 l1 또는 cosine 거리를 계산합니다.
+        (원소를 공유하는 행 번호, 그 거리) 를 반환하며, 나머지 행의 거리는 l1: 행 분율 합 + 질의 분율 합, cosine: 1 입니다.
+        """
+        accumulated = np.zeros(len(self))
+        touched = np.zeros(len(self), dtype=bool)
+        for element, value in composition.items():
+            values, rows = self.ranges.fraction_column(element)
+            touched[rows] = True
+            if metric == "l1":
+                accumulated[rows] += np.minimum(values, float(value))
+            else:
+                accumulated[rows] += values * float(value)
+        rows = np.flatnonzero(touched)
+        if metric == "l1":
+            return rows, self.row_sums[rows] + sum(float(v) for v in composition.values()) - 2.0 * accumulated[rows]
+        norm = np.sqrt(sum(float(v) ** 2 for v in composition.values()))
+        if norm <= 0:
+            raise ValueError("조성의 분율 벡터 크기가 0 입니다.")
+        return rows, 1.0 - accumulated[rows] / self.row_norms[rows] / norm
+
+    def _candidates(self, composition: Dict[str, float], k: int, metric: str) -> Tuple[np.ndarray, np.ndarray]:
+        if metric == "property":
+            descriptor = self.describe(composition)
+            if self._tree is not None:
+                distances, rows = self._tree.query(descriptor[None, :], k=k)
+                return rows[0], distances[0]
+            rows = np.arange(len(self))
+            distances = np.sqrt(((self.descriptors - descriptor) ** 2).sum(axis=1))
+        else:
+            rows, distances = self._sparse_distances(composition, metric)
+            if len(rows) < k:
+                # 원소를 공유하는 행이 k 개보다 적음 - 나머지 행의 고정 거리까지 포함하여 전체에서 선택
+                untouched = np.ones(len(self), dtype=bool)
+                untouched[rows] = False
+                rest = np.flatnonzero(untouched)
+                if metric == "l1":
+                    rest_distances = self.row_sums[rest] + sum(float(v) for v in composition.values())
+                else:
+                    rest_distances = np.ones(len(rest))
+                rows = np.concatenate([rows, rest])
+                distances = np.concatenate([distances, rest_distances])
+        picked = np.argpartition(distances, k - 1)[:k] if k < len(distances) else np.arange(len(distances))
+        picked = picked[np.lexsort((rows[picked], distances[picked]))]
+        return rows[picked], distances[picked]
+
+    def query(self, composition: Dict[str, float], k: int = 5, metric: str = "l1",
+              exclude_self: bool = True) -> List[Tuple[int, float]]:
+        """
+        가까운 순서대로 (행 번호, 거리) 최대 k 개를 반환합니다.
+        exclude_self=True 이면 질의와 같은 조성(L1 거리 1e-6 이하)의 행은 제외합니다.
+        """
+        if metric not in SIMILARITY_METRICS:
+            raise ValueError(f"metric 은 {SIMILARITY_METRICS} 중 하나여야 합니다: {metric!r}")
+        k = max(int(k), 0)
+        if not k or not len(self):
+            return []
+        want = min(k + (_EXTRA_CANDIDATES if exclude_self else 0), len(self))
+        while True:
+            rows, distances = self._candidates(composition, want, metric)
+            results = [
+                (row, max(distance, 0.0)) for row, distance in zip(rows.tolist(), distances.tolist())
+                if not (exclude_self and self._same(composition, self.compositions[row]))
+            ]
+            # 같은 조성의 중복 행이 후보를 채운 경우 후보를 늘려 다시 질의
+            if len(results) >= k or want >= len(self):
+                return results[:k]
+            want = min(want * 2, len(self))
+
+    @staticmethod
+    def _same(a: Dict[str, float], b: Dict[str, float]) -> bool:
+        return sum(abs(float(a.get(e, 0.0)) - float(b.get(e, 0.0))) for e in set(a) | set(b)) <= _SAME_COMPOSITION
@@ -0,0 +1,406 @@
+"""
+Adsorption energy surrogate regressor
+
+system_info_with_adsorp.csv 의 DFT 흡착 에너지로 학습한 NumPy 전용 회귀 모델입니다.
+데이터에 없는 조성에 대해서도 흡착 에너지와 불확실도(표준편차)를 예측합니다.
+
+- 특징(feature): 원소 비율 벡터 + 원소 물성(원자번호, 족, 주기, 전기음성도, 공유결합 반지름)의
+  조성 가중 평균/표준편차/최솟값/최댓값 + 원소 개수
+- 모델: RBF 커널의 random Fourier features 위에서의 Bayesian linear regression
+  (random-features Gaussian process). 예측은 행렬곱 몇 번으로 배치 처리됩니다.
+- 저장: model_dir/ 아래 .npy 파일 + meta.json, np.load(mmap_mode="r") 로 로드
+
+학습 (프로젝트 루트에서):
+    python -m dft.surrogate_regressor
+"""
+
+import argparse
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from dft.binary_store import save_npy_atomic, write_json_atomic
+from dft.composition import canonical_key
+
+logger = logging.getLogger(__name__)
+
+# 2: 조성 그룹 단위 검증 분할로 고른 하이퍼파라미터 (이전 모델은 재학습)
+FORMAT_VERSION = 2
+DEFAULT_MODEL_DIR = "models/adsorp_surrogate"
+
+# symbol: (원자번호, 족, 주기, Pauling 전기음성도, 공유결합 반지름[pm]) - dft.similarity_index 도 이 표를 사용
+ELEMENT_PROPERTIES: Dict[str, Tuple[float, float, float, float, float]] = {
+    "H": (1, 1, 1, 2.20, 31), "Li": (3, 1, 2, 0.98, 128), "Be": (4, 2, 2, 1.57, 96),
+    "B": (5, 13, 2, 2.04, 84), "C": (6, 14, 2, 2.55, 76), "N": (7, 15, 2, 3.04, 71),
+    "O": (8, 16, 2, 3.44, 66), "F": (9, 17, 2, 3.98, 57), "Na": (11, 1, 3, 0.93, 166),
+    "Mg": (12, 2, 3, 1.31, 141), "Al": (13, 13, 3, 1.61, 121), "Si": (14, 14, 3, 1.90, 111),
+    "P": (15, 15, 3, 2.19, 107), "S": (16, 16, 3, 2.58, 105), "Cl": (17, 17, 3, 3.16, 102),
+    "K": (19, 1, 4, 0.82, 203), "Ca": (20, 2, 4, 1.00, 176), "Sc": (21, 3, 4, 1.36, 170),
+    "Ti": (22, 4, 4, 1.54, 160), "V": (23, 5, 4, 1.63, 153), "Cr": (24, 6, 4, 1.66, 139),
+    "Mn": (25, 7, 4, 1.55, 139), "Fe": (26, 8, 4, 1.83, 132), "Co": (27, 9, 4, 1.88, 126),
+    "Ni": (28, 10, 4, 1.91, 124), "Cu": (29, 11, 4, 1.90, 132), "Zn": (30, 12, 4, 1.65, 122),
+    "Ga": (31, 13, 4, 1.81, 122), "Ge": (32, 14, 4, 2.01, 120), "As": (33, 15, 4, 2.18, 119),
+    "Se": (34, 16, 4, 2.55, 120), "Br": (35, 17, 4, 2.96, 120), "Rb": (37, 1, 5, 0.82, 220),
+    "Sr": (38, 2, 5, 0.95, 195), "Y": (39, 3, 5, 1.22, 190), "Zr": (40, 4, 5, 1.33, 175),
+    "Nb": (41, 5, 5, 1.60, 164), "Mo": (42, 6, 5, 2.16, 154), "Tc": (43, 7, 5, 1.90, 147),
+    "Ru": (44, 8, 5, 2.20, 146), "Rh": (45, 9, 5, 2.28, 142), "Pd": (46, 10, 5, 2.20, 139),
+    "Ag": (47, 11, 5, 1.93, 145), "Cd": (48, 12, 5, 1.69, 144), "In": (49, 13, 5, 1.78, 142),
+    "Sn": (50, 14, 5, 1.96, 139), "Sb": (51, 15, 5, 2.05, 139), "Te": (52, 16, 5, 2.10, 138),
+    "I": (53, 17, 5, 2.66, 139), "Cs": (55, 1, 6, 0.79, 244), "Ba": (56, 2, 6, 0.89, 215),
+    "La": (57, 3, 6, 1.10, 207), "Hf": (72, 4, 6, 1.30, 175), "Ta": (73, 5, 6, 1.50, 170),
+    "W": (74, 6, 6, 2.36, 162), "Re": (75, 7, 6, 1.90, 151), "Os": (76, 8, 6, 2.20, 144),
+    "Ir": (77, 9, 6, 2.20, 141), "Pt": (78, 10, 6, 2.28, 136), "Au": (79, 11, 6, 2.54, 136),
+    "Hg": (80, 12, 6, 2.00, 132), "Tl": (81, 13, 6, 1.62, 145), "Pb": (82, 14, 6, 2.33, 146),
+    "Bi": (83, 15, 6, 2.02, 148),
+}
+PROPERTY_NAMES = ["atomic_number", "group", "period", "electronegativity", "covalent_radius"]
+
+
+class CompositionFeaturizer:
+    """조성 dictionary 목록 → 특징 행렬 (벡터화)"""
+
+    def __init__(self, elements: Optional[List[str]] = None):
+        self.elements = list(elements or ELEMENT_PROPERTIES)
+        self.element_pos = {element: i for i, element in enumerate(self.elements)}
+        self.properties = np.array([ELEMENT_PROPERTIES[e] for e in self.elements], dtype=np.float64)
+
+    @property
+    def n_features(self) -> int:
+        return len(self.elements) + 4 * len(PROPERTY_NAMES) + 1
+
+    def transform(self, compositions: List[Dict[str, float]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (특징 행렬, 특징화 가능 여부 마스크)를 반환합니다.
+        물성 테이블에 없는 원소가 있거나 비율 합이 0 이하인 조성은 mask=False 이며 특징은 0 입니다.
+        조성은 희소하므로 원소 항목(CSR) 단위로 모아 물성 통계를 reduceat 으로 계산합니다.
+        """
+        n = len(compositions)
+        ok = np.ones(n, dtype=bool)
+        element_pos = self.element_pos
+        try:
+            # 대부분의 입력(모두 올바른 조성)은 comprehension 한 번으로 CSR 을 만듦
+            cols = [element_pos[element] for composition in compositions for element in composition]
+            vals_arr = np.array([fraction for composition in compositions for fraction in composition.values()],
+                                dtype=np.float64)
+            counts = np.fromiter(map(len, compositions), dtype=np.intp, count=n)
+        except (AttributeError, KeyError, TypeError, ValueError):
+            cols, vals_arr, counts = self._entries_checked(compositions, ok)
+        cols_arr = np.asarray(cols, dtype=np.intp)
+        indptr_arr = np.zeros(n + 1, dtype=np.intp)
+        np.cumsum(counts, out=indptr_arr[1:])
+        rows = np.repeat(np.arange(n), counts)
+
+        totals = np.bincount(rows, weights=vals_arr, minlength=n)
+        ok &= totals > 0
+        weights = vals_arr / np.where(totals > 0, totals, 1.0)[rows]
+
+        fractions = np.zeros((n, len(self.elements)), dtype=np.float64)
+        # 한 조성 안에서 원소는 중복되지 않으므로 (행, 원소) 쌍에 바로 대입
+        fractions[rows, cols_arr] = weights
+        mean = fractions @ self.properties
+        std = np.sqrt(np.maximum(fractions @ self.properties ** 2 - mean ** 2, 0.0))
+
+        prop_min = np.zeros_like(mean)
+        prop_max = np.zeros_like(mean)
+        nonempty = counts > 0
+        if cols_arr.size:
+            entry_props = self.properties[cols_arr]
+            starts = indptr_arr[:-1][nonempty]
+            prop_min[nonempty] = np.minimum.reduceat(entry_props, starts, axis=0)
+            prop_max[nonempty] = np.maximum.reduceat(entry_props, starts, axis=0)
+
+        n_elements = (fractions > 0).sum(axis=1, keepdims=True).astype(np.float64)
+        features = np.hstack([fractions, mean, std, prop_min, prop_max, n_elements])
+        features[~ok] = 0.0
+        return features, ok
+
+    def _entries_checked(self, compositions: List[Dict[str, float]],
+                         ok: np.ndarray) -> Tuple[List[int], np.ndarray, np.ndarray]:
+        """잘못된 조성이 섞여 있을 때의 행별 CSR 생성 - 특징화할 수 없는 행은 ok=False, 항목 없음"""
+        cols: List[int] = []
+        vals: List[float] = []
+        counts = np.zeros(len(compositions), dtype=np.intp)
+        element_pos = self.element_pos
+        for row, composition in enumerate(compositions):
+            start = len(cols)
+            try:
+                for element, fraction in composition.items():
+                    cols.append(element_pos[element])
+                    vals.append(float(fraction))
+            except (AttributeError, KeyError, TypeError, ValueError):
+                ok[row] = False
+                del cols[start:], vals[start:]
+            counts[row] = len(cols) - start
+        return cols, np.asarray(vals, dtype=np.float64), counts
+
+
+def composition_groups(compositions: List[Dict[str, float]]) -> np.ndarray:
+    """행별 조성 그룹 번호 (정규화 키가 같은 조성은 같은 번호)"""
+    keys: Dict[tuple, int] = {}
+    return np.array([keys.setdefault(canonical_key(c), len(keys)) for c in compositions], dtype=np.int64)
+
+
+def group_holdout_split(groups: np.ndarray, fraction: float,
+                        rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (hold-out 행, 나머지 행) - 조성 그룹 단위로 나눕니다.
+    같은 조성의 시스템(표면/흡착 자리)이 학습과 검증에 동시에 들어가면 검증 오차가 낙관적으로 나오므로
+    그룹을 무작위 순서로 골라 행 수가 fraction 에 이를 때까지 hold-out 에 넣습니다.
+    """
+    groups = np.asarray(groups)
+    unique, inverse, counts = np.unique(groups, return_inverse=True, return_counts=True)
+    order = rng.permutation(len(unique))
+    target = max(1, int(round(len(groups) * fraction)))
+    n_groups = int(np.searchsorted(np.cumsum(counts[order]), target)) + 1
+    held = np.zeros(len(unique), dtype=bool)
+    held[order[:min(n_groups, len(unique) - 1)]] = True
+    mask = held[inverse]
+    return np.flatnonzero(mask), np.flatnonzero(~mask)
+
+
+class AdsorptionSurrogate:
+    """Random-features GP 흡착 에너지 회귀 모델"""
+
+    ARRAYS = ["omega", "phase", "weights", "posterior_cov", "x_mean", "x_scale"]
+
+    def __init__(self, omega: np.ndarray, phase: np.ndarray, weights: np.ndarray,
+                 posterior_cov: np.ndarray, x_mean: np.ndarray, x_scale: np.ndarray,
+                 meta: Dict[str, object]):
+        """
+        Args:
+            omega, phase: random Fourier feature 투영 행렬 (d × D) 과 위상 (D,)
+            weights: 표준화된 타깃에 대한 사후 평균 가중치 (D,)
+            posterior_cov: (Φ^T Φ + αI)^-1 (D × D), 예측 분산 계산용
+            x_mean, x_scale: 특징 표준화 파라미터
+            meta: 원소 목록, y 표준화 파라미터, 잡음 분산, 학습 지표 등
+        """
+        self.omega = omega
+        self.phase = phase
+        self.weights = weights
+        self.posterior_cov = posterior_cov
+        self.x_mean = x_mean
+        self.x_scale = x_scale
+        self.meta = meta
+        self.featurizer = CompositionFeaturizer(meta["elements"])
+        self._norm = np.float32(np.sqrt(2.0 / omega.shape[1]))
+        # 특징 표준화 ((X - x_mean) / x_scale) 를 투영 행렬과 위상에 미리 합쳐 둠
+        self._omega_x = (np.asarray(omega, dtype=np.float64) / np.asarray(x_scale)[:, None]).astype(np.float32)
+        self._phase_x = (np.asarray(phase, dtype=np.float64)
+                         - (np.asarray(x_mean) / np.asarray(x_scale)) @ np.asarray(omega, dtype=np.float64)
+                         ).astype(np.float32)
+
+    def _random_features(self, X: np.ndarray) -> np.ndarray:
+        phi = X.astype(np.float32) @ self._omega_x
+        phi += self._phase_x
+        np.cos(phi, out=phi)
+        phi *= self._norm
+        return phi
+
+    @classmethod
+    def fit(cls, compositions: List[Dict[str, float]], energies: np.ndarray,
+            n_features: int = 256, lengthscale: Optional[float] = None, alpha: Optional[float] = None,
+            seed: int = 0, groups: Optional[np.ndarray] = None) -> "AdsorptionSurrogate":
+        """
+        모델을 학습합니다.
+        lengthscale / alpha 를 지정하지 않으면 조성 그룹 단위 10% 검증 분할에서 작은 격자 탐색으로 고른 뒤
+        전체 데이터로 재학습합니다. groups 는 행별 조성 그룹 번호 (CompositionGroups.row_group,
+        None 이면 조성의 정규화 키로 계산)
+        """
+        featurizer = CompositionFeaturizer()
+        X, ok = featurizer.transform(compositions)
+        y = np.asarray(energies, dtype=np.float64)
+        groups = composition_groups(compositions) if groups is None else np.asarray(groups)
+        ok &= np.isfinite(y)
+        X, y, groups = X[ok], y[ok], groups[ok]
+
+        x_mean = X.mean(axis=0)
+        x_scale = X.std(axis=0)
+        x_scale[x_scale < 1e-8] = 1.0
+        y_mean, y_std = float(y.mean()), float(y.std() or 1.0)
+        Z = (X - x_mean) / x_scale
+        t = (y - y_mean) / y_std
+
+        rng = np.random.default_rng(seed)
+        base_omega = rng.standard_normal((X.shape[1], n_features))
+        phase = rng.uniform(0.0, 2.0 * np.pi, n_features)
+        norm = np.sqrt(2.0 / n_features)
+
+        # median heuristic 으로 기준 lengthscale 설정
+        sample = Z[rng.choice(len(Z), size=min(1000, len(Z)), replace=False)]
+        sq_norm = (sample ** 2).sum(axis=1)
+        sq = sq_norm[:, None] + sq_norm[None, :] - 2.0 * sample @ sample.T
+        sq = sq[sq > 1e-12]
+        median_ls = float(np.sqrt(np.median(sq) / 2.0)) if sq.size else 1.0
+
+        def solve(Z_train, t_train, ls, a):
+            phi = norm * np.cos(Z_train @ (base_omega / ls) + phase)
+            A = phi.T @ phi + a * np.eye(n_features)
+            return np.linalg.solve(A, phi.T @ t_train), A
+
+        grid_ls = [lengthscale] if lengthscale else [median_ls * m for m in (0.5, 1.0, 2.0, 4.0)]
+        grid_alpha = [alpha] if alpha else [0.1, 1.0, 10.0]
+        best = (grid_ls[0], grid_alpha[0], None)
+        if len(grid_ls) * len(grid_alpha) > 1:
+            # 같은 조성의 시스템이 학습/검증 양쪽에 들어가지 않도록 그룹 단위로 분할
+            val, train = group_holdout_split(groups, 0.1, rng)
+            for ls in grid_ls:
+                phi_val = norm * np.cos(Z[val] @ (base_omega / ls) + phase)
+                for a in grid_alpha:
+                    w, _ = solve(Z[train], t[train], ls, a)
+                    mae = float(np.abs(phi_val @ w - t[val]).mean() * y_std)
+                    if best[2] is None or mae < best[2]:
+                        best = (ls, a, mae)
+
+        ls, a, val_mae = best
+        weights, A = solve(Z, t, ls, a)
+        omega = base_omega / ls
+        phi = norm * np.cos(Z @ omega + phase)
+        residual = phi @ weights - t
+        noise_var = float(np.mean(residual ** 2))
+
+        meta = {
+            "format_version": FORMAT_VERSION,
+            "elements": featurizer.elements,
+            "property_names": PROPERTY_NAMES,
+            "n_features": n_features,
+            "lengthscale": ls,
+            "alpha": a,
+            "y_mean": y_mean,
+            "y_std": y_std,
+            "noise_var": noise_var,
+            "n_train": int(len(y)),
+            "train_mae": float(np.abs(residual).mean() * y_std),
+            "val_mae": val_mae,
+            "energy_checksum": float(y.sum()),
+        }
+        # 추론은 float32 로 수행 (정밀도 손실은 예측 불확실도에 비해 무시할 수준)
+        return cls(omega.astype(np.float32), phase.astype(np.float32), weights.astype(np.float32),
+                   np.linalg.inv(A).astype(np.float32), x_mean, x_scale, meta)
+
+    def predict(self, compositions: List[Dict[str, float]],
+                return_std: bool = False) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        흡착 에너지(eV)를 배치로 예측합니다.
+        특징화할 수 없는 조성(물성 테이블에 없는 원소 등)은 NaN 을 반환합니다.
+
+        Returns:
+            (예측 평균, 예측 표준편차 또는 None)
+        """
+        X, ok = self.featurizer.transform(compositions)
+        phi = self._random_features(X)
+        y_std = self.meta["y_std"]
+        mean = (phi @ self.weights).astype(np.float64) * y_std + self.meta["y_mean"]
+        mean[~ok] = np.nan
+        if not return_std:
+            return mean, None
+        # Bayesian linear regression 예측 분산: σ²(1 + φ^T A^-1 φ)
+        var = self.meta["noise_var"] * (1.0 + ((phi @ self.posterior_cov) * phi).sum(axis=1, dtype=np.float64))
+        std = np.sqrt(var) * y_std
+        std[~ok] = np.nan
+        return mean, std
+
+    def save(self, model_dir: str = DEFAULT_MODEL_DIR) -> str:
+        os.makedirs(model_dir, exist_ok=True)
+        for name in self.ARRAYS:
+            save_npy_atomic(os.path.join(model_dir, f"{name}.npy"), np.asarray(getattr(self, name)))
+        write_json_atomic(os.path.join(model_dir, "meta.json"), self.meta)
+        return model_dir
+
+    @classmethod
+    def load(cls, model_dir: str = DEFAULT_MODEL_DIR, mmap: bool = True) -> "AdsorptionSurrogate":
+        with open(os.path.join(model_dir, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 모델 형식 버전: {meta.get('format_version')}")
+        mmap_mode = "r" if mmap else None
+        arrays = {name: np.load(os.path.join(model_dir, f"{name}.npy"), mmap_mode=mmap_mode)
+                  for name in cls.ARRAYS}
+        return cls(meta=meta, **arrays)
+
+
+def _training_data(index) -> Tuple[List[Dict[str, float]], np.ndarray, np.ndarray]:
+    """(조성 목록, 에너지, 행별 조성 그룹 번호)"""
+    energies = np.array([index.energies.get(sid, np.nan) for sid in index.system_ids], dtype=np.float64)
+    return index.compositions[:], energies, index.groups.row_group
+
+
+_model_cache: Dict[str, Tuple[object, AdsorptionSurrogate]] = {}
+_model_lock = threading.Lock()
+
+
+def _matches_data(model: AdsorptionSurrogate, energies: np.ndarray) -> bool:
+    finite = energies[np.isfinite(energies)]
+    return (model.meta["n_train"] == len(finite)
+            and bool(np.isclose(model.meta["energy_checksum"], float(finite.sum()))))
+
+
+def get_surrogate_model(index, model_dir: str = DEFAULT_MODEL_DIR) -> AdsorptionSurrogate:
+    """
+    CompositionIndex 의 데이터로 학습된 모델을 반환합니다.
+    model_dir 에 같은 데이터로 학습된 가중치가 있으면 mmap 으로 로드하고,
+    없거나 데이터가 바뀌었으면 새로 학습한 뒤 저장합니다 (학습은 1~2초).
+    인덱스가 교체(hot-reload)되면 다음 호출에서 데이터 일치 여부를 다시 확인합니다.
+    """
+    cache_key = os.path.abspath(model_dir)
+    cached = _model_cache.get(cache_key)
+    if cached is not None and cached[0] is index:
+        return cached[1]
+    with _model_lock:
+        cached = _model_cache.get(cache_key)
+        if cached is not None and cached[0] is index:
+            return cached[1]
+
+        compositions, energies, groups = _training_data(index)
+        model = None
+        if cached is not None and _matches_data(cached[1], energies):
+            model = cached[1]
+        elif os.path.exists(os.path.join(model_dir, "meta.json")):
+            try:
+                model = AdsorptionSurrogate.load(model_dir)
+                if not _matches_data(model, energies):
+                    logger.info("저장된 surrogate 모델이 현재 데이터와 다릅니다 - 재학습합니다.")
+                    model = None
+            except Exception as e:
+                logger.warning(f"surrogate 모델 로드 실패 ({model_dir}): {e}")
+                model = None
+
+        if model is None:
+            model = AdsorptionSurrogate.fit(compositions, energies, groups=groups)
+            try:
+                model.save(model_dir)
+            except OSError as e:
+                logger.warning(f"surrogate 모델 저장 실패 ({model_dir}): {e}")
+            logger.info(f"surrogate 모델 학습 완료: val MAE {model.meta['val_mae']:.3f} eV")
+
+        _model_cache[cache_key] = (index, model)
+        return model
+
+
+def main():
+    from dft.composition_index import DEFAULT_COMP_CSV_PATH, DEFAULT_INFO_CSV_PATH, CompositionIndex
+
+    parser = argparse.ArgumentParser(description="흡착 에너지 surrogate 모델 학습")
+    parser.add_argument("--comp-csv", default=DEFAULT_COMP_CSV_PATH)
+    parser.add_argument("--info-csv", default=DEFAULT_INFO_CSV_PATH)
+    parser.add_argument("--model-dir", default=DEFAULT_MODEL_DIR)
+    parser.add_argument("--n-features", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    index = CompositionIndex.load(args.comp_csv, args.info_csv)
+    compositions, energies, groups = _training_data(index)
+    model = AdsorptionSurrogate.fit(compositions, energies, n_features=args.n_features, seed=args.seed,
+                                    groups=groups)
+    model.save(args.model_dir)
+    meta = model.meta
+    print(f"{args.model_dir}: n_train={meta['n_train']}, lengthscale={meta['lengthscale']:.3f}, "
+          f"alpha={meta['alpha']}, train MAE={meta['train_mae']:.3f} eV, val MAE={meta['val_mae']:.3f} eV")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+MCP tool 실행기
+
+MCP 서버의 handle_call_tool 은 async 로 선언되어 있지만 실제 작업(인덱스 조회, 목록 스캔,
+surrogate 예측)은 동기 코드입니다. 이를 이벤트 루프에서 그대로 실행하면 느린 호출 하나가
+서버의 다른 모든 요청을 멈추게 하므로, ToolExecutor 는 다음을 담당합니다.
+
+- 동기 tool 함수를 크기가 제한된 스레드 풀에서 실행 (이벤트 루프는 항상 응답 가능)
+- tool 별 동시 실행 수 제한 (asyncio.Semaphore)
+- single-flight: 같은 (tool, arguments) 요청이 실행 중이면 새로 실행하지 않고 그 결과를 공유
+  (작업은 별도 task 로 실행되며, 기다리는 호출자가 모두 취소되었을 때만 취소)
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 스레드 풀 기본 크기 (concurrent.futures 기본값과 같은 규칙)
+# 무거운 tool 은 tool_limits 로 일부 worker 만 쓰게 하여 가벼운 조회가 항상 worker 를 얻을 수 있도록 함
+DEFAULT_MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+
+class ToolExecutor:
+    """동기 tool 함수를 이벤트 루프 밖에서 실행하는 async 실행기"""
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS,
+                 tool_limits: Optional[Dict[str, int]] = None,
+                 default_limit: Optional[int] = None,
+                 uncoalesced_tools: Iterable[str] = (),
+                 thread_name_prefix: str = "mcp-tool"):
+        """
+        Args:
+            max_workers: 스레드 풀 크기 (동시에 실행되는 tool 작업의 전체 상한)
+            tool_limits: tool 이름별 동시 실행 상한 (예: {"get_adsorp_energy_batch": 2})
+            default_limit: tool_limits 에 없는 tool 의 동시 실행 상한 (None 이면 max_workers)
+            uncoalesced_tools: 같은 인자라도 호출마다 결과가 달라야 하는 tool (예: 무작위 샘플링)
+        """
+        self.max_workers = max_workers
+        self.tool_limits = dict(tool_limits or {})
+        self.default_limit = default_limit or max_workers
+        self.uncoalesced_tools = frozenset(uncoalesced_tools)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._waiters: Dict[asyncio.Future, int] = {}  # 작업 task → 결과를 기다리는 호출자 수
+
+        # 관측용 카운터
+        self.executed = 0
+        self.coalesced = 0
+
+    def _semaphore(self, name: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(name)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.tool_limits.get(name, self.default_limit))
+            self._semaphores[name] = semaphore
+        return semaphore
+
+    def _request_key(self, name: str, arguments: Any) -> Optional[Tuple[str, str]]:
+        """single-flight 키 - 인자를 정규화된 JSON 으로 직렬화 (직렬화 불가능하면 병합하지 않음)"""
+        if name in self.uncoalesced_tools:
+            return None
+        try:
+            return name, json.dumps(arguments, sort_keys=True, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return None
+
+    async def run(self, name: str, arguments: Any, func: Callable[[str, Any], Any]) -> Any:
+        """
+        func(name, arguments) 를 스레드 풀에서 실행하고 결과를 반환합니다.
+        같은 요청이 이미 실행 중이면 그 결과를 기다려 공유합니다.
+        작업은 별도 task 로 실행되며, 기다리는 호출자가 모두 취소되었을 때만 취소됩니다.
+        """
+        key = self._request_key(name, arguments)
+        task = self._inflight.get(key) if key is not None else None
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(self._execute(name, arguments, func))
+            if key is not None:
+                self._inflight[key] = task
+                task.add_done_callback(functools.partial(self._forget, key))
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            # shield: 호출자 하나가 취소되어도 다른 호출자가 기다리는 공유 작업은 계속 진행
+            return await asyncio.shield(task)
+        finally:
+            remaining = self._waiters.pop(task) - 1
+            if remaining:
+                self._waiters[task] = remaining
+            elif not task.done():
+                # 마지막 호출자까지 취소됨 - 작업 취소 (이미 스레드에서 실행 중인 func 은 끝까지 실행됨)
+                task.cancel()
+
+    async def _execute(self, name: str, arguments: Any, func: Callable[[str, Any], Any]) -> Any:
+        loop = asyncio.get_running_loop()
+        async with self._semaphore(name):
+            result = await loop.run_in_executor(self._pool, func, name, arguments)
+        self.executed += 1
+        return result
+
+    def _forget(self, key: Tuple[str, str], task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
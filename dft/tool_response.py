@@ -0,0 +1,116 @@
+"""
+Compact tool responses
+
+조성 목록을 반환하는 MCP tool 응답을 작게 만드는 공통 인코더입니다. 응답은 그대로 LLM 컨텍스트에 들어가므로
+크기가 곧 토큰 수와 지연 시간입니다.
+
+- fields:    필드 선택(projection). 기본은 system_id + composition (elements, n_elements 는 composition 에서 알 수 있음)
+             + 결과에 있는 경우 adsorp_energy, energy_delta, distance
+- layout:    "records" ([{...}, ...]) 또는 "table" ({"columns": [...], "rows": [[...], ...]} - 필드 이름을 한 번만 씀)
+- precision: 에너지·거리 소수점 자릿수 (None 이면 반올림하지 않음)
+             조성 분율은 반올림하지 않음 - 반환된 조성을 그대로 조회 tool 에 넣어도 같은 시스템을 찾도록
+- max_bytes: 목록 직렬화 크기 상한. 넘치면 앞에서부터 들어가는 만큼만 반환 (최소 1개)
+
+JSON 은 공백 없는 구분자(", " 대신 ",")로 직렬화합니다.
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+RESPONSE_FIELDS = ("system_id", "composition", "elements", "n_elements", "adsorp_energy", "energy_delta", "distance")
+DEFAULT_FIELDS = ("system_id", "composition")
+_OPTIONAL_DEFAULT_FIELDS = ("adsorp_energy", "energy_delta", "distance")
+# precision 을 적용하는 필드 (composition 은 정확 일치 조회 키이므로 제외)
+ROUNDED_FIELDS = frozenset(("adsorp_energy", "energy_delta", "distance"))
+LAYOUTS = ("records", "table")
+DEFAULT_PRECISION = 4
+DEFAULT_MAX_BYTES = 16000
+
+COMPACT_SEPARATORS = (",", ":")
+
+
+def dumps_compact(data: Any) -> str:
+    """공백 없는 JSON 직렬화 (ensure_ascii=False)"""
+    return json.dumps(data, ensure_ascii=False, separators=COMPACT_SEPARATORS)
+
+
+def response_format_properties() -> Dict[str, Dict[str, Any]]:
+    """조성 목록을 반환하는 tool 의 inputSchema 에 추가할 응답 형식 인자들"""
+    return {
+        "fields": {
+            "type": "array",
+            "items": {"type": "string", "enum": list(RESPONSE_FIELDS)},
+            "description": "결과에 포함할 필드 (기본값: system_id, composition 과 결과에 있는 adsorp_energy/energy_delta/distance)"
+        },
+        "layout": {
+            "type": "string",
+            "enum": list(LAYOUTS),
+            "description": "records: 결과마다 객체, table: {columns, rows} 표 형식으로 필드 이름을 한 번만 표기 (기본값: records)",
+            "default": "records"
+        },
+        "precision": {
+            "type": "integer",
+            "description": f"에너지·거리 소수점 자릿수, 조성 분율은 반올림하지 않음 (기본값: {DEFAULT_PRECISION})",
+            "default": DEFAULT_PRECISION,
+            "minimum": 0
+        },
+        "max_bytes": {
+            "type": "integer",
+            "description": f"결과 목록의 최대 크기(byte, 대략 4 byte = 1 token). 넘치면 앞쪽 결과만 반환 (기본값: {DEFAULT_MAX_BYTES})",
+            "default": DEFAULT_MAX_BYTES,
+            "minimum": 1
+        },
+    }
+
+
+def _round(field: str, value: Any, precision: Optional[int]) -> Any:
+    if precision is None or field not in ROUNDED_FIELDS or not isinstance(value, float):
+        return value
+    return round(value, precision)
+
+
+def resolve_fields(records: Sequence[Dict[str, Any]], fields: Optional[Sequence[str]] = None) -> List[str]:
+    """요청된 필드 목록을 검증하고, 없으면 기본 필드 목록을 반환합니다."""
+    if fields:
+        unknown = [field for field in fields if field not in RESPONSE_FIELDS]
+        if unknown:
+            raise ValueError(f"알 수 없는 필드입니다: {unknown} (가능한 필드: {list(RESPONSE_FIELDS)})")
+        return list(dict.fromkeys(fields))
+    present = records[0] if records else {}
+    return list(DEFAULT_FIELDS) + [field for field in _OPTIONAL_DEFAULT_FIELDS if field in present]
+
+
+def encode_matches(records: Sequence[Dict[str, Any]], fields: Optional[Sequence[str]] = None,
+                   layout: str = "records", precision: Optional[int] = DEFAULT_PRECISION,
+                   max_bytes: Optional[int] = DEFAULT_MAX_BYTES) -> Tuple[Any, int]:
+    """
+    조성 결과 목록을 요청된 형식으로 변환합니다.
+
+    Args:
+        records: compositions_db 행 (CompositionRow 또는 adsorp_energy 등이 추가된 dict)
+        fields, layout, precision, max_bytes: 모듈 설명 참고
+
+    Returns:
+        (응답에 넣을 목록 또는 표, 실제로 포함된 결과 수)
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"layout 은 {LAYOUTS} 중 하나여야 합니다: {layout!r}")
+    columns = resolve_fields(records, fields)
+    if layout == "table":
+        items = [[_round(field, record.get(field), precision) for field in columns] for record in records]
+    else:
+        items = [{field: _round(field, record.get(field), precision) for field in columns} for record in records]
+
+    kept = len(items)
+    if max_bytes is not None:
+        used = 2  # 목록의 [ ]
+        for i, item in enumerate(items):
+            used += len(dumps_compact(item).encode("utf-8")) + (1 if i else 0)
+            if used > max_bytes and i:
+                kept = i
+                break
+        items = items[:kept]
+
+    if layout == "table":
+        return {"columns": columns, "rows": items}, kept
+    return items, kept
@@ -1,9 +1,9 @@
 import csv
 import os
 from parse_last_system_composition import parse_last_system_composition
+from composition_codec import ERROR_SENTINEL, format_composition, parse_composition
 from tqdm import tqdm
 from concurrent.futures import ThreadPoolExecutor, as_completed
-import ast
 
 def process_system(row, extxyz_dir):
     system_id = row["system_id"]
@@ -73,7 +73,7 @@ def convert_composition_to_fraction(
             comp = row["composition"]
             # composition이 dict 형태의 문자열일 때만 처리
             try:
-                comp_dict = ast.literal_eval(comp) if isinstance(comp, str) else comp
+                comp_dict = parse_composition(comp) if isinstance(comp, str) else comp
                 if not isinstance(comp_dict, dict):
                     raise ValueError
                 # H 제거
@@ -83,9 +83,9 @@ def convert_composition_to_fraction(
                     fraction = {k: v/total for k, v in comp_no_h.items()}
                 else:
                     fraction = {}
-                writer.writerow({"system_id": system_id, "composition_fraction": fraction})
+                writer.writerow({"system_id": system_id, "composition_fraction": format_composition(fraction)})
             except Exception:
-                writer.writerow({"system_id": system_id, "composition_fraction": "Error or Not Available"})
+                writer.writerow({"system_id": system_id, "composition_fraction": ERROR_SENTINEL})
 
 # 사용 예시
 if __name__ == "__main__":
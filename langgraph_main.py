@@ -202,6 +202,8 @@ def main():
             "prompt": "",
             "llm_output": "",
             "extracted_compositions": [],  # 복수형 리스트
+            "streamed_compositions": [],
+            "candidate_energies": [],
             "extracted_analysis": {},
             "tool_summary": {},
             "result": {},
@@ -11,6 +11,8 @@ LLM Catalyst Agent Main Pipeline - Simplified
 import json
 import pandas as pd
 
+from dft.binary_store import read_composition_strings
+
 def main():
     print("=== LLM Catalyst Agent 시작 ===")
     
@@ -20,8 +22,8 @@ def main():
     print("[1] Context 로딩 완료")
     
     # 2. Search group 준비 (후보 조성들)
-    df = pd.read_csv("data/hydrogen/system_compositions_fraction.csv")
-    search_group_data = df['composition_fraction'][:50].tolist()  # 50개만 사용
+    # 컴파일된 바이너리 저장소가 있으면 CSV 파싱 없이 mmap 으로 읽음
+    search_group_data = read_composition_strings("data/hydrogen", limit=50)  # 50개만 사용
     search_group = {
         "count": len(search_group_data),
         "compositions": search_group_data,
@@ -58,6 +60,7 @@ def main():
     
     # Tool usage log 저장
     llm_agent.save_tool_usage_log()
+    llm_agent.close()
     
     # 6. 조성 추출 (backup method)
     composition_dict = llm_agent.parse_composition(llm_output)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+MCP Catalyst Data Server
+
+연구 공간 탐색 도구(MCP_tools/quest_data.py)와 흡착 에너지 도구(mcp_dft_surrogate_model.py)를
+하나의 프로세스에서 제공하는 통합 MCP 서버입니다.
+모든 도구가 같은 조성 인덱스(CompositionIndex)를 공유하므로 데이터는 한 번만 로드되고,
+validate_composition 결과에 흡착 에너지가 함께 포함됩니다.
+"""
+
+import asyncio
+import logging
+
+from mcp.server import Server
+from mcp.server.models import InitializationOptions
+from mcp.server.stdio import stdio_server
+from mcp.types import TextContent, Tool
+
+import mcp_dft_surrogate_model as energy_tools
+from dft.composition_index import DEFAULT_COMP_CSV_PATH, DEFAULT_INFO_CSV_PATH, get_index_reloader
+from dft.tool_executor import ToolExecutor
+from MCP_tools import quest_data as quest_tools
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("mcp-catalyst-data")
+
+# Create server instance
+server = Server("mcp-catalyst-data")
+
+# 두 서버의 tool 이름 -> 동기 처리 함수
+TOOL_HANDLERS = {
+    **{tool.name: quest_tools.run_tool for tool in quest_tools.list_tools()},
+    **{tool.name: energy_tools.run_tool for tool in energy_tools.list_tools()},
+}
+
+# 한 프로세스에서 하나의 스레드 풀을 사용 (tool 별 동시 실행 제한은 각 서버의 설정을 그대로 사용)
+tool_executor = ToolExecutor(
+    tool_limits={**quest_tools.tool_executor.tool_limits, **energy_tools.tool_executor.tool_limits},
+    uncoalesced_tools=quest_tools.tool_executor.uncoalesced_tools | energy_tools.tool_executor.uncoalesced_tools,
+)
+
+@server.list_tools()
+async def handle_list_tools() -> list[Tool]:
+    """연구 공간 탐색 도구와 흡착 에너지 도구를 함께 나열합니다."""
+    return quest_tools.list_tools() + energy_tools.list_tools()
+
+@server.call_tool()
+async def handle_call_tool(name: str, arguments: dict) -> list[TextContent]:
+    """tool 이름에 따라 해당 도구 모듈의 처리 함수로 전달합니다."""
+    handler = TOOL_HANDLERS.get(name)
+    if handler is None:
+        return [TextContent(type="text", text=f"Error: Unknown tool '{name}'")]
+    return await tool_executor.run(name, arguments, handler)
+
+async def main():
+    """Main entry point for the unified MCP server."""
+    logger.info("Starting MCP Catalyst Data Server")
+
+    # 에너지 도구가 사용하는 기본 데이터 경로를 탐색 도구도 사용하도록 지정 -> 인덱스 하나를 공유
+    quest_tools.configure_dataset(DEFAULT_COMP_CSV_PATH, DEFAULT_INFO_CSV_PATH)
+    if not quest_tools.load_compositions_database():
+        logger.error("조성 데이터베이스 로드 실패 - 서버를 종료합니다.")
+        return
+
+    # 데이터 파일이 바뀌면 백그라운드에서 인덱스와 compositions_db를 함께 교체
+    reloader = get_index_reloader(DEFAULT_COMP_CSV_PATH, DEFAULT_INFO_CSV_PATH).start()
+    logger.info(f"공유 조성 인덱스 로드 완료: {len(reloader.index)}개 시스템, 도구 {len(TOOL_HANDLERS)}개")
+
+    async with stdio_server() as (read_stream, write_stream):
+        await server.run(
+            read_stream,
+            write_stream,
+            InitializationOptions(
+                server_name="mcp-catalyst-data",
+                server_version="1.0.0",
+                capabilities=server.get_capabilities(
+                    notification_options=None,
+                    experimental_capabilities=None,
+                )
+            )
+        )
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -21,7 +21,9 @@ from mcp.types import (
     Tool,
 )
 
-from dft.dft_surrogate_model import get_adsorp_energy_by_composition
+from dft.composition_index import get_composition_index, get_index_reloader
+from dft.dft_surrogate_model import get_adsorp_energies
+from dft.tool_executor import ToolExecutor
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -30,13 +32,12 @@ logger = logging.getLogger("mcp-dft-surrogate")
 # Create server instance
 server = Server("mcp-dft-surrogate")
 
-@server.list_tools()
-async def handle_list_tools() -> list[Tool]:
-    """List available tools for DFT surrogate model."""
+def list_tools() -> list[Tool]:
+    """흡착 에너지 도구 목록 (통합 서버에서도 사용)"""
     return [
         Tool(
             name="get_adsorp_energy",
-            description="주어진 조성(composition)에 대한 흡착 에너지를 예측합니다. 조성은 dictionary 형태로 제공해야 합니다.",
+            description="주어진 조성(composition)에 대한 흡착 에너지를 반환합니다. DFT 데이터가 있으면 그 값을, 없으면 not_found 와 가장 가까운 시스템(neighbors)을 반환합니다. (predict=true 이면 surrogate 모델 예측값과 불확실도) 조성은 dictionary 형태로 제공해야 합니다.",
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -48,11 +49,67 @@ async def handle_list_tools() -> list[Tool]:
                             "minimum": 0,
                             "maximum": 1
                         }
+                    },
+                    "predict": {
+                        "type": "boolean",
+                        "description": "DFT 데이터가 없을 때 surrogate 모델 예측값과 불확실도를 반환할지 여부 (기본값: false). 예측 오차(hold-out MAE 약 0.44 eV)가 커서 참고용입니다.",
+                        "default": False
+                    },
+                    "k_neighbors": {
+                        "type": "integer",
+                        "description": "데이터에 없는 조성일 때 함께 반환할 가장 가까운 시스템 수 (0이면 반환하지 않음, 기본값: 3)",
+                        "minimum": 0,
+                        "default": 3
+                    },
+                    "reduction": {
+                        "type": "string",
+                        "enum": ["first", "min", "mean", "max"],
+                        "description": "같은 조성의 시스템(표면/흡착 자리)이 여러 개일 때 adsorp_energy로 반환할 값 (first: 데이터 순서상 첫 시스템, min/mean/max: 그룹 집계; 기본값: first). 여러 개이면 energy_stats에 count/min/mean/std/max가 함께 반환됩니다.",
+                        "default": "first"
                     }
                 },
                 "required": ["composition"]
             }
         ),
+        Tool(
+            name="get_adsorp_energy_batch",
+            description="여러 조성(composition)의 흡착 에너지를 한 번에 조회합니다. 각 조성별로 status(success/not_found/invalid)를 반환합니다.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "compositions": {
+                        "type": "array",
+                        "description": "촉매 조성 dictionary들의 배열 (예: [{'Pt': 0.5, 'Ru': 0.5}, {'Sc': 0.25, 'Pt': 0.75}])",
+                        "items": {
+                            "type": "object",
+                            "additionalProperties": {
+                                "type": "number",
+                                "minimum": 0,
+                                "maximum": 1
+                            }
+                        }
+                    },
+                    "predict": {
+                        "type": "boolean",
+                        "description": "DFT 데이터가 없을 때 surrogate 모델 예측값과 불확실도를 반환할지 여부 (기본값: false). 예측 오차(hold-out MAE 약 0.44 eV)가 커서 참고용입니다.",
+                        "default": False
+                    },
+                    "k_neighbors": {
+                        "type": "integer",
+                        "description": "데이터에 없는 조성일 때 함께 반환할 가장 가까운 시스템 수 (0이면 반환하지 않음, 기본값: 3)",
+                        "minimum": 0,
+                        "default": 3
+                    },
+                    "reduction": {
+                        "type": "string",
+                        "enum": ["first", "min", "mean", "max"],
+                        "description": "같은 조성의 시스템(표면/흡착 자리)이 여러 개일 때 adsorp_energy로 반환할 값 (first: 데이터 순서상 첫 시스템, min/mean/max: 그룹 집계; 기본값: first). 여러 개이면 energy_stats에 count/min/mean/std/max가 함께 반환됩니다.",
+                        "default": "first"
+                    }
+                },
+                "required": ["compositions"]
+            }
+        ),
         Tool(
             name="check_composition_exists", 
             description="주어진 조성이 system_compositions_fraction.csv에 존재하는지 확인합니다.",
@@ -74,9 +131,23 @@ async def handle_list_tools() -> list[Tool]:
         )
     ]
 
+@server.list_tools()
+async def handle_list_tools() -> list[Tool]:
+    """List available tools for DFT surrogate model."""
+    return list_tools()
+
+# 동기 tool 작업은 제한된 스레드 풀에서 실행 (같은 요청은 한 번만 실행하여 결과 공유)
+tool_executor = ToolExecutor(
+    tool_limits={"get_adsorp_energy_batch": 2},
+)
+
 @server.call_tool()
 async def handle_call_tool(name: str, arguments: dict) -> list[TextContent]:
     """Handle tool calls for DFT surrogate model."""
+    return await tool_executor.run(name, arguments, run_tool)
+
+def run_tool(name: str, arguments: dict) -> list[TextContent]:
+    """tool 호출을 동기적으로 처리합니다. (tool_executor 의 worker 스레드에서 실행)"""
     
     if name == "get_adsorp_energy":
         try:
@@ -88,24 +159,21 @@ async def handle_call_tool(name: str, arguments: dict) -> list[TextContent]:
             if not isinstance(composition, dict):
                 return [TextContent(type="text", text="Error: composition must be a dictionary")]
             
-            # Get adsorption energy
-            energy = get_adsorp_energy_by_composition(composition)
+            # Exact DFT value from the warm index; surrogate prediction / neighbours on a miss
+            result = get_adsorp_energies(
+                [composition],
+                k_neighbors=arguments.get("k_neighbors", 3),
+                predict=arguments.get("predict", False),
+                reduction=arguments.get("reduction", "first")
+            )[0]
             
-            if energy is not None:
-                result = {
-                    "composition": composition,
-                    "adsorp_energy": energy,
-                    "status": "success"
-                }
-                return [TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
-            else:
-                result = {
-                    "composition": composition,
-                    "adsorp_energy": None,
-                    "status": "not_found",
-                    "message": "해당 조성에 대한 데이터를 찾을 수 없습니다."
-                }
-                return [TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            if result["status"] == "predicted":
+                result["message"] = "DFT 데이터가 없어 surrogate 모델의 예측값과 불확실도(uncertainty, 1σ)를 반환합니다."
+            elif result["status"] == "not_found":
+                result["message"] = "해당 조성에 대한 데이터를 찾을 수 없습니다."
+            if "neighbors" in result:
+                result["message"] += " 가장 가까운 조성들의 에너지를 neighbors에 포함했습니다."
+            return [TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
                 
         except Exception as e:
             error_result = {
@@ -115,15 +183,51 @@ async def handle_call_tool(name: str, arguments: dict) -> list[TextContent]:
             }
             return [TextContent(type="text", text=json.dumps(error_result, ensure_ascii=False))]
     
+    elif name == "get_adsorp_energy_batch":
+        try:
+            compositions = arguments.get("compositions")
+            if not isinstance(compositions, list) or not compositions:
+                return [TextContent(type="text", text="Error: compositions must be a non-empty list")]
+            
+            results = get_adsorp_energies(
+                compositions,
+                k_neighbors=arguments.get("k_neighbors", 3),
+                predict=arguments.get("predict", False),
+                reduction=arguments.get("reduction", "first")
+            )
+            found = sum(1 for r in results if r["status"] == "success")
+            predicted = sum(1 for r in results if r["status"] == "predicted")
+            
+            result = {
+                "results": results,
+                "total": len(results),
+                "found": found,
+                "predicted": predicted,
+                "not_found": len(results) - found - predicted,
+                "status": "success"
+            }
+            return [TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
+            
+        except Exception as e:
+            error_result = {
+                "compositions": arguments.get("compositions"),
+                "status": "error",
+                "error": str(e)
+            }
+            return [TextContent(type="text", text=json.dumps(error_result, ensure_ascii=False))]
+    
     elif name == "check_composition_exists":
         try:
             composition = arguments.get("composition")
             if not composition:
                 return [TextContent(type="text", text="Error: composition parameter is required")]
             
-            # Check if composition exists by trying to get energy
-            energy = get_adsorp_energy_by_composition(composition)
-            exists = energy is not None
+            if not isinstance(composition, dict):
+                return [TextContent(type="text", text="Error: composition must be a dictionary")]
+            
+            # Check if composition exists in the index
+            match = get_composition_index().lookup(composition)
+            exists = match is not None and match.adsorp_energy is not None
             
             result = {
                 "composition": composition,
@@ -131,7 +235,8 @@ async def handle_call_tool(name: str, arguments: dict) -> list[TextContent]:
                 "status": "success"
             }
             if exists:
-                result["adsorp_energy"] = energy
+                result["system_id"] = match.system_id
+                result["adsorp_energy"] = match.adsorp_energy
                 
             return [TextContent(type="text", text=json.dumps(result, ensure_ascii=False))]
             
@@ -150,6 +255,11 @@ async def main():
     """Main entry point for the MCP server."""
     logger.info("Starting MCP DFT Surrogate Model Server")
     
+    # 서버 시작 전에 조성 인덱스를 한 번 로드 (이후 tool 호출은 파일을 다시 읽지 않음)
+    # 데이터 파일이 바뀌면 백그라운드에서 인덱스를 다시 만들어 교체
+    reloader = get_index_reloader().start()
+    logger.info(f"조성 인덱스 로드 완료: {len(reloader.index)}개 시스템")
+    
     async with stdio_server() as (read_stream, write_stream):
         await server.run(
             read_stream,